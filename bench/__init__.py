@@ -0,0 +1,19 @@
+# -----------------------------------------------------------------------------
+# __init__.py - xrm2m benchmarks
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+"""
+Benchmarks for the Machine-to-Machine Python API.
+
+Each module in this package is a script which can be run from the root of the
+source tree, eg.::
+
+    python -m bench.batch
+
+Benchmarks run against an in-process server, so they measure the cost of the
+client library only.
+
+"""
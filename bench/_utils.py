@@ -0,0 +1,183 @@
+# -----------------------------------------------------------------------------
+# _utils.py - Utilities for writing benchmarks
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Utilities for writing benchmarks."""
+
+
+__all__ = (
+    'FakeServerTransport',
+    'make_get_result',
+    'timed',
+)
+
+
+import collections
+import json
+import time
+
+from xrm2m import _async
+from xrm2m import _transport
+
+
+def make_get_result(num_pairs):
+    """
+    Return a realistic `get` result, as it would appear in a response.
+
+    The result resembles a walk of interface statistics, with one pair per
+    counter leaf.
+
+    """
+    result = []
+    for i in range(num_pairs):
+        path = ('RootOper.InfraStatistics.Interface({{"InterfaceName": '
+                '"GigabitEthernet0/0/0/{}"}}).Latest.GenericCounters'.format(i))
+        value = {
+            "PacketsReceived": 1234567 + i,
+            "BytesReceived": 987654321 + i,
+            "PacketsSent": 7654321 + i,
+            "BytesSent": 123456789 + i,
+            "MulticastPacketsReceived": i,
+            "BroadcastPacketsReceived": 2 * i,
+            "InputDrops": 0,
+            "InputErrors": 0,
+            "LastDataTime": 1453226640,
+            "LastDiscontinuityTime": 1453100000,
+            "Availability": True,
+        }
+        result.append([path, value])
+    return result
+
+
+class FakeServerTransport(_transport.Transport):
+    """
+    Transport which answers requests in-process.
+
+    Each `get` request is answered with `result`. Batches are answered with a
+    single batch response unless `support_batches` is false, in which case
+    they're rejected as the JSON-RPC spec suggests.
+
+    The number of calls to `write()` and `read()` are counted, in order to show
+    how much per-message overhead a real transport would incur.
+
+    """
+
+    def __init__(self, result=(), support_batches=True, read_size=None):
+        super(FakeServerTransport, self).__init__()
+        # The result is encoded up-front, so that it doesn't count towards
+        # the time or memory used by the client.
+        self._result_json = json.dumps(list(result)).encode("ascii")
+        self._support_batches = support_batches
+        self._read_size = read_size
+        self._state = _transport.State.DISCONNECTED
+
+        # Data waiting to be read, as a queue of byte strings. `_out_offset`
+        # is the offset into the first of them of the next byte to be read.
+        self._out = collections.deque()
+        self._out_offset = 0
+        self._read_future = None
+        self.num_writes = 0
+        self.num_reads = 0
+
+    @property
+    def state(self):
+        return self._state
+
+    def connect(self, loop):
+        self._loop = loop
+        self._state = _transport.State.CONNECTED
+        fut = _async.Future(loop=loop)
+        fut.set_result(None)
+        return fut
+
+    def disconnect(self):
+        self._state = _transport.State.DISCONNECTED
+        if self._read_future is not None and not self._read_future.done():
+            self._read_future.set_exception(_transport.TransportNotConnected)
+        fut = _async.Future(loop=self._loop)
+        fut.set_result(None)
+        return fut
+
+    def _respond(self, req):
+        return [('{{"jsonrpc": "2.0", "id": {}, "result": '.format(req["id"])
+                                                           .encode("ascii")),
+                self._result_json,
+                b"}"]
+
+    def write(self, data):
+        self.num_writes += 1
+        for line in data.decode("ascii").splitlines():
+            msg = json.loads(line)
+            if not isinstance(msg, list):
+                resp = self._respond(msg)
+            elif self._support_batches:
+                resp = [b"["]
+                for i, req in enumerate(msg):
+                    if i:
+                        resp.append(b", ")
+                    resp.extend(self._respond(req))
+                resp.append(b"]")
+            else:
+                resp = [b'{"jsonrpc": "2.0", "id": null, "error": '
+                        b'{"code": -32600, "message": "Invalid Request"}}']
+            self._out.extend(resp)
+            self._out.append(b"\n")
+        self._complete_read()
+
+    def _take_output(self):
+        """Take up to `read_size` bytes of pending output."""
+        if self._read_size is None and self._out_offset == 0:
+            d = b"".join(self._out)
+            self._out.clear()
+            return d
+
+        chunks = []
+        remaining = self._read_size
+        while self._out and (remaining is None or remaining > 0):
+            head = self._out[0]
+            end = len(head)
+            if remaining is not None:
+                end = min(end, self._out_offset + remaining)
+                remaining -= end - self._out_offset
+            chunks.append(head[self._out_offset:end])
+            if end == len(head):
+                self._out.popleft()
+                self._out_offset = 0
+            else:
+                self._out_offset = end
+        return b"".join(chunks)
+
+    def _complete_read(self):
+        if (self._out and self._read_future is not None and
+                                               not self._read_future.done()):
+            self._read_future.set_result(self._take_output())
+            self._read_future = None
+
+    def read(self):
+        if self._state is not _transport.State.CONNECTED:
+            raise _transport.TransportNotConnected
+        self.num_reads += 1
+        self._read_future = _async.Future(loop=self._loop)
+        fut = self._read_future
+        self._complete_read()
+        return fut
+
+
+def timed(func, repeat=3):
+    """Return the best wall-clock time, in seconds, of `repeat` calls."""
+    best = None
+    for _ in range(repeat):
+        start = time.time()
+        func()
+        elapsed = time.time() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
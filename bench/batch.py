@@ -0,0 +1,60 @@
+# -----------------------------------------------------------------------------
+# batch.py - Benchmark JSON-RPC batching
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare one request per line against JSON-RPC batches.
+
+Issues `get_many()` calls for many small paths, with and without
+`batch_requests`, and reports the time taken and the number of transport
+writes.
+
+"""
+
+
+import logging
+
+import xrm2m
+from xrm2m import _async
+
+from . import _utils
+
+
+def _run(num_requests, batch_requests, support_batches=True):
+    loop = _async.get_event_loop()
+    transport = _utils.FakeServerTransport(
+                           result=[["RootOper.SystemTime.Uptime", 12345]],
+                           support_batches=support_batches)
+    conn = xrm2m.connect(transport, loop=loop, batch_requests=batch_requests)
+    paths = [xrm2m.RootOper.SystemTime.Uptime] * num_requests
+
+    elapsed = _utils.timed(lambda: conn.get_many(paths))
+    conn.disconnect()
+    return elapsed, transport.num_writes
+
+
+def main():
+    # The rejected case logs a warning on each fallback.
+    logging.basicConfig(level=logging.ERROR)
+    print("{:>9} {:>22} {:>22} {:>22}".format(
+                    "requests", "per-line s (writes)", "batched s (writes)",
+                    "rejected s (writes)"))
+    for num_requests in (10, 100, 1000, 5000):
+        results = [_run(num_requests, False),
+                   _run(num_requests, True),
+                   _run(num_requests, True, support_batches=False)]
+        print("{:>9} {}".format(num_requests, " ".join(
+                "{:>13.4f} ({:>6})".format(elapsed, writes)
+                for elapsed, writes in results)))
+
+
+if __name__ == "__main__":
+    main()
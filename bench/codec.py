@@ -0,0 +1,57 @@
+# -----------------------------------------------------------------------------
+# codec.py - Benchmark JSON codecs
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare the decode throughput of each installed JSON codec.
+
+Each codec decodes `get` response lines of various sizes, resembling a walk of
+interface statistics. Throughput is reported in MB of JSON per second.
+
+"""
+
+
+import json
+
+from xrm2m import _codec
+
+from . import _utils
+
+
+def _make_response_line(num_pairs):
+    response = {"jsonrpc": "2.0", "id": 1,
+                "result": _utils.make_get_result(num_pairs)}
+    return json.dumps(response).encode("ascii")
+
+
+def main():
+    names = _codec.available_codecs()
+    print("{:>8} {}".format("pairs", " ".join(
+                                     "{:>14}".format(name) for name in names)))
+    for num_pairs in (10, 1000, 20000):
+        line = _make_response_line(num_pairs)
+        repeat = max(1, 20000 // num_pairs)
+        rates = []
+        for name in names:
+            codec = _codec.get_codec(name)
+
+            def decode():
+                for _ in range(repeat):
+                    codec.loads(line)
+
+            elapsed = _utils.timed(decode)
+            rates.append(len(line) * repeat / elapsed / 1e6)
+        print("{:>8} {}".format(num_pairs, " ".join(
+                                     "{:>9.1f} MB/s".format(r) for r in rates)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# framing.py - Benchmark splitting received data into lines
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare the connection's line framing against the previous approach.
+
+A single response line of increasing size is fed in 1KB chunks, as read by
+`SubProcessTransport`. The previous approach, of appending each decoded chunk
+to a string and re-splitting it, is quadratic in the line length, so it is
+only run for the smaller sizes.
+
+"""
+
+
+from xrm2m import _framing
+
+from . import _utils
+
+
+_CHUNK_SIZE = 1024
+
+
+# Largest line size for which the previous approach is run.
+_MAX_SPLIT_SIZE = 4 * 1024 * 1024
+
+
+def _frame_split(chunks):
+    """Frame lines as the read loop used to."""
+    lines = []
+    partial_line = ""
+    for d in chunks:
+        partial_line += d.decode("ascii")
+        split = partial_line.split("\n")
+        partial_line = split[-1]
+        lines.extend(split[:-1])
+    return lines
+
+
+def _frame_framer(chunks):
+    """Frame lines with a `LineFramer`, decoding each complete line."""
+    lines = []
+    framer = _framing.LineFramer()
+    for d in chunks:
+        framer.feed(d)
+        line = framer.pop_line()
+        while line is not None:
+            lines.append(line.decode("ascii"))
+            line = framer.pop_line()
+    return lines
+
+
+def _make_chunks(size):
+    line = (b"x" * (size - 1)) + b"\n"
+    return [line[i:i + _CHUNK_SIZE] for i in range(0, len(line), _CHUNK_SIZE)]
+
+
+def main():
+    print("{:>8} {:>12} {:>12}".format("line MB", "split s", "framer s"))
+    for size_mb in (0.25, 1, 4, 16, 64):
+        size = int(size_mb * 1024 * 1024)
+        chunks = _make_chunks(size)
+        if size <= _MAX_SPLIT_SIZE:
+            split_time = "{:>12.4f}".format(
+                           _utils.timed(lambda: _frame_split(chunks), repeat=1))
+        else:
+            split_time = "{:>12}".format("-")
+        framer_time = _utils.timed(lambda: _frame_framer(chunks))
+        print("{:>8} {} {:>12.4f}".format(size_mb, split_time, framer_time))
+
+
+if __name__ == "__main__":
+    main()
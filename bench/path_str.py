@@ -0,0 +1,81 @@
+# -----------------------------------------------------------------------------
+# path_str.py - Benchmark converting paths to strings
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare `str(path)` using the key encoder against the previous approach.
+
+Paths resemble those for interface configuration and statistics, keyed by
+interface name, plus some with a description key that needs escaping. A new
+set of paths is built (untimed) for each run, so that cached strings aren't
+reused.
+
+"""
+
+
+from xrm2m import _path
+
+from . import _utils
+
+
+_NUM_PATHS = 20000
+
+
+def _encode_string_per_char(s):
+    """Encode a string as `PathElement` used to."""
+    return '"{}"'.format(''.join(_path.PathElement._encode_char(c)
+                                 for c in s))
+
+
+def _make_paths(keys):
+    intf_cfg = _path.RootCfg.InterfaceConfiguration
+    stats = _path.RootOper.InfraStatistics.Interface
+    return [path
+            for key in keys
+            for path in (intf_cfg("act", key).Description,
+                         stats(key).Latest.GenericCounters)]
+
+
+def _time_str(paths):
+    """Return the time taken to convert each of `paths` to a string."""
+    return _utils.timed(lambda: [str(path) for path in paths], repeat=1)
+
+
+def main():
+    workloads = (
+        ("interface names", ["GigabitEthernet0/0/0/{}".format(i)
+                             for i in range(_NUM_PATHS)]),
+        ("descriptions", ['To "BOS"\tport {}\n'.format(i)
+                          for i in range(_NUM_PATHS)]),
+    )
+    encoders = (
+        ("per-char", staticmethod(_encode_string_per_char)),
+        ("current", _path.PathElement.__dict__["_encode_string"]),
+    )
+    print("{:>16} {}".format("keys", " ".join(
+                                "{:>14}".format(name) for name, _ in encoders)))
+    for workload, keys in workloads:
+        rates = []
+        for _, encoder in encoders:
+            saved = _path.PathElement.__dict__["_encode_string"]
+            _path.PathElement._encode_string = encoder
+            try:
+                elapsed = min(_time_str(_make_paths(keys)) for _ in range(3))
+            finally:
+                _path.PathElement._encode_string = saved
+            rates.append(2 * len(keys) / elapsed / 1e3)
+        print("{:>16} {}".format(workload, " ".join(
+                                    "{:>6.1f} kpath/s".format(r)
+                                    for r in rates)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -----------------------------------------------------------------------------
+# results.py - Benchmark lazy get results
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare eagerly parsing the paths of a `get` result against
+:class:`.PathValuePairs`.
+
+The consumer reads every value of the result, and the path of one pair, as a
+typical poller does.
+
+"""
+
+
+import xrm2m
+
+from . import _utils
+
+
+def _eager(raw):
+    pairs = [(xrm2m.Path.from_str(p), v) for p, v in raw]
+    total = sum(v["BytesReceived"] for _, v in pairs)
+    return total, pairs[0][0]
+
+
+def _lazy(raw):
+    pairs = xrm2m.PathValuePairs(raw)
+    total = sum(v["BytesReceived"] for v in pairs.values())
+    return total, pairs[0][0]
+
+
+def main():
+    print("{:>8} {:>12} {:>12}".format("pairs", "eager s", "lazy s"))
+    for num_pairs in (100, 1000, 10000):
+        raw = _utils.make_get_result(num_pairs)
+        assert _eager(raw) == _lazy(raw)
+        print("{:>8} {:>12.4f} {:>12.4f}".format(
+                                        num_pairs,
+                                        _utils.timed(lambda: _eager(raw)),
+                                        _utils.timed(lambda: _lazy(raw))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# -----------------------------------------------------------------------------
+# stream.py - Benchmark streamed gets
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Compare `get()` against `iter_get()` for large responses.
+
+Reports the time taken and the peak memory allocated while reading every pair
+of a large response, which is delivered in 64KB reads. Peak memory is measured
+with `tracemalloc`, so requires Python 3.4+.
+
+Also reports the time taken to decode a single large pair, fed to the
+streaming decoder in 1KB chunks as read by `SubProcessTransport`, which should
+grow linearly with the size of the pair.
+
+"""
+
+
+import json
+import tracemalloc
+
+import xrm2m
+from xrm2m import _async
+from xrm2m import _stream
+
+from . import _utils
+
+
+_READ_SIZE = 64 * 1024
+
+
+# Size of the chunks in which a single large pair is fed to the decoder.
+_CHUNK_SIZE = 1024
+
+
+def _run(num_pairs, streamed):
+    loop = _async.get_event_loop()
+    transport = _utils.FakeServerTransport(
+                               result=_utils.make_get_result(num_pairs),
+                               read_size=_READ_SIZE)
+    conn = xrm2m.connect(transport, loop=loop)
+    path = xrm2m.RootOper.InfraStatistics.Interface
+
+    def consume():
+        pairs = conn.iter_get(path) if streamed else conn.get(path)
+        count = 0
+        for _ in pairs:
+            count += 1
+        assert count == num_pairs
+
+    elapsed = _utils.timed(consume)
+
+    tracemalloc.start()
+    consume()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    conn.disconnect()
+    return elapsed, peak
+
+
+def _decode_pair(chunks):
+    pairs = []
+    decoder = _stream.PairsDecoder(pairs.append)
+    for chunk in chunks:
+        decoder.feed(chunk)
+    assert len(pairs) == 1
+
+
+def _make_pair_chunks(size):
+    """Return a response line with one pair of about `size`, in chunks."""
+    value = [["x" * 90] for _ in range(size // 100)]
+    line = json.dumps([["RootOper.A", value]])[1:] + "}\n"
+    return [line[i:i + _CHUNK_SIZE] for i in range(0, len(line), _CHUNK_SIZE)]
+
+
+def main():
+    print("{:>8} {:>22} {:>22}".format("pairs", "get s (peak MB)",
+                                       "iter_get s (peak MB)"))
+    for num_pairs in (1000, 5000, 20000):
+        results = [_run(num_pairs, False), _run(num_pairs, True)]
+        print("{:>8} {}".format(num_pairs, " ".join(
+                "{:>13.3f} ({:>6.1f})".format(elapsed, peak / 1e6)
+                for elapsed, peak in results)))
+
+    print()
+    print("{:>8} {:>12}".format("pair MB", "decode s"))
+    for size_mb in (1, 2, 4, 8):
+        chunks = _make_pair_chunks(size_mb * 1024 * 1024)
+        print("{:>8} {:>12.4f}".format(
+                        size_mb, _utils.timed(lambda: _decode_pair(chunks))))
+
+
+if __name__ == "__main__":
+    main()
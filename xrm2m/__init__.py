@@ -17,16 +17,36 @@ __all__ = (
     'RootCfg',
     'RootOper',
 
+    # _pathset
+    'PathMap',
+    'PathSet',
+
+    # _results
+    'PathValuePairs',
+
     # _schema
     'Datatype',
     'Version',
     'MAX_VERSION',
     'UNVERSIONED',
+    'LazySchemaClass',
     'SchemaClass',
     'SchemaClassCategory',
     'SchemaParam',
     'SchemaParamStatus',
 
+    # _cache
+    'CacheStats',
+    'ChildrenCache',
+    'CLICache',
+    'PathInterner',
+    'ResponseCache',
+    'SchemaCache',
+    'SchemaStore',
+
+    # _crawl
+    'SchemaCrawler',
+
     # _conn
     'async',
     'AsyncConnection',
@@ -36,6 +56,13 @@ __all__ = (
     'ConnectionState',
     'sync',
 
+    # _fleet
+    'Fleet',
+    'FleetResult',
+
+    # _pool
+    'ConnectionPool',
+
     #_defs
     'Change',
     'ChangeDetails',
@@ -72,6 +99,7 @@ __all__ = (
     'PathKeyContentError',
     'PathKeyStructureError',
     'PathStringFormatError',
+    'RequestTimeoutError',
     'UnexpectedJSONError',
     'ValueContentError',
     'ValueStructureError',
@@ -83,9 +111,21 @@ __all__ = (
     'BagListArgs',
     'BagParamStatus',
     'BagType',
+    'BagTypeRegistry',
+    'BagTypeRegistryStats',
     'BagUnionArgs',
 )
 
+from ._cache import (
+    CacheStats,
+    ChildrenCache,
+    CLICache,
+    PathInterner,
+    ResponseCache,
+    SchemaCache,
+    SchemaStore,
+)
+
 from ._conn import (
     async,
     AsyncConnection,
@@ -96,6 +136,10 @@ from ._conn import (
     sync,
 )
 
+from ._crawl import (
+    SchemaCrawler,
+)
+
 from ._defs import (
     Change,
     ChangeDetails,
@@ -108,6 +152,15 @@ from ._defs import (
     WILDCARD_ALL,
 )
 
+from ._fleet import (
+    Fleet,
+    FleetResult,
+)
+
+from ._pool import (
+    ConnectionPool,
+)
+
 from ._path import (
     Path,
     PathElement,
@@ -116,11 +169,21 @@ from ._path import (
     RootOper,
 )
 
+from ._pathset import (
+    PathMap,
+    PathSet,
+)
+
+from ._results import (
+    PathValuePairs,
+)
+
 from ._schema import (
     Datatype,
     Version,
     MAX_VERSION,
     UNVERSIONED,
+    LazySchemaClass,
     SchemaClass,
     SchemaClassCategory,
     SchemaParam,
@@ -153,6 +216,7 @@ from ._errors import (
     PathKeyContentError,
     PathKeyStructureError,
     PathStringFormatError,
+    RequestTimeoutError,
     UnexpectedJSONError,
     ValueContentError,
     ValueStructureError,
@@ -165,5 +229,7 @@ from ._bag import (
     BagListArgs,
     BagParamStatus,
     BagType,
+    BagTypeRegistry,
+    BagTypeRegistryStats,
     BagUnionArgs,
 )
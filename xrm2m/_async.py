@@ -27,6 +27,7 @@ coroutines.
 """
 
 __all__ = (
+    'CancelledError',
     'coroutine',
     'From',
     'Future',
@@ -37,9 +38,13 @@ __all__ = (
     'iscoroutinefunction',
     'LOGGER_NAME',
     'make_task',
+    'ResultStream',
     'Return',
     'run_until_callbacks_invoked',
+    'Semaphore',
+    'shield',
     'Task',
+    'wait_all',
     'wrap_external_coro',
 )
 
@@ -85,6 +90,9 @@ class Future(_asynclib.Future):
             super(Future, self).__init__(event_loop=loop)
 
 
+CancelledError = _asynclib.CancelledError
+
+
 def get_event_loop():
     # xos.async has no default event loop; callers must explicitly provide one
     # to functions/classes with a loop argument.
@@ -172,6 +180,11 @@ class Task(Future):
         self._loop.call_soon(self._step)
         self._id = id
 
+        # The future the coroutine is waiting on, if any, and whether the
+        # coroutine should be cancelled when it's next resumed. See `cancel()`.
+        self._fut_waiter = None
+        self._must_cancel = False
+
         Task.running.append(self)
         self.add_done_callback(self._remove_from_running)
 
@@ -181,7 +194,25 @@ class Task(Future):
 
     def __repr__(self):
         return "{}(id={!r})".format(type(self).__name__, self._id)
-        
+
+    def cancel(self):
+        """
+        Request that the task be cancelled.
+
+        As for asyncio tasks, :exc:`.CancelledError` is thrown into the
+        coroutine, by cancelling the future it's waiting on (or when it's next
+        resumed, if that future has already completed). The task is cancelled
+        once the coroutine raises the exception, which it may instead catch.
+
+        """
+        if self.done():
+            return False
+        if self._fut_waiter is not None and self._fut_waiter.cancel():
+            # `_sub_future_done()` throws the exception into the coroutine.
+            return True
+        self._must_cancel = True
+        return True
+
     @staticmethod
     def _flatten_coro(coro):
         """
@@ -223,7 +254,7 @@ class Task(Future):
                     coro_or_future = coros[-1].send(val)
                 else:
                     coro_or_future = coros[-1].throw(*exc)
-            except Exception as e:
+            except (Exception, CancelledError) as e:
                 val, exc = None, None
                 if len(coros) == 1:
                     raise
@@ -238,7 +269,7 @@ class Task(Future):
                                  isinstance(coro_or_future, _asynclib.Future)):
                     try:
                         val = yield coro_or_future
-                    except Exception:
+                    except (Exception, CancelledError):
                         exc = sys.exc_info()
                 elif iscoroutine(coro_or_future):
                     coros += [coro_or_future]
@@ -247,6 +278,10 @@ class Task(Future):
                 coro_or_future = None
 
     def _step(self, value=None, exc=None):
+        self._fut_waiter = None
+        if self._must_cancel:
+            self._must_cancel = False
+            exc = CancelledError()
         try:
             # Send the result of the previously yielded Future (or None if this
             # is the first time entering the coroutine).
@@ -262,6 +297,8 @@ class Task(Future):
                 self.set_result(e.args[0])
             else:
                 self.set_result(None)
+        except CancelledError:
+            super(Task, self).cancel()
         except Exception as e:
             # Handle the coroutine raising an exception (either directly or
             # through an exception not being caught by calling `.throw()` in
@@ -292,6 +329,7 @@ class Task(Future):
             else:
                 assert False
 
+            self._fut_waiter = sub_future
             sub_future.add_done_callback(self._sub_future_done)
         finally:
             # Avoid cyclic references from tracebacks.
@@ -306,7 +344,9 @@ class Task(Future):
         # because each `_sub_future_done` frame would keep a reference to its
         # enclosing `_step` frame, while the  next `_step` frame would keep a
         # reference to the `_sub_future_done` frame.
-        if f.exception():
+        if f.cancelled():
+            self._step(exc=CancelledError())
+        elif f.exception():
             self._step(exc=f.exception())
         else:
             self._step(value=f.result())
@@ -333,6 +373,285 @@ def make_task(meth):
     return decorated
 
 
+def shield(future, loop=None):
+    """
+    Return a future with the same outcome as another, which can be cancelled
+    without cancelling the other.
+
+    This allows several callers to wait on a shared future (eg. a request made
+    on behalf of them all) such that one caller being cancelled doesn't affect
+    the others.
+
+    """
+    outer = Future(loop)
+
+    def on_done(inner):
+        if outer.done():
+            return
+        if inner.cancelled():
+            outer.cancel()
+        elif inner.exception() is not None:
+            outer.set_exception(inner.exception())
+        else:
+            outer.set_result(inner.result())
+
+    future.add_done_callback(on_done)
+    return outer
+
+
+@coroutine
+def wait_all(futures):
+    """
+    Wait for every one of a list of futures, and return their results.
+
+    All of the futures are waited for even if one fails, so that none are left
+    running once this completes. If any fail, the exception of the first to
+    fail (in list order) is raised.
+
+    """
+    results = []
+    first_exc = None
+    for future in futures:
+        try:
+            result = yield From(future)
+        except Exception as e:
+            result = None
+            if first_exc is None:
+                first_exc = e
+        results.append(result)
+
+    if first_exc is not None:
+        raise first_exc
+
+    raise Return(results)
+
+
+class Semaphore(object):
+    """
+    Limit the number of concurrent users of a resource.
+
+    :meth:`.acquire` is a coroutine which completes once the semaphore has
+    been acquired, and each acquisition must be matched by a call to
+    :meth:`.release`. Waiters acquire the semaphore in the order in which they
+    called :meth:`.acquire`.
+
+    """
+
+    def __init__(self, value, loop=None):
+        if value < 1:
+            raise ValueError("Semaphore value must be at least 1")
+        if loop is None:
+            loop = get_event_loop()
+        self._loop = loop
+        self._value = value
+
+        # Futures returned by `acquire()` which have not yet completed.
+        self._waiters = collections.deque()
+
+    def locked(self):
+        """True if a call to :meth:`.acquire` would have to wait."""
+        return self._value == 0
+
+    @coroutine
+    def acquire(self):
+        """
+        Wait until the semaphore is acquired.
+
+        If the task waiting is cancelled after :meth:`.release` has woken it,
+        but before it runs, the semaphore is passed on to the next waiter
+        rather than being lost.
+
+        """
+        if self._value > 0:
+            self._value -= 1
+            return
+        waiter = Future(self._loop)
+        self._waiters.append(waiter)
+        try:
+            yield From(waiter)
+        except CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+
+    def release(self):
+        """Release the semaphore, waking the longest waiting acquirer."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            # Skip waiters which have been cancelled.
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._value += 1
+
+
+class ResultStream(object):
+    """
+    A sequence of results which are produced asynchronously.
+
+    The producer calls :meth:`.put` for each result as it becomes available,
+    and then :meth:`.finish` once there are no more results (or an error has
+    occurred).
+
+    Consumers retrieve results in one of the following ways:
+      - In a compatible coroutine, by yielding the future returned by
+        :meth:`.next_item`. The future's result is `None` once the stream is
+        exhausted, so `None` must not be put into the stream.
+      - On Python 3.5+, with `async for`.
+      - In synchronous code, by iterating over :meth:`.iter_sync`.
+
+    """
+
+    def __init__(self, loop=None):
+        if loop is None:
+            loop = get_event_loop()
+        self._loop = loop
+
+        # Results which have been put, but not yet consumed.
+        self._items = collections.deque()
+
+        # Set by `finish()`. `_exc` is raised to the consumer once all results
+        # before it have been consumed.
+        self._finished = False
+        self._exc = None
+
+        # Set by `close()`. Further results are discarded.
+        self._closed = False
+
+        # Future returned to a consumer which is waiting for the next result,
+        # and the exception with which to complete it when the stream is
+        # exhausted (None to complete it with a `None` result).
+        self._waiter = None
+        self._waiter_end_exc = None
+
+        # Future returned by `wait_consumed()`.
+        self._consumed_future = None
+
+    def put(self, item):
+        """Add a result to the stream."""
+        assert item is not None
+        assert not self._finished, "Result put into a finished stream"
+        if self._closed:
+            return
+
+        if self._waiter is not None:
+            waiter, self._waiter = self._waiter, None
+            waiter.set_result(item)
+        else:
+            self._items.append(item)
+
+    def finish(self, exc=None):
+        """
+        Mark the stream as complete.
+
+        If `exc` is passed, it is raised to the consumer after all preceding
+        results have been consumed. Calls after the first have no effect.
+
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self._exc = exc
+
+        if self._waiter is not None:
+            waiter, self._waiter = self._waiter, None
+            self._complete_at_end(waiter, self._waiter_end_exc)
+
+    @property
+    def finished(self):
+        """True if :meth:`.finish` has been called."""
+        return self._finished
+
+    @property
+    def buffered(self):
+        """The number of results which have been put, but not consumed."""
+        return len(self._items)
+
+    def wait_consumed(self):
+        """
+        Return a future which completes when the consumer next reads from (or
+        closes) the stream.
+
+        This allows the producer to wait for the consumer to catch up.
+
+        """
+        if self._consumed_future is None:
+            self._consumed_future = Future(self._loop)
+        return self._consumed_future
+
+    def _on_consumed(self):
+        if self._consumed_future is not None:
+            fut, self._consumed_future = self._consumed_future, None
+            if not fut.done():
+                fut.set_result(None)
+
+    def close(self):
+        """
+        Discard any unconsumed results, and any further results put.
+
+        This should be called if the consumer stops consuming before the
+        stream is exhausted.
+
+        """
+        self._closed = True
+        self._items.clear()
+        self._on_consumed()
+
+    def _complete_at_end(self, fut, end_exc):
+        if self._exc is not None:
+            fut.set_exception(self._exc)
+        elif end_exc is not None:
+            fut.set_exception(end_exc)
+        else:
+            fut.set_result(None)
+
+    def _next(self, end_exc):
+        assert self._waiter is None, "Concurrent reads from stream"
+        self._on_consumed()
+        fut = Future(self._loop)
+        if self._items:
+            fut.set_result(self._items.popleft())
+        elif self._finished:
+            self._complete_at_end(fut, end_exc)
+        else:
+            self._waiter = fut
+            self._waiter_end_exc = end_exc
+        return fut
+
+    def next_item(self):
+        """
+        Return a future which completes with the next result.
+
+        The future's result is `None` if the stream is exhausted. If the
+        stream was finished with an exception, the future raises it.
+
+        """
+        return self._next(None)
+
+    def iter_sync(self):
+        """
+        Iterate over the stream's results, running the event loop as needed.
+
+        """
+        try:
+            while True:
+                fut = self.next_item()
+                self._loop.run_until_complete(fut)
+                item = fut.result()
+                if item is None:
+                    break
+                yield item
+        finally:
+            self.close()
+
+    if sys.version_info >= (3, 5):
+        def __aiter__(self):
+            return self
+
+        def __anext__(self):
+            return self._next(StopAsyncIteration())
+
+
 # ensure_future doesn't exist in old versions of Python. Also ensure_future on
 # xos.async accepts an `event_loop` argument rather than `loop`. Fix these
 # issues here by making a consistent `_asynclib_ensure_future` function which
@@ -22,11 +22,18 @@ __all__ = (
     'BagListArgs',
     'BagParamStatus',
     'BagType',
+    'BagTypeRegistry',
+    'BagTypeRegistryStats',
     'bag_types_from_json',
+    'bag_types_to_json',
     'BagUnionArgs',
 )
 
 
+import collections
+import enum
+import sys
+
 from . import _errors
 from . import _utils
 
@@ -45,6 +52,11 @@ class BagListArgs(_shared.bag.BagListArgs):
         return cls(fixed_length=d['fixed_length'],
                    max_length=d['max_length'])
 
+    def _to_json(self):
+        """Convert to the corresponding JSON object."""
+        return {'fixed_length': self.fixed_length,
+                'max_length': self.max_length}
+
 
 @_utils.copy_docstring_from_parent
 class BagParam(_shared.bag.BagParam):
@@ -67,6 +79,19 @@ class BagParam(_shared.bag.BagParam):
                    status=status,
                    status_args=status_args)
 
+    def _to_json(self):
+        """Convert to the corresponding JSON object."""
+        if self.status_args is not None:
+            status_args = [arg._to_json() for arg in self.status_args]
+        else:
+            status_args = None
+        return {'name': self.name,
+                'description': self.description,
+                'datatype': self.datatype.name,
+                'datatype_name': self.datatype_name,
+                'status': self.status.name,
+                'status_args': status_args}
+
 
 @_utils.copy_docstring_from_parent
 class BagEnumElement(_shared.bag.BagEnumElement):
@@ -76,6 +101,11 @@ class BagEnumElement(_shared.bag.BagEnumElement):
         return cls(name=d['name'],
                    description=d['description'])
 
+    def _to_json(self):
+        """Convert to the corresponding JSON object."""
+        return {'name': self.name,
+                'description': self.description}
+
 
 @_utils.copy_docstring_from_parent
 class BagUnionArgs(_shared.bag.BagUnionArgs):
@@ -84,6 +114,10 @@ class BagUnionArgs(_shared.bag.BagUnionArgs):
         """Create from the corresponding JSON object."""
         return cls(discriminator=BagParam._from_json(d['discriminator']))
 
+    def _to_json(self):
+        """Convert to the corresponding JSON object."""
+        return {'discriminator': self.discriminator._to_json()}
+
 
 @_utils.copy_docstring_from_parent
 class BagType(_shared.bag.BagType):
@@ -121,19 +155,193 @@ class BagType(_shared.bag.BagType):
                    children=children,
                    datatype_args=datatype_args)
 
+    def _to_json(self):
+        """Convert to the corresponding JSON object."""
+        if self.datatype_args is not None:
+            datatype_args = self.datatype_args._to_json()
+        else:
+            datatype_args = None
+        return {'name': self.name,
+                'description': self.description,
+                'datatype': self.datatype.name,
+                'children': [child._to_json() for child in self.children],
+                'datatype_args': datatype_args}
+
 
-def bag_types_from_json(d):
+class BagTypeRegistryStats(collections.namedtuple(
+        "_BagTypeRegistryStatsBase",
+        ["types", "hits", "bytes_saved", "maxsize"])):
+    """
+    Statistics for a :class:`.BagTypeRegistry`, as returned by
+    :meth:`.BagTypeRegistry.stats`.
+
+    .. attribute:: types
+
+        Number of distinct bag types held by the registry.
+
+    .. attribute:: hits
+
+        Number of bag types which were shared with one already in the registry,
+        rather than created.
+
+    .. attribute:: bytes_saved
+
+        Estimate of the memory, in bytes, that would have been used by the bag
+        types which were shared. The registry's own overhead, of a few
+        hundred bytes for each bag type held, is not subtracted.
+
+    .. attribute:: maxsize
+
+        Maximum number of bag types held by the registry, or `None` if
+        unbounded.
+
+    """
+
+    __slots__ = ()
+
+
+def _sizeof(obj):
+    """
+    Estimate the memory used by a bag type, or one of its parts, counting
+    only the objects which aren't shared with other bag types.
+
+    """
+    if obj is None or isinstance(obj, (bool, enum.Enum)):
+        return 0
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_sizeof(item) for item in obj)
+    return size
+
+
+class BagTypeRegistry(object):
+    """
+    Registry of :class:`.BagType` objects, shared between schema classes.
+
+    Many schema classes use the same bags. A registry passed to
+    :func:`.connect` (or a :class:`.SchemaCache`) ensures that the
+    :attr:`~.SchemaClass.bag_types` of every schema class made with it share a
+    single :class:`.BagType` object for each distinct bag, identified by its
+    name and contents. Bag types are immutable, so sharing them is safe.
+
+    Example::
+
+        bag_registry = BagTypeRegistry()
+        conn = connect_async(transport, bag_registry=bag_registry)
+        index = loop.run_until_complete(SchemaCrawler(conn).crawl())
+        print(bag_registry.stats())
+
+    """
+
+    def __init__(self, maxsize=10000):
+        """
+        Create an empty registry.
+
+        :param maxsize:
+            Maximum number of bag types to hold. Once exceeded, the bag types
+            with the least recently used name are dropped from the registry
+            (but not from the schema classes sharing them). `None` means no
+            limit.
+
+        """
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Registry size must be at least 1")
+        self._maxsize = maxsize
+
+        # For each bag type name, least recently used first, a list of
+        # `(bag_type, size)` tuples: a distinct bag type with that name, and
+        # its estimated size. Bags with the same name almost always have the
+        # same contents, so a lookup is usually a single comparison.
+        self._types = collections.OrderedDict()
+        self._len = 0
+        self._hits = 0
+        self._bytes_saved = 0
+
+    def bag_types_from_json(self, d):
+        """
+        Convert a JSON `bag_types` field into structured bag info, as for
+        :func:`.bag_types_from_json`, sharing bag types with the registry.
+
+        """
+        return {name: self._bag_type_from_json(json_bag_type)
+                                          for name, json_bag_type in d.items()}
+
+    def _bag_type_from_json(self, d):
+        # The new bag type is compared with those already held, rather than
+        # keeping anything derived from the JSON, so that the registry uses
+        # no more memory than the bag types it shares.
+        new_bag_type = BagType._from_json(d)
+
+        # Re-insert the name's entries to mark them most recently used.
+        entries = self._types.pop(new_bag_type.name, [])
+        self._types[new_bag_type.name] = entries
+        for bag_type, size in entries:
+            if bag_type == new_bag_type:
+                self._hits += 1
+                self._bytes_saved += size
+                return bag_type
+
+        bag_type = new_bag_type
+        entries.append((bag_type, _sizeof(bag_type)))
+        self._len += 1
+        while self._maxsize is not None and self._len > self._maxsize:
+            _, evicted = self._types.popitem(last=False)
+            self._len -= len(evicted)
+        return bag_type
+
+    def clear(self):
+        """Remove every bag type from the registry. Statistics are kept."""
+        self._types.clear()
+        self._len = 0
+
+    def stats(self):
+        """Return a :class:`.BagTypeRegistryStats` for the registry."""
+        return BagTypeRegistryStats(types=self._len, hits=self._hits,
+                                    bytes_saved=self._bytes_saved,
+                                    maxsize=self._maxsize)
+
+    def __len__(self):
+        return self._len
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__,
+                               ", ".join("{}={}".format(k, v) for k, v in
+                                         self.stats()._asdict().items()))
+
+
+def bag_types_from_json(d, registry=None):
     """
     Convert a JSON `bag_types` field into structured bag info.
 
     :param d:
         The JSON object to be converted.
 
+    :param registry:
+        Optional :class:`.BagTypeRegistry` from which to share bag types.
+
     :returns:
         `dict` in the format required by :attribute:`.SchemaClass.bag_types`.
 
     """
 
+    if registry is not None:
+        return registry.bag_types_from_json(d)
     return {name: BagType._from_json(json_bag_type)
                                           for name, json_bag_type in d.items()}
 
+
+def bag_types_to_json(bag_types):
+    """
+    Convert structured bag info into a JSON `bag_types` field.
+
+    This is the inverse of :func:`.bag_types_from_json`.
+
+    :param bag_types:
+        `dict` in the format of :attribute:`.SchemaClass.bag_types`.
+
+    :returns:
+        The JSON object.
+
+    """
+
+    return {name: bag_type._to_json() for name, bag_type in bag_types.items()}
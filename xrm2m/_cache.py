@@ -0,0 +1,916 @@
+# -----------------------------------------------------------------------------
+# _cache.py - Client-side caches of request results
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Client-side caches of request results.
+
+Caches are opt-in: a cache is created by the user and passed to
+:func:`.connect` (or :func:`.connect_async`), and the connection then answers
+requests from the cache where it can. A single cache may be shared by several
+connections, eg. the members of a :class:`.ConnectionPool`.
+
+A :class:`.SchemaCache` can additionally be backed by a :class:`.SchemaStore`,
+which keeps schema meta-data on disk so that it is shared between processes.
+
+"""
+
+__all__ = (
+    'CacheStats',
+    'ChildrenCache',
+    'CLICache',
+    'PathInterner',
+    'ResponseCache',
+    'SchemaCache',
+    'SchemaStore',
+)
+
+
+import collections
+import errno
+import functools
+import json
+import numbers
+import os
+import re
+
+from . import _async
+from . import _bag
+from . import _defs
+from . import _errors
+from . import _path
+from . import _schema
+from . import _utils
+
+from ._logging import logger
+
+
+class CacheStats(collections.namedtuple(
+                    "_CacheStatsBase", ["hits", "misses", "size", "maxsize"])):
+    """
+    Statistics for a cache, as returned by eg. :meth:`.SchemaCache.stats`.
+
+    .. attribute:: hits
+
+        Number of lookups which were answered from the cache.
+
+    .. attribute:: misses
+
+        Number of lookups which were not.
+
+    .. attribute:: size
+
+        Number of entries currently in the cache.
+
+    .. attribute:: maxsize
+
+        Maximum number of entries in the cache, or `None` if unbounded.
+
+    """
+
+    __slots__ = ()
+
+
+class _LRUCache(object):
+    """
+    Mapping with a bounded number of entries, evicting the least recently used
+    entry when full, and counting hits and misses.
+
+    """
+
+    def __init__(self, maxsize):
+        if maxsize is not None and maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self._maxsize = maxsize
+        self._entries = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def _lookup(self, key):
+        """Return the entry for `key`, or `None` if there is no such entry."""
+        try:
+            value = self._entries.pop(key)
+        except KeyError:
+            self._misses += 1
+            return None
+
+        # Re-insert the entry to mark it most recently used.
+        self._entries[key] = value
+        self._hits += 1
+        return value
+
+    def _insert(self, key, value):
+        self._entries.pop(key, None)
+        self._entries[key] = value
+        if self._maxsize is not None and len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove every entry from the cache. Statistics are not reset."""
+        self._entries.clear()
+
+    def stats(self):
+        """Return a :class:`.CacheStats` for the cache."""
+        return CacheStats(hits=self._hits, misses=self._misses,
+                          size=len(self._entries), maxsize=self._maxsize)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__,
+                               ", ".join("{}={}".format(k, v) for k, v in
+                                         self.stats()._asdict().items()))
+
+
+class _VersionedCache(_LRUCache):
+    """
+    Cache whose entries depend on the router's software version.
+
+    Each time a connection using the cache connects, it passes the router's
+    version to :meth:`.check_version`, which clears the cache if the version
+    has changed.
+
+    """
+
+    def __init__(self, maxsize):
+        super(_VersionedCache, self).__init__(maxsize)
+
+        # Version of the router that the entries were fetched from, or `None`
+        # if it isn't known.
+        self._version = None
+
+    @property
+    def version(self):
+        """
+        The :class:`.Version` of the router that the cache's entries were
+        fetched from, or `None` if no connection using the cache has
+        connected.
+
+        """
+        return self._version
+
+    def check_version(self, version):
+        """
+        Record the version of a router which the cache is used with, clearing
+        the cache if the version differs from that of its entries.
+
+        :param version:
+            The router's :class:`.Version`, or `None` if unknown, in which case
+            the cache is cleared.
+
+        :returns:
+            `True` if the cache was cleared.
+
+        """
+        changed = version is None or version != self._version
+        if changed:
+            self.clear()
+        self._version = version
+        return changed
+
+
+@_utils.copy_docstring_from_parent
+class SchemaCache(_VersionedCache):
+    """
+    Cache of :class:`.SchemaClass` objects, as returned by
+    :meth:`.Connection.get_schema`.
+
+    Schema meta-data doesn't depend on key values, so entries are keyed on the
+    path's element names only: `RootCfg.InterfaceConfiguration("act", "Gi0")`
+    and `RootCfg.InterfaceConfiguration` share a single entry.
+
+    The schema only changes when the router's software does, so the cache
+    records the router's version (see :meth:`.Connection.get_version`). Each
+    time a connection using the cache connects, the router's version is
+    checked, and the cache is cleared if it differs.
+
+    If the cache has a :class:`.SchemaStore`, then when the router's version
+    becomes known, the schema previously saved for that version is loaded from
+    the store, and lookups are answered from it too, as
+    :class:`.LazySchemaClass` objects. Schema classes fetched
+    from the router are written to the store by :meth:`.save`.
+
+    The cache is also used to normalize paths (see :meth:`.normalize_path`)
+    without making a request, where possible.
+
+    Schema classes in the cache share their bag types through a
+    :class:`.BagTypeRegistry` (see :attr:`.bag_registry`), which connections
+    using the cache also use for the schema classes they create.
+
+    Example::
+
+        schema_cache = SchemaCache(store=SchemaStore("/var/cache/xrm2m"))
+        conn = connect(transport, schema_cache=schema_cache)
+        for path in paths:
+            schema = conn.get_schema(path)
+        print(schema_cache.stats())
+        schema_cache.save()
+
+    """
+
+    def __init__(self, maxsize=4096, store=None, bag_registry=None):
+        """
+        Create an empty cache.
+
+        :param maxsize:
+            Maximum number of schema classes to hold. Once full, the least
+            recently used class is discarded. If `None`, the cache is
+            unbounded.
+
+        :param store:
+            Optional :class:`.SchemaStore` to load schema from, and save it to.
+
+        :param bag_registry:
+            :class:`.BagTypeRegistry` to share bag types with. By default, the
+            cache creates its own.
+
+        """
+        super(SchemaCache, self).__init__(maxsize)
+        self._store = store
+        if bag_registry is None:
+            bag_registry = _bag.BagTypeRegistry()
+        self._bag_registry = bag_registry
+
+        # Schema classes loaded from the store for the current version, as
+        # dicts keyed by path string. These are only converted into
+        # `SchemaClass` objects when looked up.
+        self._stored = {}
+
+        # Schema classes which have been added to the cache, but not yet saved
+        # to the store, keyed by path string.
+        self._unsaved = {}
+
+    @property
+    def bag_registry(self):
+        """The :class:`.BagTypeRegistry` shared by the cached classes."""
+        return self._bag_registry
+
+    @staticmethod
+    def _key(path):
+        return _path_names(path)
+
+    def lookup(self, path):
+        """
+        Return the cached schema class for a path, or `None` if there isn't
+        one.
+
+        :param path:
+            A :class:`.Path`, or its string representation. Key values are
+            ignored.
+
+        """
+        return self._lookup_key(self._key(path))
+
+    def _lookup_key(self, key):
+        if key not in self._entries:
+            path_str = ".".join(key)
+            if path_str in self._stored:
+                self._insert(key, _schema.LazySchemaClass.from_dict(
+                                      _path.Path.from_str(path_str),
+                                      self._stored[path_str],
+                                      bag_registry=self._bag_registry))
+        return self._lookup(key)
+
+    def store(self, path, schema_class):
+        """Add the schema class for a path to the cache."""
+        key = self._key(path)
+        self._insert(key, schema_class)
+        if self._store is not None:
+            path_str = ".".join(key)
+            if path_str not in self._stored:
+                self._unsaved[path_str] = schema_class
+
+    def normalize_path(self, path):
+        """
+        Return the canonical form of a path, as returned by
+        :meth:`.Connection.normalize_path`, using only the cached schema.
+
+        The path can only be normalized if the schema for every element is in
+        the cache, and each key value is of a type which the router would
+        leave unchanged (integers, booleans, strings and :data:`.WILDCARD`).
+
+        :param path:
+            A :class:`.Path`, or its string representation.
+
+        :returns:
+            The normalized :class:`.Path`, in which every key value is named,
+            or `None` if it could not be determined from the cache.
+
+        """
+        if not isinstance(path, _path.Path):
+            path = _path.Path.from_str(path)
+
+        elems = path.elems()
+        names = tuple(elem.name for elem in elems)
+        out = [elems[0]]
+        for idx in range(1, len(elems)):
+            # Only paths whose schema has been fetched are in the cache, so an
+            # entry also shows that the element names are valid.
+            schema_class = self._lookup_key(names[:idx + 1])
+            if schema_class is None:
+                return None
+            key_info = _normalize_key_info(elems[idx], schema_class.key)
+            if key_info is None:
+                return None
+            out.append(_path.PathElement(elems[idx].name, key_info))
+
+        return type(path)(out)
+
+    def get_parent(self, path):
+        """
+        Return the parent of a path, as returned by
+        :meth:`.Connection.get_parent`, using only the cached schema.
+
+        This is only possible for paths whose last element has no key values,
+        and which can be normalized by :meth:`.normalize_path`.
+
+        :returns:
+            The parent :class:`.Path`, or `None` if it could not be determined
+            from the cache.
+
+        """
+        if not isinstance(path, _path.Path):
+            path = _path.Path.from_str(path)
+
+        elems = path.elems()
+        if len(elems) < 2 or elems[-1]._has_key_info():
+            return None
+        norm_path = self.normalize_path(path)
+        if norm_path is None:
+            return None
+        return type(path)(norm_path.elems()[:-1])
+
+    def save(self):
+        """
+        Write the schema classes added to the cache since it was loaded to the
+        cache's :class:`.SchemaStore`, if it has one.
+
+        Nothing is written if the router's version isn't known.
+
+        """
+        if self._store is None or self._version is None or not self._unsaved:
+            return
+
+        classes = {path_str: schema_class._to_dict()
+                   for path_str, schema_class in self._unsaved.items()}
+        self._store.save(self._version, classes)
+        self._stored.update(classes)
+        self._unsaved = {}
+
+    def check_version(self, version):
+        # Docstring in parent
+        changed = super(SchemaCache, self).check_version(version)
+        if changed:
+            self._bag_registry.clear()
+            self._unsaved = {}
+            if self._store is not None and version is not None:
+                self._stored = self._store.load(version)
+            else:
+                self._stored = {}
+        return changed
+
+
+class CLICache(_VersionedCache):
+    """
+    Cache of the results of :meth:`.Connection.cli_describe`.
+
+    Entries are keyed on the command string and whether it is a
+    configuration command. As for :class:`.SchemaCache`, the cache is cleared
+    when a connection using it connects to a router with a different
+    software version.
+
+    A connection with a CLI cache can also make :meth:`.Connection.cli_get`
+    requests with `via_paths=True`, which uses the cached description of the
+    command to fetch its data with path-based `get` requests, so that the
+    router only parses each distinct command once.
+
+    Example::
+
+        cli_cache = CLICache()
+        conn = connect(transport, cli_cache=cli_cache)
+        for command in commands:
+            data = conn.cli_get(command, via_paths=True)
+
+    """
+
+    def __init__(self, maxsize=1024):
+        """
+        Create an empty cache.
+
+        :param maxsize:
+            Maximum number of commands to hold descriptions for. Once full, the
+            least recently used is discarded. If `None`, the cache is
+            unbounded.
+
+        """
+        super(CLICache, self).__init__(maxsize)
+
+    def lookup(self, command, config=False):
+        """
+        Return the cached list of :class:`.Request` objects for a command, or
+        `None` if there isn't one.
+
+        """
+        requests = self._lookup((command, config))
+        return list(requests) if requests is not None else None
+
+    def store(self, command, config, requests):
+        """Add the description of a command to the cache."""
+        self._insert((command, config), tuple(requests))
+
+
+def _path_names(path):
+    """Return the element names of a path, or of a path string."""
+    if not isinstance(path, _path.Path):
+        path = _path.Path.from_str(path)
+    return tuple(elem.name for elem in path.elems())
+
+
+def _overlaps(names, other_names):
+    """Return whether either of two element name tuples prefixes the other."""
+    length = min(len(names), len(other_names))
+    return names[:length] == other_names[:length]
+
+
+class PathInterner(_LRUCache):
+    """
+    Table of shared :class:`.Path` objects, keyed by path string.
+
+    A connection with an interner (see :func:`.connect`) uses it to create the
+    paths in responses, so a path string that is received repeatedly (eg. on
+    each poll of the same data) is only parsed once, and every response
+    containing it shares a single :class:`.Path` object. Paths are immutable,
+    so sharing them is safe.
+
+    An interner may be shared between any number of connections.
+
+    Example::
+
+        interner = PathInterner()
+        conn = connect(transport, path_interner=interner)
+
+    """
+
+    def __init__(self, maxsize=65536):
+        """
+        Create an empty table.
+
+        :param maxsize:
+            Maximum number of paths to hold. Once full, the least recently
+            used path is discarded. If `None`, the table is unbounded.
+
+        """
+        super(PathInterner, self).__init__(maxsize)
+
+    def from_str(self, path_str):
+        """
+        Return the shared path for a path string, parsing it if necessary.
+
+        :param path_str:
+            String representation of a path, as for :meth:`.Path.from_str`.
+
+        :returns:
+            A :class:`.Path`.
+
+        """
+        path = self._lookup(path_str)
+        if path is None:
+            path = _path.Path.from_str(path_str)
+            self._insert(path_str, path)
+        return path
+
+
+class ResponseCache(_LRUCache):
+    """
+    Cache of the responses to :meth:`.Connection.get` and
+    :meth:`.Connection.get_nested` requests, which expire after a time to live
+    (TTL).
+
+    The TTL is configured per path prefix. The TTL for a request is that of
+    the longest prefix of the requested path, and requests for paths with no
+    configured prefix are not cached. Key values are ignored when matching
+    prefixes.
+
+    While a request is in flight, identical requests (for the same path string
+    and format) wait for its response rather than making another request,
+    unless their timeout would expire later than the request's. Each caller
+    waits with its own timeout, and cancelling one caller doesn't affect the
+    request or the others waiting for it.
+
+    Requests which may change the data on the router invalidate the cached
+    responses which they might affect:
+
+    - :meth:`~.Connection.set`, :meth:`~.Connection.delete` and
+      :meth:`~.Connection.replace` invalidate responses for paths which
+      contain, or are contained in, one of the paths they modify. Key values
+      are ignored, so this errs on the side of invalidating.
+
+    - All other configuration requests (eg. :meth:`~.Connection.commit`)
+      invalidate every response.
+
+    Responses to requests which were in flight when an invalidation happened
+    are returned, but not cached.
+
+    A cache may be shared between connections to the same router, eg. the
+    members of a :class:`.ConnectionPool`, in which case requests on any of
+    them invalidate responses cached by the others.
+
+    Cached responses are shared between callers, and are not copied when
+    returned. The results of :meth:`.Connection.get_nested`, and the values
+    in the results of :meth:`.Connection.get` (eg. the dicts of bag values),
+    must therefore not be modified: a change would be seen by every caller
+    answered from the same response until it expires. The lists of pairs
+    returned by :meth:`.Connection.get` are not shared.
+
+    Example::
+
+        response_cache = ResponseCache({RootOper: 1.0,
+                                        RootOper.Interfaces: 5.0})
+        conn = connect(transport, response_cache=response_cache)
+
+    """
+
+    def __init__(self, ttls, maxsize=1024):
+        """
+        Create an empty cache.
+
+        :param ttls:
+            Mapping of path prefixes (:class:`.Path` objects or path strings)
+            to the time, in seconds, for which responses to requests for paths
+            with that prefix are cached.
+
+        :param maxsize:
+            Maximum number of responses to hold. Once full, the least recently
+            used response is discarded. If `None`, the cache is unbounded.
+
+        """
+        super(ResponseCache, self).__init__(maxsize)
+        self._ttls = {_path_names(prefix): ttl for prefix, ttl in ttls.items()}
+
+        # Futures for requests in flight, by the key of their cache entries.
+        self._in_flight = {}
+
+        # Incremented on each invalidation. Responses to requests sent before
+        # the latest invalidation are not cached.
+        self._generation = 0
+
+    def _ttl(self, names):
+        """Return the TTL for a path's element names, or `None`."""
+        for length in range(len(names), 0, -1):
+            ttl = self._ttls.get(names[:length])
+            if ttl is not None:
+                return ttl
+        return None
+
+    def fetch(self, fmt, path, request, loop, timeout=None):
+        """
+        Return a future for the response to a `get` request, making the
+        request only if necessary.
+
+        This method should not be called directly by external users.
+
+        :param fmt:
+            The requested format, eg. `"pairs"`.
+
+        :param path:
+            The requested :class:`.Path`, or its string representation.
+
+        :param request:
+            Callable which makes the request, returning a future for the
+            `result` field of the response.
+
+        :param loop:
+            Event loop for futures, and whose clock is used for TTLs.
+
+        :param timeout:
+            Time, in seconds, after which the request made by `request` times
+            out, or `None` if it doesn't. The future returned fails with
+            :exc:`.RequestTimeoutError` after this time, even if it's waiting
+            for a request made by another caller.
+
+        """
+        names = _path_names(path)
+        ttl = self._ttl(names)
+        if ttl is None:
+            return request()
+
+        key = (fmt, str(path))
+        deadline = float("inf") if timeout is None else loop.time() + timeout
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and deadline <= in_flight[1]:
+            self._hits += 1
+            waiter = _async.shield(in_flight[0], loop=loop)
+            if deadline < in_flight[1]:
+                _start_waiter_timer(waiter, timeout, loop)
+            return waiter
+
+        # Drop an expired entry, so that the lookup counts a miss.
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= loop.time():
+            del self._entries[key]
+
+        entry = self._lookup(key)
+        if entry is not None:
+            result_fut = _async.Future(loop=loop)
+            result_fut.set_result(entry[2])
+            return result_fut
+
+        # Later callers wait for this request, unless their timeout is longer.
+        # Each waits on its own future, so that cancelling the caller doesn't
+        # cancel the request.
+        result_fut = request()
+        self._in_flight[key] = (result_fut, deadline)
+        result_fut.add_done_callback(functools.partial(
+                  self._on_response, key, names, ttl, self._generation, loop))
+        return _async.shield(result_fut, loop=loop)
+
+    def _on_response(self, key, names, ttl, generation, loop, result_fut):
+        in_flight = self._in_flight.get(key)
+        if in_flight is not None and in_flight[0] is result_fut:
+            del self._in_flight[key]
+        if (generation == self._generation and not result_fut.cancelled() and
+                                           result_fut.exception() is None):
+            self._insert(key, (loop.time() + ttl, names,
+                               result_fut.result()))
+
+    def invalidate(self, paths=None):
+        """
+        Discard cached responses which may be affected by a change.
+
+        :param paths:
+            Sequence of modified paths (:class:`.Path` objects or strings). If
+            `None`, every response is discarded.
+
+        """
+        self._generation += 1
+        if paths is None:
+            self.clear()
+            self._in_flight.clear()
+            return
+
+        names_list = [_path_names(path) for path in paths]
+        def affected(names):
+            return any(_overlaps(names, other) for other in names_list)
+
+        for key, (_, names, _) in list(self._entries.items()):
+            if affected(names):
+                del self._entries[key]
+        for key in list(self._in_flight):
+            if affected(_path_names(key[1])):
+                del self._in_flight[key]
+
+
+def _start_waiter_timer(waiter, timeout, loop):
+    """
+    Fail a future waiting for a request made by another caller with
+    :exc:`.RequestTimeoutError` if it isn't done within `timeout` seconds.
+
+    """
+    def on_timeout():
+        if not waiter.done():
+            waiter.set_exception(_errors.RequestTimeoutError(
+                         "No response received within {} seconds".format(
+                                                                     timeout),
+                         timeout=timeout))
+
+    handle = loop.call_later(timeout, on_timeout)
+    waiter.add_done_callback(lambda fut: handle.cancel())
+
+
+class ChildrenCache(ResponseCache):
+    """
+    Cache of the responses to :meth:`.Connection.get_children` requests.
+
+    Responses for configuration paths are kept until invalidated, and those
+    for operational data expire after a TTL. As for :class:`.ResponseCache`,
+    identical requests in flight share a single request, and configuration
+    requests made on a connection using the cache invalidate the responses
+    they might affect: :meth:`~.Connection.set`, :meth:`~.Connection.delete`
+    and :meth:`~.Connection.replace` those for overlapping paths, and other
+    requests such as :meth:`~.Connection.commit` and
+    :meth:`~.Connection.discard_changes` every response. Changes made by
+    other clients are not noticed until the entries expire, so `cfg_ttl`
+    should be set if the configuration may be changed elsewhere.
+
+    Example::
+
+        children_cache = ChildrenCache(oper_ttl=5.0)
+        conn = connect(transport, children_cache=children_cache)
+
+    """
+
+    def __init__(self, oper_ttl=10.0, cfg_ttl=None, maxsize=4096):
+        """
+        Create an empty cache.
+
+        :param oper_ttl:
+            Time, in seconds, for which responses for paths under
+            :data:`.RootOper` are cached. If `None`, they are not cached.
+
+        :param cfg_ttl:
+            Time, in seconds, for which responses for paths under
+            :data:`.RootCfg` are cached. If `None`, they are kept until
+            invalidated.
+
+        :param maxsize:
+            Maximum number of responses to hold. Once full, the least recently
+            used response is discarded. If `None`, the cache is unbounded.
+
+        """
+        ttls = {"RootCfg": float("inf") if cfg_ttl is None else cfg_ttl}
+        if oper_ttl is not None:
+            ttls["RootOper"] = oper_ttl
+        super(ChildrenCache, self).__init__(ttls, maxsize=maxsize)
+
+
+# Range of values of the integer datatypes, where not given by the schema.
+_INTEGER_RANGES = {
+    _schema.Datatype.INTEGER: (0, 2 ** 32 - 1),
+    _schema.Datatype.HEX_INTEGER: (0, 2 ** 32 - 1),
+    _schema.Datatype.SIGNED_INTEGER: (-2 ** 31, 2 ** 31 - 1),
+}
+
+
+def _key_value_unchanged(param, value):
+    """
+    Return whether the router would accept a key value as is, when normalizing
+    a path. `False` means the value may be rejected or converted.
+
+    """
+    datatype = param.datatype
+    if value is _defs.WILDCARD:
+        return True
+    elif datatype in _INTEGER_RANGES or datatype in (
+                   _schema.Datatype.RANGE, _schema.Datatype.SIGNED_RANGE):
+        if (not isinstance(value, numbers.Integral) or
+                                                    isinstance(value, bool)):
+            return False
+        if datatype in _INTEGER_RANGES:
+            low, high = _INTEGER_RANGES[datatype]
+        else:
+            low, high = param.datatype_args["min"], param.datatype_args["max"]
+        return low <= value <= high
+    elif datatype is _schema.Datatype.BOOL:
+        return isinstance(value, bool)
+    elif datatype in (_schema.Datatype.STRING, _schema.Datatype.TEXT):
+        return isinstance(value, type(""))
+    elif datatype is _schema.Datatype.BOUNDED_STRING:
+        return (isinstance(value, type("")) and
+                param.datatype_args["minlen"] <= len(value) <=
+                                                 param.datatype_args["maxlen"])
+    return False
+
+
+def _normalize_key_info(elem, key_params):
+    """
+    Return the key information for a path element in normalized form, given the
+    schema's key parameters, or `None` if it can't be determined locally.
+
+    """
+    if not elem._has_key_info():
+        # An element without keys is only left as it is if its class has no
+        # keys.
+        return [] if not key_params else None
+    if elem._is_wildcard_all():
+        return None
+
+    if elem._has_names():
+        values = dict(elem._key_info)
+        if set(values) != set(param.name for param in key_params):
+            return None
+    else:
+        if len(elem._key_info) != len(key_params):
+            return None
+        values = {param.name: value for param, (_, value) in
+                                          zip(key_params, elem._key_info)}
+
+    if not all(_key_value_unchanged(param, values[param.name])
+               for param in key_params):
+        return None
+    return [(param.name, values[param.name]) for param in key_params]
+
+
+class SchemaStore(object):
+    """
+    Store of schema meta-data on disk, shared between processes.
+
+    The store is a directory holding one file per router software version (and
+    optionally platform), containing the schema classes fetched so far for
+    that version, in the compact JSON form returned by the router. Files are
+    replaced atomically, so any number of processes may read the store while
+    others update it. Concurrent updates merge with the file on disk; if two
+    processes update the same file at exactly the same time, the classes
+    added by one of them may be lost, in which case they are fetched from the
+    router again by a later process.
+
+    Stores are normally used via :class:`.SchemaCache`.
+
+    """
+
+    # Version of the file format. Files in any other format are ignored.
+    _FORMAT = 1
+
+    def __init__(self, directory, platform=None):
+        """
+        Create a store. The directory is created when first written to.
+
+        :param directory:
+            Path of the directory to keep the schema files in.
+
+        :param platform:
+            Optional string identifying the routers' platform (eg. `"asr9k"`).
+            Schema saved with one platform is not loaded for another.
+
+        """
+        self._directory = directory
+        self._platform = platform
+
+    @property
+    def directory(self):
+        """The directory the schema files are kept in."""
+        return self._directory
+
+    def _filename(self, version):
+        """Return the path of the file for a version."""
+        name = "{}.{}".format(version.major, version.minor)
+        if self._platform is not None:
+            name = "{}-{}".format(re.sub(r"[^\w.-]", "_", self._platform),
+                                  name)
+        return os.path.join(self._directory, "schema-{}.json".format(name))
+
+    def load(self, version):
+        """
+        Return the schema saved for a version.
+
+        :param version:
+            The router's :class:`.Version`.
+
+        :returns:
+            A `dict` mapping path strings to `dict` representations of schema
+            classes. Empty if nothing has been saved for the version, or the
+            saved file cannot be read.
+
+        """
+        filename = self._filename(version)
+        try:
+            with open(filename, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                logger.warning("Failed to read schema store file {}: "
+                               "{}".format(filename, e))
+            return {}
+        except ValueError as e:
+            logger.warning("Ignoring malformed schema store file {}: "
+                           "{}".format(filename, e))
+            return {}
+
+        if not isinstance(data, dict) or data.get("format") != self._FORMAT:
+            logger.warning("Ignoring schema store file {} with unknown "
+                           "format".format(filename))
+            return {}
+        return data["classes"]
+
+    def save(self, version, classes):
+        """
+        Add schema classes to those saved for a version.
+
+        :param version:
+            The router's :class:`.Version`.
+
+        :param classes:
+            A `dict` mapping path strings to `dict` representations of schema
+            classes, as returned by :meth:`.load`.
+
+        """
+        try:
+            os.makedirs(self._directory)
+        except OSError as e:
+            if e.errno != errno.EEXIST:
+                raise
+
+        merged = self.load(version)
+        merged.update(classes)
+        data = json.dumps({"format": self._FORMAT,
+                           "version": {"major": version.major,
+                                       "minor": version.minor},
+                           "platform": self._platform,
+                           "classes": merged},
+                          separators=(",", ":"), sort_keys=True)
+
+        _utils.write_file_atomically(self._filename(version),
+                                     data.encode("utf-8"))
+
+    def __repr__(self):
+        return "{}({!r}, platform={!r})".format(type(self).__name__,
+                                                self._directory,
+                                                self._platform)
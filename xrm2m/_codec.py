@@ -0,0 +1,215 @@
+# -----------------------------------------------------------------------------
+# _codec.py - JSON encoding and decoding of messages
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+JSON encoding and decoding of messages.
+
+Decoding responses is typically the largest CPU cost of using a connection, so
+a faster third-party JSON library is used if one is installed. The codec is
+selected with the `codec` argument to :func:`.connect`; see :func:`.get_codec`
+for the accepted values.
+
+All codecs produce and consume ASCII byte strings, and raise `ValueError` when
+asked to decode malformed JSON.
+
+"""
+
+__all__ = (
+    'available_codecs',
+    'Codec',
+    'get_codec',
+    'OrjsonCodec',
+    'SimplejsonCodec',
+    'StdlibCodec',
+    'UjsonCodec',
+)
+
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+try:
+    import simplejson
+except ImportError:
+    simplejson = None
+
+
+_ENCODING = "ascii"
+
+
+class Codec(object):
+    """
+    Base class for codecs.
+
+    Subclasses must implement :meth:`.dumps` and :meth:`.loads`. Codecs
+    need not be subclasses of this class, but must provide the same methods.
+
+    """
+
+    # Name by which the codec can be selected.
+    name = None
+
+    def dumps(self, obj):
+        """
+        Encode an object as an ASCII JSON byte string.
+
+        Objects which are not natively JSON serializable are encoded as their
+        string representation.
+
+        """
+        raise NotImplementedError
+
+    def loads(self, data):
+        """
+        Decode an ASCII JSON byte string.
+
+        :raises:
+            `ValueError` if `data` is not valid JSON.
+
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return "{}()".format(type(self).__name__)
+
+
+class StdlibCodec(Codec):
+    """Codec using the standard library `json` module."""
+
+    name = "json"
+
+    def dumps(self, obj):
+        return json.dumps(obj, default=str).encode(_ENCODING)
+
+    def loads(self, data):
+        return json.loads(data.decode(_ENCODING))
+
+
+class OrjsonCodec(Codec):
+    """
+    Codec using `orjson`.
+
+    `orjson` does not escape non-ASCII characters, and doesn't support some
+    objects which the standard library does (such as integers larger than 64
+    bits). In these cases requests are encoded with the standard library.
+
+    """
+
+    name = "orjson"
+
+    def __init__(self):
+        self._fallback = StdlibCodec()
+
+    def dumps(self, obj):
+        try:
+            data = orjson.dumps(obj, default=str)
+        except TypeError:
+            return self._fallback.dumps(obj)
+        try:
+            data.decode("ascii")
+        except UnicodeDecodeError:
+            return self._fallback.dumps(obj)
+        return data
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+
+class UjsonCodec(Codec):
+    """
+    Codec using `ujson`.
+
+    Objects which `ujson` can't encode are encoded with the standard library.
+
+    """
+
+    name = "ujson"
+
+    def __init__(self):
+        self._fallback = StdlibCodec()
+
+    def dumps(self, obj):
+        try:
+            return ujson.dumps(obj, ensure_ascii=True).encode(_ENCODING)
+        except (TypeError, OverflowError):
+            return self._fallback.dumps(obj)
+
+    def loads(self, data):
+        return ujson.loads(data)
+
+
+class SimplejsonCodec(Codec):
+    """Codec using `simplejson`."""
+
+    name = "simplejson"
+
+    def dumps(self, obj):
+        return simplejson.dumps(obj, default=str).encode(_ENCODING)
+
+    def loads(self, data):
+        return simplejson.loads(data.decode(_ENCODING))
+
+
+# Codecs in order of preference, along with the module each requires.
+# `simplejson` decodes more slowly than the standard library on the Python
+# versions measured, so is only used if selected explicitly.
+_CODECS = (
+    (OrjsonCodec, orjson),
+    (UjsonCodec, ujson),
+    (StdlibCodec, json),
+    (SimplejsonCodec, simplejson),
+)
+
+
+def available_codecs():
+    """Return the names of the installed codecs, in order of preference."""
+    return [cls.name for cls, module in _CODECS if module is not None]
+
+
+def get_codec(codec=None):
+    """
+    Return a codec object.
+
+    :param codec:
+        One of:
+          - `None`, to select the fastest installed codec.
+          - The name of a codec: "orjson", "ujson", "simplejson" or "json" (the
+            standard library).
+          - A codec object, which is returned unmodified.
+
+    :raises:
+        `ValueError` if the named codec is unknown or not installed.
+
+    """
+    if codec is None:
+        codec = available_codecs()[0]
+
+    if not isinstance(codec, (type(""), type(b""))):
+        return codec
+
+    for cls, module in _CODECS:
+        if cls.name == codec:
+            if module is None:
+                raise ValueError("JSON codec {!r} is not installed".format(
+                                                                        codec))
+            return cls()
+
+    raise ValueError("Unknown JSON codec {!r}".format(codec))
@@ -31,13 +31,17 @@ __all__ = (
 )
 
 
-import json
+import collections
 
 from . import _async
+from . import _codec
 from . import _defs
 from . import _errors
+from . import _framing
 from . import _path
+from . import _results
 from . import _schema
+from . import _stream
 from . import _transport
 from . import _utils
 from ._shared import utils
@@ -60,6 +64,16 @@ _JSON_RPC_VERSION = "2.0"
 _JSON_ENCODING = "ascii"
 
 
+# Reading from the transport is paused while this many pairs of a streamed
+# response are waiting to be consumed (see `_wait_for_stream_consumer()`).
+_STREAM_MAX_BUFFERED = 1000
+
+
+# At most this many IDs of timed out requests are remembered, in case their
+# responses arrive late (see `_on_request_timeout()`).
+_MAX_TIMED_OUT_IDS = 1000
+
+
 @_utils.copy_docstring_from_parent
 class Connection(_shared_conn.Connection):
     """
@@ -90,6 +104,7 @@ class Connection(_shared_conn.Connection):
         'get',
         'get_children',
         'get_changes',
+        'get_many',
         'get_nested',
         'get_parent',
         'get_schema',
@@ -143,11 +158,78 @@ class Connection(_shared_conn.Connection):
 
         return out
 
+    def iter_get(self, path, timeout=None):
+        return self._async_conn.iter_get(path, timeout=timeout).iter_sync()
+
     def __repr__(self):
         return "{}({!r})".format(type(self).__name__,
                                  self._async_conn)
 
 
+class _PairsStreamReceiver(object):
+    """
+    Receives the response to a streamed `get` request.
+
+    Objects of this type stand in for the request's future in
+    `AsyncConnection._request_futures`. Pairs are put into `stream` as they are
+    received, and `finished` is completed once the response has been fully
+    received (or the request has failed).
+
+    """
+
+    def __init__(self, stream, loop, parse_path):
+        self.stream = stream
+        self.finished = _async.Future(loop=loop)
+        self._parse_path = parse_path
+
+    def done(self):
+        return self.finished.done()
+
+    def make_decoder(self):
+        """Return a decoder which puts pairs into the stream."""
+        return _stream.PairsDecoder(self._on_pair)
+
+    def _on_pair(self, pair):
+        # Once the stream has failed, discard the rest of the response.
+        if self.stream.finished:
+            return
+        path_str, value = pair
+        try:
+            path = self._parse_path(path_str)
+        except Exception as e:
+            self.stream.finish(e)
+        else:
+            self.stream.put((path, value))
+
+    def finish(self):
+        """Called when the streamed response has been fully received."""
+        if not self.done():
+            self.stream.finish()
+            self.finished.set_result(None)
+
+    def set_result(self, response):
+        """
+        Called if the response was not streamed, but received in one go.
+
+        This is the case for error responses.
+
+        """
+        if "error" in response:
+            self.stream.finish(_errors.error_from_error_field(
+                                                        response["error"],
+                                                        self._parse_path))
+        else:
+            for pair in response["result"]:
+                self._on_pair(pair)
+            self.stream.finish()
+        self.finished.set_result(None)
+
+    def set_exception(self, exc):
+        if not self.done():
+            self.stream.finish(exc)
+            self.finished.set_result(None)
+
+
 @_utils.copy_docstring_from_parent
 class AsyncConnection(_shared_conn.AsyncConnection):
     """
@@ -163,7 +245,11 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
     """
 
-    def __init__(self, transport=None, loop=None):
+    def __init__(self, transport=None, loop=None, batch_requests=False,
+                 codec=None, request_timeout=None, max_outstanding=None,
+                 schema_cache=None, response_cache=None, cli_cache=None,
+                 children_cache=None, path_interner=None, bag_registry=None,
+                 lazy_schema=False, lazy_paths=False):
         if loop:
             self._loop = loop
         else:
@@ -177,6 +263,67 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
         self._id = None
 
+        # Used to encode requests and decode responses.
+        self._codec = _codec.get_codec(codec)
+
+        # Timeout, in seconds, for requests which don't specify one. None
+        # means requests never time out.
+        self._request_timeout = request_timeout
+
+        # IDs of requests which have timed out, oldest first. The responses to
+        # these requests may still arrive, in which case they are discarded.
+        # Once there are more than `_MAX_TIMED_OUT_IDS`, the oldest are
+        # forgotten, and `_forgotten_timed_out_id` is the highest ID forgotten.
+        self._timed_out_ids = collections.OrderedDict()
+        self._forgotten_timed_out_id = 0
+
+        # Limits the number of requests in flight, if `max_outstanding` is
+        # given. Further requests wait for a slot before being written.
+        if max_outstanding is not None:
+            self._request_slots = _async.Semaphore(max_outstanding,
+                                                   loop=self._loop)
+        else:
+            self._request_slots = None
+
+        # Caches of `get_schema()` and `cli_describe()` results, if any. See
+        # `_check_cache_versions()`.
+        self._schema_cache = schema_cache
+        self._cli_cache = cli_cache
+
+        # Cache of `get()` and `get_nested()` responses, if any. See
+        # `_send_get_request()`.
+        self._response_cache = response_cache
+
+        # Cache of `get_children()` responses, if any. Like the response
+        # cache, it is invalidated by `_send_modifying_request()`.
+        self._children_cache = children_cache
+
+        # Registry of bag types shared by the schema classes created by
+        # `get_schema()`, if any.
+        if bag_registry is None and schema_cache is not None:
+            bag_registry = schema_cache.bag_registry
+        self._bag_registry = bag_registry
+
+        # Class of the schema classes created by `get_schema()`.
+        if lazy_schema:
+            self._schema_class_type = _schema.LazySchemaClass
+        else:
+            self._schema_class_type = _schema.SchemaClass
+
+        # Function used to create paths received from the router.
+        if path_interner is not None:
+            self._parse_path = path_interner.from_str
+        else:
+            self._parse_path = _path.Path.from_str
+
+        # Whether `get()` and `cli_get()` return `PathValuePairs`, rather than
+        # lists. See `_make_pairs()`.
+        self._lazy_paths = lazy_paths
+
+        # Task waiting for the transport's write buffer to drain, shared by
+        # all requests waiting to be written. See `_wait_for_write_buffer()`.
+        self._drain_task = None
+
         # This is the same as the underlying transport's state, except it can
         # be in disconnected state if a connection-wide error condition is hit
         # (eg.  mangled JSON has been received). In which case the user is
@@ -198,6 +345,32 @@ class AsyncConnection(_shared_conn.AsyncConnection):
         # Flag used by `disconnect()` to suppress logging of an error message.
         self._expect_disconnect = False
 
+        # Request batching state. When batching is enabled, requests made in
+        # the same iteration of the event loop are queued in
+        # `_pending_requests` and written as a single JSON-RPC batch (array)
+        # by `_flush_pending_requests`. The IDs of each batch that has been
+        # written but not yet answered are held in `_inflight_batches`, oldest
+        # first, so that the batch can be re-sent one request per line if the
+        # server turns out not to support batches. In that case
+        # `_batch_supported` is cleared, and batching is not attempted again on
+        # this connection.
+        self._batch_requests = batch_requests
+        self._batch_supported = True
+        self._pending_requests = []
+        self._inflight_batches = collections.deque()
+
+        # IDs of in-flight requests whose responses are decoded as they are
+        # received (see `iter_get()`), and the ID, decoder and receiver for the
+        # response that is currently being received, if any.
+        self._streaming_ids = set()
+        self._stream_id = None
+        self._stream_decoder = None
+        self._stream_receiver = None
+
+        # Future which the read loop is waiting on while paused for the
+        # consumer of a streamed response, if any.
+        self._read_paused_future = None
+
     # State transition methods
     @property
     def state(self):
@@ -211,6 +384,15 @@ class AsyncConnection(_shared_conn.AsyncConnection):
         """
         return self._state
 
+    @property
+    def streaming_requests(self):
+        """
+        The number of streamed requests (see :meth:`.iter_get`) which have
+        been sent, and whose responses have not been fully received.
+
+        """
+        return len(self._streaming_ids)
+
     def _set_state(self, state, disconnect_msg=None):
         """
         Change the connection state.
@@ -263,6 +445,27 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
         assert self.state is ConnectionState.CONNECTED
 
+        caches = [cache for cache in (self._schema_cache, self._cli_cache)
+                  if cache is not None]
+        if caches:
+            yield From(self._check_cache_versions(caches))
+
+    @_async.coroutine
+    def _check_cache_versions(self, caches):
+        """
+        Check that the given caches describe the router's software version,
+        clearing them if not.
+
+        """
+        try:
+            version = yield From(self.get_version())
+        except Exception:
+            logger.warning("{}: Failed to get version, clearing "
+                           "caches".format(self), exc_info=True)
+            version = None
+        for cache in caches:
+            cache.check_version(version)
+
     @_async.make_task
     @_async.coroutine
     def disconnect(self):
@@ -270,6 +473,7 @@ class AsyncConnection(_shared_conn.AsyncConnection):
             raise _errors.DisconnectedError
 
         self._expect_disconnect = True
+        self._resume_read()
         try:
             yield From(self._transport.disconnect())
 
@@ -296,23 +500,155 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
     def _on_read_line(self, line):
         """
-        Parse the line into a JSON message.
+        Parse the line (a byte string) into a JSON message.
 
-        Also complete the future that was waiting for the message.
+        Also complete the future(s) that were waiting for the message. The
+        message is either a single response, or a batch (array) of responses.
 
         """
         try:
-            response = json.loads(line)
+            response = self._codec.loads(line)
         except ValueError:
             raise _errors.MalformedJSONReceived(line)
 
+        if isinstance(response, list):
+            for batch_response in response:
+                self._on_response(batch_response)
+        else:
+            self._on_response(response)
+
+    def _on_response(self, response):
+        """Complete the future that was waiting for a single response."""
+
+        # A server which does not support batches responds to a batch with a
+        # single error, with a null ID. Fall back to sending each request on
+        # its own line.
+        if (response["id"] is None and "error" in response and
+                                                      self._inflight_batches):
+            self._on_batch_rejected(response["error"])
+            return
+
+        # Discard late responses to requests that have timed out. The request
+        # may not have been cleaned up yet, so check this first.
+        if self._is_timed_out(response["id"]):
+            logger.debug("{}: Discarding response to timed out request "
+                         "{}".format(self, response["id"]))
+            self._timed_out_ids.pop(response["id"], None)
+            self._on_response_id(response["id"])
+            return
+
         if response["id"] not in self._request_futures:
-            raise _errors.UnexpectedResponseID(
+            raise _errors.UnexpectedResponseIDError(
                     "Received response with unexpected ID {}".format(
                                                                response["id"]))
 
+        self._on_response_id(response["id"])
         self._request_futures[response["id"]].set_result(response)
 
+    def _is_timed_out(self, req_id):
+        """Return whether a request ID is that of a timed out request."""
+        if req_id in self._timed_out_ids:
+            return True
+        # Responses to requests whose IDs have been forgotten are recognized
+        # by being no later than the last forgotten ID.
+        return (isinstance(req_id, int) and
+                req_id <= self._forgotten_timed_out_id and
+                req_id not in self._request_futures)
+
+    def _on_response_id(self, response_id):
+        """Update batch state on receiving a response with a given ID."""
+
+        # Responses to a batch are only received after the server has accepted
+        # the batch, so stop tracking it for fallback purposes.
+        if (self._inflight_batches and
+                                response_id in self._inflight_batches[0]):
+            self._inflight_batches.popleft()
+
+    def _on_read_data(self, framer):
+        """
+        Process received data, while streamed requests are in flight.
+
+        Complete lines are taken from `framer` (a :class:`.LineFramer`) and
+        passed to :meth:`._on_read_line` as usual, except for responses to
+        streamed requests, which are passed to the request's decoder as they
+        arrive.
+
+        Data which can't be processed until more data is received is left in
+        `framer`.
+
+        """
+        while len(framer):
+            if self._stream_decoder is not None:
+                try:
+                    rest = self._stream_decoder.feed(
+                                       framer.take().decode(_JSON_ENCODING))
+                except Exception:
+                    self._end_stream()
+                    raise
+                if rest is None:
+                    break
+                self._stream_receiver.finish()
+                self._end_stream()
+                framer.feed(rest.encode(_JSON_ENCODING))
+                continue
+
+            if self._streaming_ids:
+                head = framer.peek(_stream.PREFIX_MAX_LEN).decode(
+                                                                _JSON_ENCODING)
+                match = _stream.match_pairs_prefix(head)
+                if (match is None and "\n" not in head and
+                                        len(head) < _stream.PREFIX_MAX_LEN):
+                    # Not enough has been received to tell if this is a
+                    # streamed response.
+                    break
+                if (match is not None and match[0] in self._streaming_ids and
+                                        match[0] not in self._timed_out_ids):
+                    stream_id, start = match
+                    self._on_response_id(stream_id)
+                    self._stream_id = stream_id
+                    self._stream_receiver = self._request_futures[stream_id]
+                    self._stream_decoder = self._stream_receiver.make_decoder()
+                    framer.feed(framer.take()[start:])
+                    continue
+
+            line = framer.pop_line()
+            if line is None:
+                break
+            self._on_read_line(line)
+
+    def _end_stream(self):
+        """
+        Stop decoding a streamed response, once it has been received or has
+        failed.
+
+        If the request timed out while its response was being received, its ID
+        is no longer needed to discard the response.
+
+        """
+        self._timed_out_ids.pop(self._stream_id, None)
+        self._stream_id = None
+        self._stream_decoder = None
+        self._stream_receiver = None
+
+    def _on_batch_rejected(self, error_field):
+        """
+        Handle a batch being rejected by the server.
+
+        The oldest in-flight batch is re-sent one request per line, as are any
+        other in-flight batches, and batching is disabled for the rest of the
+        lifetime of the connection.
+
+        """
+        logger.warning("{}: Batch rejected by server, falling back to "
+                       "unbatched requests: {!r}".format(self, error_field))
+        self._batch_supported = False
+
+        while self._inflight_batches:
+            batch = self._inflight_batches.popleft()
+            for req in batch.values():
+                if req["id"] in self._request_futures:
+                    self._write_json(req)
+
     @_async.coroutine
     def _connect_and_read_loop_inner(self):
         """
@@ -325,22 +661,59 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
         self._set_state(ConnectionState.CONNECTING)
         self._id = 1
+        self._pending_requests = []
+        self._inflight_batches.clear()
+        self._stream_id = None
+        self._stream_decoder = None
+        self._stream_receiver = None
+        self._timed_out_ids.clear()
+        self._forgotten_timed_out_id = 0
         if self._transport.state != _transport.State.DISCONNECTED:
             yield From(self._transport.disconnect())
         yield From(self._transport.connect(self._loop))
         self._set_state(ConnectionState.CONNECTED)
 
-        partial_line = ""
+        framer = _framing.LineFramer()
         while True:
             d = yield From(self._transport.read())
-            s = d.decode(_JSON_ENCODING)
-            partial_line += s
+            framer.feed(d)
 
-            lines = partial_line.split('\n')
-            partial_line = lines[-1]
+            if self._streaming_ids or self._stream_decoder is not None:
+                self._on_read_data(framer)
+                yield From(self._wait_for_stream_consumer())
+                continue
 
-            for line in lines[:-1]:
+            line = framer.pop_line()
+            while line is not None:
                 self._on_read_line(line)
+                line = framer.pop_line()
+
+    @_async.coroutine
+    def _wait_for_stream_consumer(self):
+        """
+        Pause reading while the consumer of a streamed response falls behind.
+
+        This keeps memory usage bounded when pairs are received faster than
+        they are consumed. Reading is only paused while no other requests are
+        in flight, and is resumed as soon as another request is made, so that
+        the consumer can make further requests without deadlocking.
+
+        """
+        while (self._stream_decoder is not None and
+               len(self._request_futures) == 1 and
+               not self._expect_disconnect):
+            stream = self._stream_receiver.stream
+            if stream.buffered < _STREAM_MAX_BUFFERED:
+                break
+            self._read_paused_future = stream.wait_consumed()
+            yield From(self._read_paused_future)
+            self._read_paused_future = None
+
+    def _resume_read(self):
+        """Resume reading, if paused by `_wait_for_stream_consumer()`."""
+        if (self._read_paused_future is not None and
+                                          not self._read_paused_future.done()):
+            self._read_paused_future.set_result(None)
 
     @_async.coroutine
     def _connect_and_read_loop(self):
@@ -388,7 +761,7 @@ class AsyncConnection(_shared_conn.AsyncConnection):
             request_future.set_exception(_errors.DisconnectedError)
 
     @_async.coroutine
-    def _send_request(self, method_name, params):
+    def _send_request(self, method_name, params, timeout=None):
         """
         Send a RPC request and return the response asynchronously.
 
@@ -397,10 +770,169 @@ class AsyncConnection(_shared_conn.AsyncConnection):
         On failure, the error is converted into one of the corresponding
         exceptions and raised.
 
+        If no response is received within `timeout` seconds (or the
+        connection's default timeout, if `timeout` is None) then
+        :exc:`.RequestTimeoutError` is raised. The timeout starts once the
+        request has been written.
+
+        """
+        if self._request_slots is not None:
+            yield From(self._request_slots.acquire())
+        try:
+            if self._transport.write_buffer_full():
+                yield From(self._wait_for_write_buffer())
+            req_id = self._write_request(method_name, params)
+
+            # Set up a future to be completed when the corresponding response
+            # is received.
+            assert req_id not in self._request_futures
+            response_future = _async.Future(loop=self._loop)
+            self._request_futures[req_id] = response_future
+            timeout_handle = self._start_request_timer(req_id, timeout)
+
+            # When the response is received map the result, or the exception,
+            # into the form expected by the caller.
+            try:
+                response = yield From(response_future)
+            except Exception:
+                logger.error("{}: Request {} failed".format(self, req_id),
+                             exc_info=True)
+                raise
+            else:
+                logger.debug("{}: Request {} succeeded".format(self, req_id))
+            finally:
+                if timeout_handle is not None:
+                    timeout_handle.cancel()
+                del self._request_futures[req_id]
+        finally:
+            if self._request_slots is not None:
+                self._request_slots.release()
+
+        if "error" in response:
+            raise _errors.error_from_error_field(response["error"],
+                                                 self._parse_path)
+
+        raise Return(response["result"])
+
+    @_async.make_task
+    @_async.coroutine
+    def _send_streaming_request(self, method_name, params, receiver,
+                                timeout=None):
+        """
+        Send a RPC request whose response is decoded as it is received.
+
+        The response is passed to `receiver` (a :class:`._PairsStreamReceiver`)
+        rather than being returned. Errors are also passed to `receiver`.
+
+        The timeout applies to receiving the whole response.
+
+        """
+        if self._request_slots is not None:
+            yield From(self._request_slots.acquire())
+        try:
+            try:
+                if self._transport.write_buffer_full():
+                    yield From(self._wait_for_write_buffer())
+                req_id = self._write_request(method_name, params)
+            except Exception as e:
+                receiver.set_exception(e)
+                return
+
+            assert req_id not in self._request_futures
+            self._request_futures[req_id] = receiver
+            self._streaming_ids.add(req_id)
+            timeout_handle = self._start_request_timer(req_id, timeout)
+            try:
+                yield From(receiver.finished)
+            finally:
+                if timeout_handle is not None:
+                    timeout_handle.cancel()
+                self._streaming_ids.remove(req_id)
+                del self._request_futures[req_id]
+        finally:
+            if self._request_slots is not None:
+                self._request_slots.release()
+
+    @_async.coroutine
+    def _wait_for_write_buffer(self):
         """
+        Wait while the transport's write buffer is above its high water mark.
+
+        This stops a burst of requests (eg. a large number of `set` calls) from
+        growing the write buffer without bound when requests are made faster
+        than the transport can send them.
+
+        """
+        while self._transport.write_buffer_full():
+            if self.state != ConnectionState.CONNECTED:
+                raise _errors.DisconnectedError
+            if self._drain_task is None:
+                self._drain_task = self._drain_transport()
+            yield From(self._drain_task)
+
+    @_async.make_task
+    @_async.coroutine
+    def _drain_transport(self):
+        logger.debug("{}: Waiting for write buffer to drain".format(self))
+        try:
+            yield From(self._transport.drain())
+        except Exception:
+            # Transport failures are reported by the read loop.
+            logger.debug("{}: Drain failed".format(self), exc_info=True)
+        finally:
+            self._drain_task = None
+
+    def _effective_timeout(self, timeout):
+        """
+        Return the timeout for a request made with a given `timeout` argument,
+        or None if it has no timeout.
+
+        """
+        return self._request_timeout if timeout is None else timeout
+
+    def _start_request_timer(self, req_id, timeout):
+        """
+        Arrange for a request to time out.
+
+        Returns a handle which should be cancelled once the request completes,
+        or None if the request has no timeout.
+
+        """
+        timeout = self._effective_timeout(timeout)
+        if timeout is None:
+            return None
+        return self._loop.call_later(timeout, self._on_request_timeout,
+                                     req_id, timeout)
+
+    def _on_request_timeout(self, req_id, timeout):
+        """Fail a request whose response has not been received in time."""
+        request_future = self._request_futures.get(req_id)
+        if request_future is None or request_future.done():
+            return
+
+        logger.warning("{}: Request {} timed out after {} seconds".format(
+                                                        self, req_id, timeout))
+
+        # The response may yet arrive, so remember the ID in order to discard
+        # it, rather than treating it as unexpected.
+        self._timed_out_ids[req_id] = None
+        if len(self._timed_out_ids) > _MAX_TIMED_OUT_IDS:
+            forgotten_id, _ = self._timed_out_ids.popitem(last=False)
+            self._forgotten_timed_out_id = max(self._forgotten_timed_out_id,
+                                               forgotten_id)
+        request_future.set_exception(_errors.RequestTimeoutError(
+                        "No response received within {} seconds".format(
+                                                                     timeout),
+                        timeout=timeout))
+
+    def _write_request(self, method_name, params):
+        """Write a RPC request, and return the request's ID."""
         if self.state != ConnectionState.CONNECTED:
             raise _errors.DisconnectedError
 
+        # The response can't be received while reading is paused.
+        self._resume_read()
+
         req = {
                 "jsonrpc": _JSON_RPC_VERSION,
                 "id": self._id,
@@ -408,69 +940,181 @@ class AsyncConnection(_shared_conn.AsyncConnection):
                 "params": params,
               }
 
-        # Write the data to the transport.
-        try:
-            self._transport.write(json.dumps(req, default=str).encode(
-                                                              _JSON_ENCODING) +
-                                  b"\n")
-        except _transport.TransportNotConnected:
-            assert False, "Should have raised DisconnectedError above."
-        except Exception:
-            raise
+        # Write the data to the transport, or queue it to be written as part
+        # of a batch.
+        if self._batch_requests and self._batch_supported:
+            self._queue_request(req)
+        else:
+            try:
+                self._write_json(req)
+            except _transport.TransportNotConnected:
+                assert False, "Should have raised DisconnectedError above."
+            except Exception:
+                raise
 
         # Successfully written, so increment the ID for the next request.
         self._id += 1
 
-        # Set up a future to be completed when the corresponding response is
-        # received.
-        assert req["id"] not in self._request_futures
-        response_future = _async.Future(loop=self._loop)
-        self._request_futures[req["id"]] = response_future
+        return req["id"]
 
-        # When the response is received map the result, or the exception, into
-        # the form expected by the caller.
-        try:
-            response = yield From(response_future)
-        except Exception:
-            logger.error("{}: Request {} failed".format(self, req["id"]),
-                         exc_info=True)
-            raise
+    def _write_json(self, obj):
+        """Write a JSON-RPC request, or batch of requests, as a single line."""
+        self._transport.write(self._codec.dumps(obj) + b"\n")
+
+    def _queue_request(self, req):
+        """
+        Queue a request to be written as part of a batch.
+
+        The queue is flushed once control returns to the event loop, so all
+        requests made in the current iteration of the loop are written
+        together.
+
+        """
+        if not self._pending_requests:
+            self._loop.call_soon(self._flush_pending_requests)
+        self._pending_requests.append(req)
+
+    def _flush_pending_requests(self):
+        """Write all queued requests, as a batch if there is more than one."""
+        reqs, self._pending_requests = self._pending_requests, []
+
+        # If the connection went down in the meantime, the corresponding
+        # futures will have been errored already.
+        if self.state != ConnectionState.CONNECTED or not reqs:
+            return
+
+        if len(reqs) == 1 or not self._batch_supported:
+            for req in reqs:
+                self._write_json(req)
         else:
-            logger.debug("{}: Request {} succeeded".format(self, req["id"]))
-        finally:
-            del self._request_futures[req["id"]]
+            self._inflight_batches.append(
+                      collections.OrderedDict((req["id"], req) for req in reqs))
+            self._write_json(reqs)
 
-        if "error" in response:
-            raise _errors.error_from_error_field(response["error"])
+    def _make_pairs(self, raw_pairs):
+        """
+        Return the path, value pairs for the `[path string, value]` pairs of a
+        response: a list, or if `lazy_paths` was given a `PathValuePairs`
+        sequence which parses each path when it's first accessed.
 
-        raise Return(response["result"])
+        """
+        if self._lazy_paths:
+            return _results.PathValuePairs(raw_pairs,
+                                           parse_path=self._parse_path)
+        return [(self._parse_path(p), v) for p, v in raw_pairs]
 
     # Request methods
 
     @_async.make_task
     @_async.coroutine
-    def get(self, path):
-        result = yield From(self._send_request("get",
-                                       {"path": str(path), "format": "pairs"}))
-        raise Return([(_path.Path.from_str(p), v) for p, v in result])
+    def get(self, path, timeout=None):
+        result = yield From(self._send_get_request(path, "pairs", timeout))
+        raise Return(self._make_pairs(result))
+
+    def iter_get(self, path, timeout=None):
+        stream = _async.ResultStream(loop=self._loop)
+        self._send_streaming_request("get",
+                                     {"path": str(path), "format": "pairs"},
+                                     _PairsStreamReceiver(stream, self._loop,
+                                                          self._parse_path),
+                                     timeout=timeout)
+        return stream
 
     @_async.make_task
     @_async.coroutine
-    def get_nested(self, path):
-        result = yield From(self._send_request("get",
-                                      {"path": str(path), "format": "nested"}))
+    def get_many(self, paths, timeout=None):
+        # Start every request before waiting on any of them. Each `get()` call
+        # returns a task, which writes its request the first time it runs, so
+        # all of the requests are written before the first response can be
+        # read.
+        get_futs = [self.get(path, timeout=timeout) for path in paths]
+
+        # Wait for all of the requests, even if one fails, so that no requests
+        # are left in-flight when this method returns.
+        results = yield From(_async.wait_all(get_futs))
+        raise Return(results)
+
+    @_async.make_task
+    @_async.coroutine
+    def get_nested(self, path, timeout=None):
+        result = yield From(self._send_get_request(path, "nested", timeout))
+        raise Return(result)
+
+    @_async.coroutine
+    def _send_get_request(self, path, fmt, timeout):
+        """
+        Send a `get` request and return the result, answering it from the
+        response cache if possible.
+
+        """
+        params = {"path": str(path), "format": fmt}
+        if self._response_cache is None:
+            result = yield From(self._send_request("get", params,
+                                                   timeout=timeout))
+        else:
+            def request():
+                return _async.Task(self._send_request("get", params,
+                                                      timeout=timeout),
+                                   loop=self._loop, id="Cached get request")
+
+            result = yield From(self._response_cache.fetch(
+                                          fmt, path, request, self._loop,
+                                          self._effective_timeout(timeout)))
+        raise Return(result)
+
+    @_async.coroutine
+    def _send_modifying_request(self, method_name, params, paths=None,
+                                timeout=None):
+        """
+        Send a request which may modify data on the router, invalidating the
+        response and children cache entries which it may affect: those for
+        `paths`, or every entry if `paths` is None.
+
+        """
+        caches = [cache for cache in (self._response_cache,
+                                      self._children_cache)
+                  if cache is not None]
+        if not caches:
+            result = yield From(self._send_request(method_name, params,
+                                                   timeout=timeout))
+            raise Return(result)
+
+        # Invalidate before sending, so later requests aren't answered from
+        # the caches, and again on completion, in case responses to requests
+        # sent in the meantime were cached.
+        for cache in caches:
+            cache.invalidate(paths)
+        try:
+            result = yield From(self._send_request(method_name, params,
+                                                   timeout=timeout))
+        finally:
+            for cache in caches:
+                cache.invalidate(paths)
         raise Return(result)
 
     @_async.make_task
     @_async.coroutine
-    def get_children(self, path):
-        result = yield From(self._send_request("get_children",
-                                                          {"path": str(path)}))
-        raise Return([_path.Path.from_str(p) for p in result])
+    def get_children(self, path, timeout=None):
+        params = {"path": str(path)}
+        if self._children_cache is None:
+            result = yield From(self._send_request("get_children", params,
+                                                   timeout=timeout))
+        else:
+            def request():
+                return _async.Task(self._send_request("get_children", params,
+                                                      timeout=timeout),
+                                   loop=self._loop,
+                                   id="Cached get_children request")
+
+            result = yield From(self._children_cache.fetch(
+                                          "children", path, request,
+                                          self._loop,
+                                          self._effective_timeout(timeout)))
+        raise Return([self._parse_path(p) for p in result])
 
     @_async.make_task
     @_async.coroutine
-    def set(self, leaf_or_iter, value=None):
+    def set(self, leaf_or_iter, value=None, timeout=None):
         if isinstance(leaf_or_iter, (type(""), _path.Path)):
             leaf_values = [(leaf_or_iter, value)]
         else:
@@ -486,54 +1130,64 @@ class AsyncConnection(_shared_conn.AsyncConnection):
             return out
         paths = [str(path) for path, val in leaf_values]
         values = [convert_val(val) for path, val in leaf_values]
-        yield From(self._send_request("set", {"path": paths, "value": values}))
+        yield From(self._send_modifying_request("set", {"path": paths,
+                                                        "value": values},
+                                                paths=paths, timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def delete(self, path_or_iter):
+    def delete(self, path_or_iter, timeout=None):
         if isinstance(path_or_iter, (type(""), _path.Path)):
             paths = [path_or_iter]
         else:
             paths = path_or_iter
         paths = [str(p) for p in paths]
-        yield From(self._send_request("delete", {"path": paths}))
+        yield From(self._send_modifying_request("delete", {"path": paths},
+                                                paths=paths, timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def replace(self, subtree_or_iter):
+    def replace(self, subtree_or_iter, timeout=None):
         if isinstance(subtree_or_iter, (type(""), _path.Path)):
             subtrees = [subtree_or_iter]
         else:
             subtrees = subtree_or_iter
         subtrees = [str(p) for p in subtrees]
-        yield From(self._send_request("replace", {"path": subtrees}))
+        yield From(self._send_modifying_request("replace", {"path": subtrees},
+                                                paths=subtrees,
+                                                timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def commit(self):
-        commit_id = yield From(self._send_request("commit", {}))
+    def commit(self, timeout=None):
+        commit_id = yield From(self._send_modifying_request("commit", {},
+                                                            timeout=timeout))
         logger.info("Commit succeeded. Commit ID: {}".format(commit_id))
 
     @_async.make_task
     @_async.coroutine
-    def commit_replace(self):
-        commit_id = yield From(self._send_request("commit_replace", {}))
+    def commit_replace(self, timeout=None):
+        commit_id = yield From(self._send_modifying_request("commit_replace",
+                                                            {},
+                                                            timeout=timeout))
         logger.info("Commit replace succeeded. Commit ID: {}".format(
                                                                     commit_id))
 
     @_async.make_task
     @_async.coroutine
-    def discard_changes(self):
-        yield From(self._send_request("discard_changes", {}))
+    def discard_changes(self, timeout=None):
+        yield From(self._send_modifying_request("discard_changes", {},
+                                                timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def get_changes(self):
-        changes = yield From(self._send_request("get_changes", {}))
+    def get_changes(self, timeout=None):
+        changes = yield From(self._send_request("get_changes", {},
+                                                timeout=timeout))
         raise Return(
             [
                 _defs.ChangeDetails(
-                      path=_path.Path.from_str(change["path"]),
+                      path=self._parse_path(change["path"]),
                       op=_defs.Change[change["operation"]],
                       value=change["value"])
                 for change in changes
@@ -541,91 +1195,141 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
     @_async.make_task
     @_async.coroutine
-    def get_version(self):
-        ver = yield From(self._send_request("get_version", {}))
+    def get_version(self, timeout=None):
+        ver = yield From(self._send_request("get_version", {},
+                                            timeout=timeout))
         raise Return(_schema.Version(major=ver["major"],
                                      minor=ver["minor"]))
 
     @_async.make_task
     @_async.coroutine
-    def get_parent(self, path):
+    def get_parent(self, path, timeout=None):
+        if self._schema_cache is not None:
+            parent = self._schema_cache.get_parent(path)
+            if parent is not None:
+                raise Return(parent)
+
         path_str = yield From(self._send_request("get_parent",
-                                                          {"path": str(path)}))
+                                                 {"path": str(path)},
+                                                 timeout=timeout))
         raise Return(_path.Path.from_str(path_str))
 
     @_async.make_task
     @_async.coroutine
-    def cli_describe(self, command, config=False):
+    def cli_describe(self, command, config=False, timeout=None):
+        if self._cli_cache is not None:
+            requests = self._cli_cache.lookup(command, config)
+            if requests is not None:
+                raise Return(requests)
+
         result = yield From(self._send_request("cli_describe",
                                       {"command": command,
-                                       "configuration": config}))
-        raise Return([_defs.Request(
+                                       "configuration": config},
+                                      timeout=timeout))
+        requests = [_defs.Request(
                         method=_defs.Method[d["method"].upper()],
                         path=_path.Path.from_str(d["path"]),
-                        value=d.get("value")) for d in result])
+                        value=d.get("value")) for d in result]
+        if self._cli_cache is not None:
+            self._cli_cache.store(command, config, requests)
+        raise Return(requests)
 
     @_async.make_task
     @_async.coroutine
-    def cli_get(self, command):
+    def cli_get(self, command, timeout=None, via_paths=False):
+        if via_paths:
+            requests = yield From(self.cli_describe(command, timeout=timeout))
+            if all(req.method is _defs.Method.GET for req in requests):
+                results = yield From(self.get_many(
+                                                [req.path for req in requests],
+                                                timeout=timeout))
+                if self._lazy_paths:
+                    raise Return(_results.PathValuePairs._concat(results))
+                raise Return([pair for result in results for pair in result])
+
         result = yield From(self._send_request("cli_get",
-                                      {"command": command, "format": "pairs"}))
-        raise Return([(_path.Path.from_str(p), v) for p, v in result])
+                                      {"command": command, "format": "pairs"},
+                                      timeout=timeout))
+        raise Return(self._make_pairs(result))
 
     @_async.make_task
     @_async.coroutine
-    def cli_set(self, command):
-        yield From(self._send_request("cli_set", {"command": command}))
+    def cli_set(self, command, timeout=None):
+        yield From(self._send_modifying_request("cli_set",
+                                                {"command": command},
+                                                timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def cli_get_nested(self, command):
+    def cli_get_nested(self, command, timeout=None):
         result = yield From(self._send_request("cli_get",
-                                     {"command": command, "format": "nested"}))
+                                     {"command": command, "format": "nested"},
+                                     timeout=timeout))
 
         raise Return(result)
 
     @_async.make_task
     @_async.coroutine
-    def cli_exec(self, command):
+    def cli_exec(self, command, timeout=None):
         result = yield From(self._send_request("cli_exec",
-                                               {"command": command}))
+                                               {"command": command},
+                                               timeout=timeout))
         raise Return(result)
 
     @_async.make_task
     @_async.coroutine
-    def write_file(self, data, filename):
+    def write_file(self, data, filename, timeout=None):
         yield From(self._send_request("write_file",
-                                      {"data": data, "filename": filename}))
+                                      {"data": data, "filename": filename},
+                                      timeout=timeout))
 
     @_async.make_task
     @_async.coroutine
-    def get_schema(self, path):
+    def get_schema(self, path, timeout=None):
         if isinstance(path, _path.Path):
             path_str = str(path)
         else:
             path_str = path
             path = _path.Path.from_str(path_str)
+
+        if self._schema_cache is not None:
+            schema_class = self._schema_cache.lookup(path)
+            if schema_class is not None:
+                raise Return(schema_class)
+
         info_dict = yield From(self._send_request("get_schema",
-                                                           {"path": path_str}))
+                                                  {"path": path_str},
+                                                  timeout=timeout))
 
-        raise Return(_schema.SchemaClass.from_dict(path, info_dict))
+        schema_class = self._schema_class_type.from_dict(
+                                         path, info_dict,
+                                         bag_registry=self._bag_registry)
+        if self._schema_cache is not None:
+            self._schema_cache.store(path, schema_class)
+        raise Return(schema_class)
 
     @_async.make_task
     @_async.coroutine
-    def normalize_path(self, path):
+    def normalize_path(self, path, timeout=None):
+        if self._schema_cache is not None:
+            norm_path = self._schema_cache.normalize_path(path)
+            if norm_path is not None:
+                raise Return(norm_path)
+
         norm_path_str = yield From(self._send_request("normalize_path",
-                                                      {"path": str(path)}))
+                                                      {"path": str(path)},
+                                                      timeout=timeout))
         raise Return(_path.Path.from_str(norm_path_str))
 
     @_async.make_task
     @_async.coroutine
-    def get_value(self, path):
+    def get_value(self, path, timeout=None):
         if isinstance(path, _path.Path):
             path_str = str(path)
         else:
             path_str = path
             path = _path.Path.from_str(path_str)
-        get_result = yield From(self.get(path_str))
+        get_result = yield From(self.get(path_str, timeout=timeout))
         if len(get_result) > 1:
             raise _errors.AmbiguousPathError("Multiple paths match {}".format(
                                                     path),
@@ -645,8 +1349,23 @@ class AsyncConnection(_shared_conn.AsyncConnection):
 
 
 @_utils.copy_docstring(_shared_conn.connect_async)
-def connect_async(transport=None, loop=None):
-    conn = AsyncConnection(transport, loop=loop)
+def connect_async(transport=None, loop=None, batch_requests=False,
+                  codec=None, request_timeout=None, max_outstanding=None,
+                  schema_cache=None, response_cache=None, cli_cache=None,
+                  children_cache=None, path_interner=None, bag_registry=None,
+                  lazy_schema=False, lazy_paths=False):
+    conn = AsyncConnection(transport, loop=loop,
+                           batch_requests=batch_requests, codec=codec,
+                           request_timeout=request_timeout,
+                           max_outstanding=max_outstanding,
+                           schema_cache=schema_cache,
+                           response_cache=response_cache,
+                           cli_cache=cli_cache,
+                           children_cache=children_cache,
+                           path_interner=path_interner,
+                           bag_registry=bag_registry,
+                           lazy_schema=lazy_schema,
+                           lazy_paths=lazy_paths)
 
     @_async.coroutine
     def coro():
@@ -657,8 +1376,24 @@ def connect_async(transport=None, loop=None):
 
 
 @_utils.copy_docstring(_shared_conn.connect)
-def connect(transport=None, loop=None):
-    conn = Connection(AsyncConnection(transport, loop=loop))
+def connect(transport=None, loop=None, batch_requests=False, codec=None,
+            request_timeout=None, max_outstanding=None, schema_cache=None,
+            response_cache=None, cli_cache=None, children_cache=None,
+            path_interner=None, bag_registry=None, lazy_schema=False,
+            lazy_paths=False):
+    conn = Connection(AsyncConnection(transport, loop=loop,
+                                      batch_requests=batch_requests,
+                                      codec=codec,
+                                      request_timeout=request_timeout,
+                                      max_outstanding=max_outstanding,
+                                      schema_cache=schema_cache,
+                                      response_cache=response_cache,
+                                      cli_cache=cli_cache,
+                                      children_cache=children_cache,
+                                      path_interner=path_interner,
+                                      bag_registry=bag_registry,
+                                      lazy_schema=lazy_schema,
+                                      lazy_paths=lazy_paths))
 
     conn._connect()
 
@@ -0,0 +1,312 @@
+# -----------------------------------------------------------------------------
+# _crawl.py - Crawling the schema hierarchy
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Crawling the schema hierarchy.
+
+A :class:`.SchemaCrawler` walks the schema from the roots, following
+:attr:`.SchemaClass.children`, and builds an index of every schema class. Many
+:meth:`~.AsyncConnection.get_schema` requests are kept in flight at once, so
+the walk is bounded by the router's throughput rather than by round trips.
+
+"""
+
+__all__ = (
+    'SchemaCrawler',
+)
+
+
+import collections
+import errno
+import functools
+import json
+import os
+
+from . import _async
+from . import _path
+from . import _schema
+from . import _utils
+
+from ._async import From, Return
+from ._logging import logger
+
+
+class SchemaCrawler(object):
+    """
+    Builds an index of every class in the schema.
+
+    The crawler requests the schema for each root path, then for each child
+    of every class returned, until the whole hierarchy has been fetched. The
+    result of :meth:`.crawl` is a `dict` mapping the path string of each
+    class (eg. `"RootCfg.InterfaceConfiguration"`) to its
+    :class:`.SchemaClass`, which describes its key and value parameters and
+    its bag types.
+
+    If a checkpoint file is given, the classes fetched so far are saved to it
+    periodically, and when the crawl finishes or fails. A crawl started with
+    an existing checkpoint file only fetches the classes missing from it, so a
+    crawl interrupted by a dropped connection can be resumed by reconnecting
+    and calling :meth:`.crawl` again. Once a crawl completes, the checkpoint
+    file holds the complete index.
+
+    During a crawl, newly fetched classes are appended to a journal file
+    alongside the checkpoint (named by adding `.journal`), so that each
+    periodic save only writes the classes fetched since the last. The journal
+    is merged into the checkpoint file when the crawl finishes or fails.
+
+    Example::
+
+        crawler = SchemaCrawler(async_conn, window=32,
+                                checkpoint="schema-index.json")
+        index = loop.run_until_complete(crawler.crawl())
+
+    """
+
+    # Version of the checkpoint file format. Files in any other format are
+    # ignored.
+    _FORMAT = 1
+
+    def __init__(self, conn, roots=None, window=16, checkpoint=None,
+                 checkpoint_interval=500, loop=None, bag_registry=None):
+        """
+        Create a crawler.
+
+        :param conn:
+            The :class:`.AsyncConnection` (or :class:`.ConnectionPool`) to
+            make requests with.
+
+        :param roots:
+            Sequence of :class:`.Path` objects to start crawling from. By
+            default, :data:`.RootOper`, :data:`.RootCfg` and
+            :data:`.RootAction`.
+
+        :param window:
+            Maximum number of `get_schema` requests to have in flight at once.
+
+        :param checkpoint:
+            Optional filename of a checkpoint file to resume from and save to.
+
+        :param checkpoint_interval:
+            Number of classes to fetch between writes to the checkpoint
+            journal.
+
+        :param loop:
+            Event loop with which the crawler's futures are associated.
+
+        :param bag_registry:
+            Optional :class:`.BagTypeRegistry` with which classes loaded from
+            the checkpoint file share their bag types. This should be the
+            connection's registry, if it has one.
+
+        """
+        if window < 1:
+            raise ValueError("Window must be at least 1")
+        if roots is None:
+            roots = (_path.RootOper, _path.RootCfg, _path.RootAction)
+        if loop is None:
+            loop = _async.get_event_loop()
+
+        self._loop = loop
+        self._conn = conn
+        self._roots = [str(root) for root in roots]
+        self._window = window
+        self._checkpoint = checkpoint
+        self._checkpoint_interval = checkpoint_interval
+        self._bag_registry = bag_registry
+
+        # Schema classes fetched so far, by path string.
+        self._classes = {}
+
+        # State of a crawl in progress. `_pending` holds the path strings
+        # waiting to be requested, and `_queued` every path string that has
+        # been added to `_pending`, so that no class is requested twice.
+        self._pending = collections.deque()
+        self._queued = set()
+        self._in_flight = 0
+        # Path strings of the classes fetched since the checkpoint was last
+        # saved or journalled.
+        self._unsaved = []
+        self._first_exc = None
+        self._done_future = None
+
+    @property
+    def index(self):
+        """
+        Dict of the :class:`.SchemaClass` objects fetched so far, by path
+        string.
+
+        """
+        return self._classes
+
+    @_async.make_task
+    @_async.coroutine
+    def crawl(self):
+        """
+        Fetch every schema class not already in the index.
+
+        :returns:
+            The completed index, as for :attr:`.index`.
+
+        :raises:
+            The first error raised by a `get_schema` request. Requests in
+            flight are allowed to complete, and the checkpoint file (if any)
+            is saved, before the error is raised.
+
+        """
+        if self._done_future is not None:
+            raise RuntimeError("Crawl already in progress")
+
+        if self._checkpoint is not None:
+            self._load_checkpoint()
+            # Merge any journal left by an earlier crawl, since its last line
+            # may be incomplete and so can't be appended to.
+            if os.path.exists(self._journal):
+                self._save_checkpoint()
+
+        self._queued = set(self._classes)
+        self._pending = collections.deque()
+        self._enqueue(self._roots)
+        for schema_class in self._classes.values():
+            self._enqueue(str(child) for child in schema_class.children)
+
+        self._first_exc = None
+        self._done_future = _async.Future(loop=self._loop)
+        try:
+            self._request_pending()
+            yield From(self._done_future)
+        finally:
+            first_exc, self._first_exc = self._first_exc, None
+            self._done_future = None
+            self._pending = collections.deque()
+            self._queued = set()
+            if self._checkpoint is not None:
+                self._save_checkpoint()
+
+        if first_exc is not None:
+            raise first_exc
+
+        raise Return(self._classes)
+
+    def _enqueue(self, path_strs):
+        for path_str in path_strs:
+            if path_str not in self._queued:
+                self._queued.add(path_str)
+                self._pending.append(path_str)
+
+    def _request_pending(self):
+        """Send requests for pending paths, up to the window size."""
+        while (self._pending and self._in_flight < self._window and
+                                                    self._first_exc is None):
+            path_str = self._pending.popleft()
+            self._in_flight += 1
+            schema_fut = self._conn.get_schema(path_str)
+            schema_fut.add_done_callback(
+                              functools.partial(self._on_schema, path_str))
+
+        if (self._in_flight == 0 and self._done_future is not None and
+                                             not self._done_future.done()):
+            self._done_future.set_result(None)
+
+    def _on_schema(self, path_str, schema_fut):
+        self._in_flight -= 1
+        try:
+            schema_class = schema_fut.result()
+            self._classes[path_str] = schema_class
+            self._enqueue(str(child) for child in schema_class.children)
+
+            self._unsaved.append(path_str)
+            if (self._checkpoint is not None and
+                    len(self._unsaved) >= self._checkpoint_interval):
+                self._append_journal()
+        except (Exception, _async.CancelledError) as e:
+            # Errors from saving the checkpoint or decoding the class end the
+            # crawl, as do failed requests.
+            logger.debug("{}: Failed to crawl {}".format(self, path_str),
+                         exc_info=True)
+            if self._first_exc is None:
+                self._first_exc = e
+        finally:
+            # Always continue, so that the crawl completes once the requests
+            # in flight have.
+            self._request_pending()
+
+    @property
+    def _journal(self):
+        return self._checkpoint + ".journal"
+
+    def _load_checkpoint(self):
+        try:
+            with open(self._checkpoint, "rb") as f:
+                data = json.loads(f.read().decode("utf-8"))
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+            data = {"format": self._FORMAT, "classes": {}}
+        if not isinstance(data, dict) or data.get("format") != self._FORMAT:
+            raise ValueError("Unrecognized checkpoint file {}".format(
+                                                             self._checkpoint))
+        classes = data["classes"]
+
+        # Each line of the journal holds a class fetched after the checkpoint
+        # file was written. The last line may be incomplete, if the process
+        # was killed while appending it.
+        try:
+            with open(self._journal, "rb") as f:
+                for line in f:
+                    try:
+                        path_str, class_dict = json.loads(
+                                                       line.decode("utf-8"))
+                    except ValueError:
+                        break
+                    classes[path_str] = class_dict
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+
+        for path_str, class_dict in classes.items():
+            if path_str not in self._classes:
+                self._classes[path_str] = _schema.LazySchemaClass.from_dict(
+                                    _path.Path.from_str(path_str), class_dict,
+                                    bag_registry=self._bag_registry)
+        logger.debug("{}: Loaded {} classes from checkpoint".format(
+                                                   self, len(self._classes)))
+
+    def _append_journal(self):
+        """Append the classes fetched since the last save to the journal."""
+        lines = [json.dumps([path_str, self._classes[path_str]._to_dict()],
+                            separators=(",", ":"), sort_keys=True) + "\n"
+                 for path_str in self._unsaved]
+        with open(self._journal, "ab") as f:
+            f.write("".join(lines).encode("utf-8"))
+        self._unsaved = []
+
+    def _save_checkpoint(self):
+        """Write the index to the checkpoint file, and remove the journal."""
+        data = json.dumps({"format": self._FORMAT,
+                           "classes": {path_str: schema_class._to_dict()
+                                       for path_str, schema_class in
+                                                      self._classes.items()}},
+                          separators=(",", ":"), sort_keys=True)
+        _utils.write_file_atomically(self._checkpoint, data.encode("utf-8"))
+        try:
+            os.unlink(self._journal)
+        except (IOError, OSError) as e:
+            if e.errno != errno.ENOENT:
+                raise
+        self._unsaved = []
+
+    def __repr__(self):
+        return "{}(classes={}, pending={}, in_flight={})".format(
+                                                       type(self).__name__,
+                                                       len(self._classes),
+                                                       len(self._pending),
+                                                       self._in_flight)
@@ -32,6 +32,7 @@ __all__ = (
     'PathKeyContentError',
     'PathKeyStructureError',
     'PathStringFormatError',
+    'RequestTimeoutError',
     'UnexpectedJSONError',
     'UnexpectedResponseIDError',
     'ValueContentError',
@@ -63,14 +64,21 @@ from ._shared.errors import (
     PathKeyContentError,
     PathKeyStructureError,
     PathStringFormatError,
+    RequestTimeoutError,
     ValueContentError,
     ValueStructureError,
 )
 
 
-def _parse_path(pathstr):
-    """Wrapper around :meth:`._path.Path.from_str`."""
-    return _path.Path.from_str(pathstr)
+def _parse_path(pathstr, parse_path=None):
+    """
+    Wrapper around :meth:`._path.Path.from_str`, or `parse_path` if given (eg.
+    :meth:`.PathInterner.from_str`).
+
+    """
+    if parse_path is None:
+        return _path.Path.from_str(pathstr)
+    return parse_path(pathstr)
 
 
 class UnexpectedResponseIDError(InternalError):
@@ -111,59 +119,68 @@ class MalformedJSONReceived(InternalError):
 
 
 _ERROR_FIELDS_MAP = {
-    "cisco_error": lambda msg, d: CiscoError(msg),
+    "cisco_error": lambda msg, d, p: CiscoError(msg),
     "datatype_not_supported_error":
-        lambda msg, d: DatatypeNotSupportedError(msg),
+        lambda msg, d, p: DatatypeNotSupportedError(msg),
     "file_exists_error":
-        lambda msg, d: FileExistsError(msg, filename=d["filename"]),
+        lambda msg, d, p: FileExistsError(msg, filename=d["filename"]),
     "invalid_argument_error":
-        lambda msg, d: InvalidArgumentError(msg, path=_parse_path(d["path"])),
+        lambda msg, d, p: InvalidArgumentError(msg,
+                                               path=_parse_path(d["path"], p)),
     "not_found_error":
-        lambda msg, d: NotFoundError(msg, path=_parse_path(d["path"])),
+        lambda msg, d, p: NotFoundError(msg, path=_parse_path(d["path"], p)),
     "operation_not_supported_error":
-        lambda msg, d: OperationNotSupportedError(msg,
-                                                  path=_parse_path(d["path"])),
+        lambda msg, d, p: OperationNotSupportedError(
+            msg,
+            path=_parse_path(d["path"], p)),
     "path_hierarchy_error":
-        lambda msg, d: PathHierarchyError(msg,
-                                          element=d["element"],
-                                          parent=d["parent"]),
+        lambda msg, d, p: PathHierarchyError(msg,
+                                             element=d["element"],
+                                             parent=d["parent"]),
     "path_key_content_error":
-        lambda msg, d: PathKeyContentError(msg,
-                                           value=d["value"],
-                                           param=d["param"]),
+        lambda msg, d, p: PathKeyContentError(msg,
+                                              value=d["value"],
+                                              param=d["param"]),
     "path_key_structure_error":
-        lambda msg, d: PathKeyStructureError(
+        lambda msg, d, p: PathKeyStructureError(
             msg,
             value_seq=d["value_seq"],
             class_name=d["class"]),
     "path_string_format_error":
-        lambda msg, d: PathStringFormatError(msg, pathstr=d["path"]),
-    "permissions_error": lambda msg, d: PermissionError(msg),
+        lambda msg, d, p: PathStringFormatError(msg, pathstr=d["path"]),
+    "permissions_error": lambda msg, d, p: PermissionError(msg),
     "value_structure_error":
-        lambda msg, d: ValueStructureError(
+        lambda msg, d, p: ValueStructureError(
             msg,
             value_seq=d["value_seq"],
             class_name=d["class"]),
     "value_content_error":
-        lambda msg, d: ValueContentError(msg,
-                                         value=d["value"],
-                                         param=d["param"]),
+        lambda msg, d, p: ValueContentError(msg,
+                                            value=d["value"],
+                                            param=d["param"]),
 }
 
 
-def _make_config_commit_error(msg, data):
+def _make_config_commit_error(msg, data, parse_path):
     def _convert_dict(d):
         return _defs.ConfigCommitErrorDetail(
             op=_defs.Change[d["operation"]],
-            path=_path.Path.from_str(d["path"]),
+            path=_parse_path(d["path"], parse_path),
             value=d["value"],
             error=d["error"],
             error_category=_defs.ErrorCategory[d["category"]])
     return ConfigCommitError(msg, detail=[_convert_dict(d) for d in data])
 
 
-def error_from_error_field(error_field):
-    """Create an exception from a JSON error field."""
+def error_from_error_field(error_field, parse_path=None):
+    """
+    Create an exception from a JSON error field.
+
+    :param parse_path:
+        Optional function to create paths from strings, in place of
+        :meth:`.Path.from_str`.
+
+    """
 
     if error_field["code"] != -32000:
         return UnexpectedJSONError(error_field)
@@ -183,5 +200,6 @@ def error_from_error_field(error_field):
         except KeyError:
             return UnexpectedJSONError(error_field)
 
-    return mk_error_fn(error_field["message"], error_field["data"])
+    return mk_error_fn(error_field["message"], error_field["data"],
+                       parse_path)
 
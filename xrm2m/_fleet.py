@@ -0,0 +1,241 @@
+# -----------------------------------------------------------------------------
+# _fleet.py - Requests across many routers
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Requests across many routers.
+
+A :class:`.Fleet` holds a connection to each router in an inventory, and runs
+a request against every router concurrently on a single event loop. The number
+of connections being established, and the number of requests in progress, are
+each bounded, so that a large fleet neither opens every session at once nor
+has its requests serialized.
+
+"""
+
+__all__ = (
+    'Fleet',
+    'FleetResult',
+)
+
+
+import collections
+
+from . import _async
+from . import _conn
+
+from ._async import From, Return
+from ._logging import logger
+
+
+class FleetResult(collections.namedtuple("_FleetResultBase",
+                                         ["name", "result", "exception"])):
+    """
+    The outcome of a :meth:`.Fleet.run` call for a single router.
+
+    .. attribute:: name
+
+        The router's name in the inventory.
+
+    .. attribute:: result
+
+        The result of the call, or `None` if it failed.
+
+    .. attribute:: exception
+
+        The exception raised by the call (including failure to connect), or
+        `None` if it succeeded.
+
+    """
+
+    __slots__ = ()
+
+
+class Fleet(object):
+    """
+    A set of routers, against which requests are run concurrently.
+
+    Connections are made when first needed, and are kept for later calls to
+    :meth:`.run` until :meth:`.disconnect` is called. A router whose
+    connection fails is reconnected by the next call to :meth:`.run`.
+
+    Example::
+
+        fleet = Fleet({name: SSHTransport(name, username) for name in names},
+                      max_connects=20, max_requests=200)
+        for res in fleet.run("get", RootOper.Interfaces).iter_sync():
+            if res.exception is not None:
+                print("{} failed: {}".format(res.name, res.exception))
+
+    """
+
+    def __init__(self, inventory, loop=None, max_connects=10,
+                 max_requests=100, **connect_kwargs):
+        """
+        Create a fleet. No connections are made until :meth:`.run` is called.
+
+        :param inventory:
+            Mapping of router names to :class:`.Transport` objects, or an
+            iterable of `(name, transport)` pairs.
+
+        :param loop:
+            Event loop with which the fleet's futures are associated.
+
+        :param max_connects:
+            Maximum number of connections which may be in the process of being
+            established at once.
+
+        :param max_requests:
+            Maximum number of routers against which a call may be in progress
+            at once.
+
+        :param connect_kwargs:
+            Further keyword arguments to pass to :func:`.connect_async` for
+            each router, eg. `request_timeout`.
+
+        """
+        if loop is None:
+            loop = _async.get_event_loop()
+        self._loop = loop
+        self._transports = collections.OrderedDict(inventory)
+        self._connect_kwargs = connect_kwargs
+        self._connect_slots = _async.Semaphore(max_connects, loop=loop)
+        self._request_slots = _async.Semaphore(max_requests, loop=loop)
+
+        # Connections which have been made, by router name.
+        self._connections = {}
+
+        # Connection attempts in progress, by router name. Calls which need
+        # the same router wait for the same attempt.
+        self._connect_tasks = {}
+
+    @property
+    def names(self):
+        """List of the router names in the inventory."""
+        return list(self._transports)
+
+    @property
+    def connections(self):
+        """Dict of the connected :class:`.AsyncConnection` objects, by name."""
+        return {name: conn for name, conn in self._connections.items()
+                if conn.state == _conn.ConnectionState.CONNECTED}
+
+    def run(self, func, *args, **kwargs):
+        """
+        Run a call against every router in the fleet.
+
+        :param func:
+            Either the name of an :class:`.AsyncConnection` request method
+            (eg. `"get"`), which is called with `args` and `kwargs`, or a
+            callable which is passed each router's :class:`.AsyncConnection`
+            and returns a future or compatible coroutine.
+
+        :returns:
+            An iterator of :class:`.FleetResult` objects, one per router, in
+            the order in which the calls complete. A failure for one router
+            does not affect the others.
+
+            As for :meth:`.AsyncConnection.iter_get`, this is an asynchronous
+            iterator, whose `next_item()` method returns a future which
+            completes with the next result, or `None` once all results have
+            been returned. From synchronous code, iterate over its
+            `iter_sync()` method, which runs the event loop as required.
+
+        """
+        if isinstance(func, (type(""), type(b""))):
+            method_name = func
+            def call(conn):
+                return getattr(conn, method_name)(*args, **kwargs)
+        elif args or kwargs:
+            raise TypeError("Arguments can only be passed with a method name")
+        else:
+            call = func
+
+        stream = _async.ResultStream(loop=self._loop)
+        self._run(call, stream)
+        return stream
+
+    @_async.make_task
+    @_async.coroutine
+    def _run(self, func, stream):
+        tasks = [self._run_one(name, func, stream)
+                 for name in self._transports]
+        for task in tasks:
+            yield From(task)
+        stream.finish()
+
+    @_async.make_task
+    @_async.coroutine
+    def _run_one(self, name, func, stream):
+        """Run `func` against one router, and put the outcome into `stream`."""
+        try:
+            conn = yield From(self._get_connection(name))
+
+            yield From(self._request_slots.acquire())
+            try:
+                result = yield From(func(conn))
+            finally:
+                self._request_slots.release()
+        except Exception as e:
+            logger.debug("{}: Call failed for {}".format(self, name),
+                         exc_info=True)
+            stream.put(FleetResult(name, None, e))
+        else:
+            stream.put(FleetResult(name, result, None))
+
+    @_async.coroutine
+    def _get_connection(self, name):
+        """Return a connection to a router, connecting first if necessary."""
+        conn = self._connections.get(name)
+        if conn is not None and conn.state == _conn.ConnectionState.CONNECTED:
+            raise Return(conn)
+
+        if name not in self._connect_tasks:
+            self._connect_tasks[name] = self._connect(name)
+        conn = yield From(self._connect_tasks[name])
+        raise Return(conn)
+
+    @_async.make_task
+    @_async.coroutine
+    def _connect(self, name):
+        yield From(self._connect_slots.acquire())
+        try:
+            conn = self._connections.get(name)
+            if conn is None:
+                conn = yield From(_conn.connect_async(self._transports[name],
+                                                      loop=self._loop,
+                                                      **self._connect_kwargs))
+                self._connections[name] = conn
+            else:
+                yield From(conn.reconnect())
+        finally:
+            self._connect_slots.release()
+            del self._connect_tasks[name]
+
+        raise Return(conn)
+
+    @_async.make_task
+    @_async.coroutine
+    def disconnect(self):
+        """Disconnect from every router in the fleet."""
+        disconnect_futs = [conn.disconnect()
+                           for conn in self.connections.values()]
+        for disconnect_fut in disconnect_futs:
+            try:
+                yield From(disconnect_fut)
+            except Exception:
+                logger.debug("{}: Disconnect failed".format(self),
+                             exc_info=True)
+
+    def __repr__(self):
+        return "{}(routers={}, connected={})".format(type(self).__name__,
+                                                     len(self._transports),
+                                                     len(self.connections))
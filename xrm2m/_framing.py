@@ -0,0 +1,91 @@
+# -----------------------------------------------------------------------------
+# _framing.py - Splitting received data into lines
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Splitting received data into lines.
+
+Each JSON-RPC message is sent on a single line, and a line can be tens of
+megabytes long while being received in chunks of a kilobyte or so. To keep the
+cost of framing linear in the size of the line, :class:`.LineFramer` buffers
+data in a `bytearray`, and only scans newly received bytes for the end of the
+line.
+
+"""
+
+__all__ = (
+    'LineFramer',
+)
+
+
+class LineFramer(object):
+    """
+    Buffer received bytes, and split them into lines.
+
+    Data is added with :meth:`.feed`, and complete lines are removed with
+    :meth:`.pop_line`. Lines are returned as byte strings, without the
+    terminating newline.
+
+    """
+
+    def __init__(self):
+        self._buf = bytearray()
+
+        # Offset of the first byte in `_buf` which hasn't been consumed.
+        # Consumed bytes are removed from the buffer once no complete lines are
+        # left, rather than after each line.
+        self._start = 0
+
+        # Offset in `_buf` from which to search for the next newline. All bytes
+        # between `_start` and here are known not to be newlines.
+        self._scan_pos = 0
+
+    def __len__(self):
+        """Return the number of bytes buffered."""
+        return len(self._buf) - self._start
+
+    def feed(self, data):
+        """Add received data to the buffer."""
+        self._buf += data
+
+    def pop_line(self):
+        """
+        Remove and return the next complete line.
+
+        :returns:
+            The line as a byte string, or `None` if a complete line has not
+            been received.
+
+        """
+        end = self._buf.find(b"\n", self._scan_pos)
+        if end < 0:
+            # Drop consumed bytes now that there are no more complete lines,
+            # and remember how far has been searched.
+            if self._start:
+                del self._buf[:self._start]
+                self._start = 0
+            self._scan_pos = len(self._buf)
+            return None
+
+        line = bytes(self._buf[self._start:end])
+        self._start = self._scan_pos = end + 1
+        return line
+
+    def peek(self, n):
+        """Return (without removing) up to `n` bytes of buffered data."""
+        return bytes(self._buf[self._start:self._start + n])
+
+    def take(self):
+        """Remove and return all buffered data."""
+        data = bytes(self._buf[self._start:])
+        self._buf = bytearray()
+        self._start = self._scan_pos = 0
+        return data
@@ -0,0 +1,454 @@
+# -----------------------------------------------------------------------------
+# _pathset.py - Sets and mappings of paths
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Sets and mappings of paths.
+
+A :class:`.PathMap` stores its paths in a trie of :class:`.PathElement`
+objects, so as well as looking up a path it can efficiently find the entries
+under a prefix, the nearest ancestor of a path, and the entries matching a
+wildcarded path. A :class:`.PathSet` provides the same queries for a set of
+paths.
+
+"""
+
+__all__ = (
+    'PathMap',
+    'PathSet',
+)
+
+
+import collections
+import fnmatch
+
+from . import _defs
+
+
+# Characters which make a string key value a glob pattern.
+_GLOB_CHARS = frozenset("*?[")
+
+# Value of a trie node which holds no entry.
+_NO_VALUE = object()
+
+
+def _is_glob(val):
+    return isinstance(val, type('')) and not _GLOB_CHARS.isdisjoint(val)
+
+
+def _is_pattern(elem):
+    """
+    Return whether an element can match elements other than those equal to
+    it: ie. its keys are wildcarded, globbed or unnamed.
+
+    """
+    return any(name is None or val is _defs.WILDCARD or _is_glob(val)
+               for name, val in elem._key_info)
+
+
+def _value_matches(pattern_val, val):
+    if pattern_val is _defs.WILDCARD:
+        return True
+    elif _is_glob(pattern_val):
+        return (isinstance(val, type('')) and
+                fnmatch.fnmatchcase(val, pattern_val))
+    else:
+        return pattern_val == val
+
+
+def _elem_matches(pattern_elem, elem):
+    """
+    Return whether `elem` is matched by `pattern_elem`.
+
+    Keys are matched by name if both elements have key names, and otherwise by
+    position.
+
+    """
+    if pattern_elem._name != elem._name:
+        return False
+    pattern_keys = pattern_elem._key_info
+    keys = elem._key_info
+    if pattern_keys and pattern_keys[0][1] is _defs.WILDCARD_ALL:
+        return True
+    if len(pattern_keys) != len(keys):
+        return False
+    if (pattern_keys and pattern_keys[0][0] is not None and
+                                                  keys[0][0] is not None):
+        values = dict(keys)
+        return all(name in values and _value_matches(pattern_val, values[name])
+                   for name, pattern_val in pattern_keys)
+    return all(_value_matches(pattern_val, val)
+               for (_, pattern_val), (_, val) in zip(pattern_keys, keys))
+
+
+class _Node(object):
+    """
+    Node of a path trie.
+
+    Children are held in two dicts, each mapping an element name to a dict of
+    child nodes by element: `exact` for elements which only match equal
+    elements, and `patterns` for the rest. Looking up a concrete element is
+    then a dict lookup, plus a match against each pattern with the same name.
+
+    """
+
+    __slots__ = ("exact", "patterns", "path", "value")
+
+    def __init__(self):
+        self.exact = {}
+        self.patterns = {}
+        self.path = None
+        self.value = _NO_VALUE
+
+    def child(self, elem):
+        """Return the child for an element equal to `elem`, or `None`."""
+        children = self.patterns if _is_pattern(elem) else self.exact
+        by_elem = children.get(elem._name)
+        return by_elem.get(elem) if by_elem is not None else None
+
+    def add_child(self, elem):
+        child = self.child(elem)
+        if child is None:
+            children = self.patterns if _is_pattern(elem) else self.exact
+            child = _Node()
+            children.setdefault(elem._name, {})[elem] = child
+        return child
+
+    def remove_child(self, elem):
+        children = self.patterns if _is_pattern(elem) else self.exact
+        by_elem = children[elem._name]
+        del by_elem[elem]
+        if not by_elem:
+            del children[elem._name]
+
+    def is_empty(self):
+        return (self.value is _NO_VALUE and not self.exact and
+                not self.patterns)
+
+    def children(self):
+        """Return an iterator over every child node."""
+        for children in (self.exact, self.patterns):
+            for by_elem in children.values():
+                for child in by_elem.values():
+                    yield child
+
+    def walk(self):
+        """
+        Return an iterator over every node with an entry in this subtree, with
+        each node before its descendants.
+
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.value is not _NO_VALUE:
+                yield node
+            stack.extend(reversed(list(node.children())))
+
+
+class PathMap(collections.MutableMapping):
+    """
+    Mapping keyed by :class:`.Path`, with prefix and wildcard queries.
+
+    As well as the usual mapping operations, a path map supports:
+
+    - :meth:`.items_under`: the entries for a path and all of its descendants.
+
+    - :meth:`.nearest_ancestor`: the entry for the longest stored prefix of a
+      path.
+
+    - :meth:`.match`: the entries whose paths are patterns matching a
+      concrete path, eg. to find the consumers subscribed to a result.
+
+    - :meth:`.items_matching`: the entries whose paths are matched by a
+      pattern, eg. to filter stored results.
+
+    Each takes time proportional to the length of the path and the number of
+    entries returned, rather than to the size of the map. Patterns are paths
+    with keys that are :data:`.WILDCARD`, :data:`.WILDCARD_ALL`, or strings
+    including `glob <dataobj.html#wildcards>`__ characters (`*`, `?` and
+    `[...]`)::
+
+        >>> consumers = PathMap()
+        >>> intf = RootOper.Interfaces.Interface
+        >>> consumers[intf("Gi*").State] = "gig-state"
+        >>> consumers[intf(WILDCARD).State] = "all-state"
+        >>> sorted(value for path, value in
+        ...        consumers.match(intf(InterfaceName="Gi0").State))
+        ['all-state', 'gig-state']
+
+    Paths are compared by their elements, so keys must be given in the same
+    form (ie. named or not, and in the same order) for paths to be equal. Keys
+    of patterns are matched by name if both paths have key names, and
+    otherwise by position. Paths returned by the API always have key names.
+
+    """
+
+    def __init__(self, items=()):
+        """
+        Create a map.
+
+        :param items:
+            Optional mapping, or iterable of `(path, value)` pairs, with which
+            to populate the map.
+
+        """
+        self._root = _Node()
+        self._len = 0
+        self.update(items)
+
+    def _find_node(self, path):
+        node = self._root
+        for elem in path.elems():
+            node = node.child(elem)
+            if node is None:
+                break
+        return node
+
+    def __getitem__(self, path):
+        node = self._find_node(path)
+        if node is None or node.value is _NO_VALUE:
+            raise KeyError(path)
+        return node.value
+
+    def __setitem__(self, path, value):
+        node = self._root
+        for elem in path.elems():
+            node = node.add_child(elem)
+        if node.value is _NO_VALUE:
+            node.path = path
+            self._len += 1
+        node.value = value
+
+    def __delitem__(self, path):
+        node = self._root
+        trail = []
+        for elem in path.elems():
+            trail.append((node, elem))
+            node = node.child(elem)
+            if node is None:
+                raise KeyError(path)
+        if node.value is _NO_VALUE:
+            raise KeyError(path)
+        node.path = None
+        node.value = _NO_VALUE
+        self._len -= 1
+
+        # Remove the nodes which no longer lead to an entry.
+        for parent, elem in reversed(trail):
+            if not node.is_empty():
+                break
+            parent.remove_child(elem)
+            node = parent
+
+    def __iter__(self):
+        for node in self._root.walk():
+            yield node.path
+
+    def __len__(self):
+        return self._len
+
+    def items_under(self, prefix):
+        """
+        Return the entries for a path and each of its descendants.
+
+        :param prefix:
+            The :class:`.Path` whose entries to return. This is compared with
+            the stored paths element by element, so is not treated as a
+            pattern.
+
+        :returns:
+            An iterator of `(path, value)` pairs.
+
+        """
+        node = self._find_node(prefix)
+        if node is not None:
+            for node in node.walk():
+                yield node.path, node.value
+
+    def nearest_ancestor(self, path):
+        """
+        Return the entry for the longest stored prefix of a path.
+
+        :param path:
+            The :class:`.Path` to look up. The path itself is returned if it's
+            in the map.
+
+        :returns:
+            A `(path, value)` pair.
+
+        :raises KeyError:
+            If neither the path nor any of its ancestors is in the map.
+
+        """
+        node = self._root
+        found = node if node.value is not _NO_VALUE else None
+        for elem in path.elems():
+            node = node.child(elem)
+            if node is None:
+                break
+            if node.value is not _NO_VALUE:
+                found = node
+        if found is None:
+            raise KeyError(path)
+        return found.path, found.value
+
+    def match(self, path):
+        """
+        Return the entries whose paths match a concrete path.
+
+        :param path:
+            The :class:`.Path` to match, eg. one returned by
+            :meth:`.Connection.get`.
+
+        :returns:
+            An iterator of `(path, value)` pairs, one for each stored path
+            (whether a pattern, or equal to `path`) which matches `path`. Only
+            paths with the same number of elements as `path` match it.
+
+        """
+        nodes = [self._root]
+        for elem in path.elems():
+            next_nodes = []
+            for node in nodes:
+                by_elem = node.exact.get(elem._name)
+                if by_elem is not None:
+                    child = by_elem.get(elem)
+                    if child is not None:
+                        next_nodes.append(child)
+                for pattern_elem, child in node.patterns.get(elem._name,
+                                                             {}).items():
+                    if _elem_matches(pattern_elem, elem):
+                        next_nodes.append(child)
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        for node in nodes:
+            if node.value is not _NO_VALUE:
+                yield node.path, node.value
+
+    def items_matching(self, pattern):
+        """
+        Return the entries whose paths are matched by a pattern.
+
+        :param pattern:
+            The :class:`.Path` to match stored paths against, possibly
+            including wildcards and globs.
+
+        :returns:
+            An iterator of `(path, value)` pairs, one for each stored path
+            which `pattern` matches. Only paths with the same number of
+            elements as `pattern` are matched.
+
+        """
+        nodes = [self._root]
+        for pattern_elem in pattern.elems():
+            next_nodes = []
+            exact = not _is_pattern(pattern_elem)
+            for node in nodes:
+                by_elem = node.exact.get(pattern_elem._name, {})
+                if exact:
+                    child = by_elem.get(pattern_elem)
+                    if child is not None:
+                        next_nodes.append(child)
+                else:
+                    next_nodes.extend(child
+                                      for elem, child in by_elem.items()
+                                      if _elem_matches(pattern_elem, elem))
+                by_elem = node.patterns.get(pattern_elem._name, {})
+                next_nodes.extend(child for elem, child in by_elem.items()
+                                  if _elem_matches(pattern_elem, elem))
+            nodes = next_nodes
+            if not nodes:
+                break
+
+        for node in nodes:
+            if node.value is not _NO_VALUE:
+                yield node.path, node.value
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, dict(self.items()))
+
+
+class PathSet(collections.MutableSet):
+    """
+    Set of :class:`.Path` objects, with prefix and wildcard queries.
+
+    This supports the same queries as :class:`.PathMap`, returning paths
+    rather than `(path, value)` pairs::
+
+        >>> paths = PathSet([RootCfg.A.B, RootCfg.A.C, RootCfg.D])
+        >>> sorted(str(path) for path in paths.under(RootCfg.A))
+        ['RootCfg.A.B', 'RootCfg.A.C']
+
+    """
+
+    def __init__(self, paths=()):
+        """
+        Create a set.
+
+        :param paths:
+            Optional iterable of paths with which to populate the set.
+
+        """
+        self._map = PathMap((path, None) for path in paths)
+
+    def __contains__(self, path):
+        return path in self._map
+
+    def __iter__(self):
+        return iter(self._map)
+
+    def __len__(self):
+        return len(self._map)
+
+    def add(self, path):
+        if path not in self._map:
+            self._map[path] = None
+
+    def discard(self, path):
+        self._map.pop(path, None)
+
+    def under(self, prefix):
+        """
+        Return an iterator over the paths equal to or under a prefix, as for
+        :meth:`.PathMap.items_under`.
+
+        """
+        return (path for path, _ in self._map.items_under(prefix))
+
+    def nearest_ancestor(self, path):
+        """
+        Return the longest path in the set which is a prefix of (or equal to)
+        a path, as for :meth:`.PathMap.nearest_ancestor`.
+
+        """
+        return self._map.nearest_ancestor(path)[0]
+
+    def match(self, path):
+        """
+        Return an iterator over the paths in the set matching a concrete path,
+        as for :meth:`.PathMap.match`.
+
+        """
+        return (pattern for pattern, _ in self._map.match(path))
+
+    def matching(self, pattern):
+        """
+        Return an iterator over the paths in the set matched by a pattern, as
+        for :meth:`.PathMap.items_matching`.
+
+        """
+        return (path for path, _ in self._map.items_matching(pattern))
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, list(self))
@@ -0,0 +1,296 @@
+# -----------------------------------------------------------------------------
+# _pool.py - Pools of connections to a single router
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Pools of connections to a single router.
+
+The JSON-RPC server on the router handles requests one at a time, so a single
+connection can only make use of one of the router's CPUs. A
+:class:`.ConnectionPool` opens several connections, each with its own server
+process, and spreads read-only requests across them.
+
+"""
+
+__all__ = (
+    'ConnectionPool',
+)
+
+
+import functools
+
+from . import _async
+from . import _conn
+from . import _errors
+
+from ._async import From, Return
+from ._logging import logger
+
+
+class ConnectionPool(object):
+    """
+    A pool of asynchronous connections to a single router.
+
+    Each member of the pool is an :class:`.AsyncConnection` with its own
+    transport, created by calling `transport_factory`, and therefore its own
+    JSON-RPC server process on the router.
+
+    The pool has the same request methods as :class:`.AsyncConnection`, which
+    likewise return futures:
+
+    - Read-only requests (those in :attr:`.SPREAD_METHODS`) are sent on the
+      member with the fewest outstanding requests.
+
+    - All other requests are sent on :attr:`.config_connection`. Each server
+      process has its own configuration session, so requests which modify or
+      inspect uncommitted changes must all be made on the same member.
+
+    Note that reads of configuration (eg. a `get` of a `RootCfg` path) may be
+    sent on any member, so do not see uncommitted changes. Make such reads
+    with :attr:`.config_connection` directly.
+
+    Example::
+
+        pool = ConnectionPool(lambda: SSHTransport(hostname, username),
+                              size=4, loop=loop)
+        yield From(pool.connect())
+        results = yield From(pool.get_many(paths))
+
+    """
+
+    # Methods which are spread across the members of the pool.
+    SPREAD_METHODS = (
+        'get',
+        'get_children',
+        'get_many',
+        'get_nested',
+        'get_parent',
+        'get_schema',
+        'get_value',
+        'get_version',
+        'iter_get',
+        'normalize_path',
+    )
+
+    # Methods which are always sent on `config_connection`.
+    PINNED_METHODS = (
+        'cli_describe',
+        'cli_exec',
+        'cli_get',
+        'cli_get_nested',
+        'cli_set',
+        'commit',
+        'commit_replace',
+        'delete',
+        'discard_changes',
+        'get_changes',
+        'replace',
+        'set',
+        'write_file',
+    )
+
+    def __init__(self, transport_factory, size=2, loop=None,
+                 **connect_kwargs):
+        """
+        Create a pool. The pool is not connected until :meth:`.connect` is
+        called.
+
+        :param transport_factory:
+            Callable which takes no arguments and returns a new
+            :class:`.Transport`. It is called once for each member of the pool.
+
+        :param size:
+            The number of connections in the pool.
+
+        :param loop:
+            Event loop with which the pool's futures are associated.
+
+        :param connect_kwargs:
+            Further keyword arguments to pass to :func:`.connect_async` for
+            each member, eg. `request_timeout`.
+
+        """
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+
+        if loop is None:
+            loop = _async.get_event_loop()
+        self._loop = loop
+        self._transport_factory = transport_factory
+        self._size = size
+        self._connect_kwargs = connect_kwargs
+
+        # Member connections, once connected. The first member is the
+        # configuration connection.
+        self._connections = ()
+
+        # Number of requests sent on each member, by index, which have not yet
+        # completed.
+        self._outstanding = [0] * size
+
+        # Order in which to consider members when spreading requests. When
+        # members are equally loaded, the configuration connection is used
+        # last, so that it is left free for configuration requests.
+        self._spread_order = list(range(1, size)) + [0]
+
+    @property
+    def size(self):
+        """The number of connections in the pool."""
+        return self._size
+
+    @property
+    def connections(self):
+        """Tuple of the :class:`.AsyncConnection` objects in the pool."""
+        return self._connections
+
+    @property
+    def config_connection(self):
+        """
+        The member on which configuration requests are made.
+
+        :raises:
+            :exc:`.DisconnectedError` if the pool has not been connected.
+
+        """
+        if not self._connections:
+            raise _errors.DisconnectedError
+        return self._connections[0]
+
+    @_async.make_task
+    @_async.coroutine
+    def connect(self):
+        """
+        Connect every member of the pool.
+
+        The members are connected concurrently. If any member fails to
+        connect, the others are disconnected and the error is raised.
+
+        :raises:
+            :exc:`.ConnectionError` if a connection could not be made.
+
+        """
+        if self._connections:
+            raise _errors.ConnectionError("Pool is already connected")
+
+        connect_futs = [_conn.connect_async(self._transport_factory(),
+                                            loop=self._loop,
+                                            **self._connect_kwargs)
+                        for _ in range(self._size)]
+
+        # Wait for every attempt, so that none are left in-flight.
+        connections = []
+        first_exc = None
+        for connect_fut in connect_futs:
+            try:
+                conn = yield From(connect_fut)
+            except Exception as e:
+                if first_exc is None:
+                    first_exc = e
+            else:
+                connections.append(conn)
+
+        if first_exc is not None:
+            logger.error("{}: Connecting pool failed".format(self))
+            yield From(self._disconnect_all(connections))
+            raise first_exc
+
+        self._connections = tuple(connections)
+        self._outstanding = [0] * self._size
+
+    @_async.make_task
+    @_async.coroutine
+    def disconnect(self):
+        """Disconnect every member of the pool."""
+        connections, self._connections = self._connections, ()
+        yield From(self._disconnect_all(connections))
+
+    @_async.coroutine
+    def _disconnect_all(self, connections):
+        """
+        Concurrently disconnect the given connections, skipping any which have
+        already been disconnected (eg. due to a transport failure).
+
+        """
+        disconnect_futs = [conn.disconnect() for conn in connections
+                           if conn.state != _conn.ConnectionState.DISCONNECTED]
+        for disconnect_fut in disconnect_futs:
+            yield From(disconnect_fut)
+
+    def _least_loaded(self):
+        """
+        Return the index of the connected member with fewest outstanding
+        requests.
+
+        Members which have been disconnected (eg. due to a transport failure)
+        are skipped: requests on them fail at once, so they would otherwise
+        appear to be the least loaded.
+
+        """
+        if not self._connections:
+            raise _errors.DisconnectedError
+        candidates = [index for index in self._spread_order
+                      if self._connections[index].state ==
+                                              _conn.ConnectionState.CONNECTED]
+        if not candidates:
+            raise _errors.DisconnectedError
+
+        def load(index):
+            # Streamed requests are counted by the connection itself.
+            return (self._outstanding[index] +
+                    self._connections[index].streaming_requests)
+
+        return min(candidates, key=load)
+
+    def _on_request_done(self, index, connections, future):
+        # Ignore requests made on a previous set of connections.
+        if connections is self._connections:
+            self._outstanding[index] -= 1
+
+    def _spread(self, method_name, *args, **kwargs):
+        """Make a request on the least loaded member."""
+        index = self._least_loaded()
+        method = getattr(self._connections[index], method_name)
+        return self._track(index, method(*args, **kwargs))
+
+    def _track(self, index, future):
+        """Count `future` against a member until it completes."""
+        self._outstanding[index] += 1
+        future.add_done_callback(functools.partial(self._on_request_done,
+                                                   index, self._connections))
+        return future
+
+    def __getattr__(self, name):
+        if name in ConnectionPool.SPREAD_METHODS:
+            return functools.partial(self._spread, name)
+        elif name in ConnectionPool.PINNED_METHODS:
+            return getattr(self.config_connection, name)
+        raise AttributeError(name)
+
+    def iter_get(self, path, timeout=None):
+        index = self._least_loaded()
+        return self._connections[index].iter_get(path, timeout=timeout)
+
+    @_async.make_task
+    @_async.coroutine
+    def get_many(self, paths, timeout=None):
+        # Each `get()` is spread individually, so the requests are shared
+        # between the members.
+        get_futs = [self._spread("get", path, timeout=timeout)
+                    for path in paths]
+        results = yield From(_async.wait_all(get_futs))
+        raise Return(results)
+
+    def __repr__(self):
+        return "{}(size={}, connected={}, outstanding={!r})".format(
+                                                    type(self).__name__,
+                                                    self._size,
+                                                    bool(self._connections),
+                                                    self._outstanding)
@@ -0,0 +1,24 @@
+# -----------------------------------------------------------------------------
+# _results.py - Containers for request results.
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+"""Containers for request results."""
+
+
+__all__ = (
+    "PathValuePairs",
+)
+
+from ._shared.results import (
+    PathValuePairs,
+)
@@ -19,6 +19,7 @@ __all__ = (
     "Version",
     "MAX_VERSION",
     "UNVERSIONED",
+    "LazySchemaClass",
     "SchemaClass",
     "SchemaClassCategory",
     "SchemaParam",
@@ -41,63 +42,282 @@ from ._shared.schema import(
 )
 
 
+def _convert_version_compatibility(v):
+    if v[0] is None and v[1] is None:
+        out = UNVERSIONED, UNVERSIONED
+    elif v[1] is None:
+        out = Version(**v[0]), MAX_VERSION
+    else:
+        out = Version(**v[0]), Version(**v[1])
+    return out
+
+
+def _decode_table_version(path, d, bag_registry):
+    # An incoming table_version value of None indicates either UNVERSIONED or
+    # None, depending on whether table information is present. The
+    # table_version_compatibility field is used to determine this (it will be
+    # None if table information is not present, or a pair otherwise).
+    if d["table_version_compatibility"] is None:
+        return None
+    return Version(**d["table_version"]) if d["table_version"] else UNVERSIONED
+
+
+def _decode_table_version_compatibility(path, d, bag_registry):
+    if d["table_version_compatibility"] is None:
+        return None
+    return _convert_version_compatibility(d["table_version_compatibility"])
+
+
+def _decode_bag_types(path, d, bag_registry):
+    if d["bag_types"] is None:
+        return None
+    return _bag.bag_types_from_json(d["bag_types"], registry=bag_registry)
+
+
+# Functions to decode each field of a schema class, given the class's path,
+# its `dict` as returned by JSON, and an optional bag type registry.
+_FIELD_DECODERS = {
+    "name": lambda path, d, r: path.elems()[-1].name,
+    "category": lambda path, d, r: SchemaClassCategory[d["category"]],
+    "description": lambda path, d, r: d["description"],
+    "table_description": lambda path, d, r: d["table_description"],
+    "key": lambda path, d, r: [SchemaParam._from_dict(p) for p in d["key"]],
+    "value":
+        lambda path, d, r: [SchemaParam._from_dict(p) for p in d["value"]],
+    "presence":
+        lambda path, d, r: (_path.Path.from_str(d["presence"])
+                            if d["presence"] else None),
+    "version":
+        lambda path, d, r: (Version(**d["version"]) if d["version"]
+                            else UNVERSIONED),
+    "table_version": _decode_table_version,
+    "hidden": lambda path, d, r: d["hidden"],
+    "version_compatibility":
+        lambda path, d, r: _convert_version_compatibility(
+                                                   d["version_compatibility"]),
+    "table_version_compatibility": _decode_table_version_compatibility,
+    "children":
+        lambda path, d, r: [_path.Path.from_str(p) for p in d["children"]],
+    "bag_types": _decode_bag_types,
+}
+
+
 @_utils.copy_docstring_from_parent
 class SchemaClass(schema.SchemaClass):
     # Docstring in parent
     @classmethod
-    def from_dict(cls, path, d):
+    def from_dict(cls, path, d, bag_registry=None):
         """
-        Construct a schema class from a `dict`, as returned by JSON.
+        Construct a schema class from a `dict`, as returned by JSON, sharing
+        bag types with `bag_registry` if given.
 
         This method should not be called directly by external users.
 
         """
+        return cls(**{name: decode(path, d, bag_registry)
+                      for name, decode in _FIELD_DECODERS.items()})
+
+    def _to_dict(self):
+        """
+        Convert the schema class to a `dict`, in the form accepted by
+        :meth:`.from_dict`.
+
+        This method should not be called directly by external users.
+
+        """
+        def convert_version(v):
+            return None if v is UNVERSIONED else {"major": v.major,
+                                                  "minor": v.minor}
+
         def convert_version_compatibility(v):
-            if v[0] is None and v[1] is None:
-                out = UNVERSIONED, UNVERSIONED
-            elif v[1] is None:
-                out = Version(**v[0]), MAX_VERSION
-            else:
-                out = Version(**v[0]), Version(**v[1])
-            return out
-
-        # An incoming table_version value of None indicates either UNVERSIONED
-        # or None, depending on whether table information is present. The
-        # table_version_compatibility field is used to determine this (it will
-        # be None if table information is not present, or a pair otherwise).
-        if d["table_version_compatibility"] is None:
+            low, high = v
+            return [convert_version(low),
+                    None if high is MAX_VERSION else convert_version(high)]
+
+        if self.table_version_compatibility is None:
             table_version = None
             table_version_compatibility = None
         else:
-            table_version = (Version(**d["table_version"])
-                                        if d["table_version"] else UNVERSIONED)
+            table_version = convert_version(self.table_version)
             table_version_compatibility = convert_version_compatibility(
-                                              d["table_version_compatibility"])
+                                              self.table_version_compatibility)
 
-        # Build the `bag_types` field.
-        if d['bag_types'] is not None:
-            bag_types = _bag.bag_types_from_json(d['bag_types'])
+        if self.bag_types is not None:
+            bag_types = _bag.bag_types_to_json(self.bag_types)
         else:
             bag_types = None
 
-        # Make a SchemaClass with the converted schema information.
-        return cls(
-            name=path.elems()[-1].name,
-            category=SchemaClassCategory[d["category"]],
-            description=d["description"],
-            table_description=d["table_description"],
-            key=[SchemaParam._from_dict(p) for p in d["key"]],
-            value=[SchemaParam._from_dict(p) for p in d["value"]],
-            presence=_path.Path.from_str(d["presence"]) if d["presence"]
-                     else None,
-            version=Version(**d["version"]) if d["version"] else UNVERSIONED,
-            table_version=table_version,
-            hidden=d["hidden"],
-            version_compatibility=convert_version_compatibility(
-                                                   d["version_compatibility"]),
-            table_version_compatibility=table_version_compatibility,
-            children=[_path.Path.from_str(p) for p in d["children"]],
-            bag_types=bag_types) 
+        return {
+            "category": self.category.name,
+            "description": self.description,
+            "table_description": self.table_description,
+            "key": [p._to_dict() for p in self.key],
+            "value": [p._to_dict() for p in self.value],
+            "presence": (str(self.presence) if self.presence is not None
+                         else None),
+            "version": convert_version(self.version),
+            "table_version": table_version,
+            "hidden": self.hidden,
+            "version_compatibility": convert_version_compatibility(
+                                                   self.version_compatibility),
+            "table_version_compatibility": table_version_compatibility,
+            "children": [str(p) for p in self.children],
+            "bag_types": bag_types,
+        }
+
+
+class _LazyField(object):
+    """
+    Descriptor which decodes a field of a :class:`.LazySchemaClass` on first
+    access, storing the result in the instance's `__dict__`, which then takes
+    precedence over the descriptor.
+
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._decode = _FIELD_DECODERS[name]
+
+    def __get__(self, obj, cls):
+        if obj is None:
+            return self
+        value = self._decode(obj._path, obj._d, obj._bag_registry)
+        obj.__dict__[self._name] = value
+        return value
+
+
+class LazySchemaClass(SchemaClass):
+    """
+    A :class:`.SchemaClass` which decodes each field from the router's
+    response on first access.
+
+    This behaves exactly as a :class:`.SchemaClass` with the same fields: it
+    is an instance of :class:`.SchemaClass`, compares equal to one, and can be
+    indexed, iterated and unpacked as a tuple. Decoding a class with many
+    children or bag types is costly, so when only some fields of a class are
+    used, eg. :attr:`~.SchemaClass.key`, this is much cheaper. Errors in the
+    response are only detected when the affected field is accessed.
+
+    :meth:`~.SchemaClass._replace` and copying return plain
+    :class:`.SchemaClass` objects.
+
+    The fields are not held in the underlying tuple, which is empty, so code
+    (eg. in C extensions) which reads a tuple's contents directly, rather than
+    through its methods, sees no fields. In particular, using the class as the
+    arguments of `%` formatting raises :exc:`TypeError`; convert the class
+    with `tuple()` first.
+
+    """
+
+    def __new__(cls, path, d, bag_registry=None):
+        self = tuple.__new__(cls, ())
+        self._path = path
+        self._d = d
+        self._bag_registry = bag_registry
+        return self
+
+    @classmethod
+    def from_dict(cls, path, d, bag_registry=None):
+        """
+        Construct a lazily decoded schema class from a `dict`, as returned by
+        JSON, which must not be modified afterwards.
+
+        This method should not be called directly by external users.
+
+        """
+        return cls(path, d, bag_registry)
+
+    def _decoded(self):
+        """Return an equivalent :class:`.SchemaClass`."""
+        return SchemaClass(*self)
+
+    # Tuple behaviour, in terms of the decoded fields.
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self._fields)
+
+    def __getitem__(self, index):
+        return tuple(self)[index]
+
+    def __getslice__(self, i, j):
+        # Python 2 only.
+        return tuple(self)[i:j]
+
+    def __add__(self, other):
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return tuple(self) + tuple(other)
+
+    def __radd__(self, other):
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return tuple(other) + tuple(self)
+
+    def __mul__(self, n):
+        return tuple(self) * n
+
+    __rmul__ = __mul__
+
+    def __contains__(self, value):
+        return value in tuple(self)
+
+    def count(self, value):
+        return tuple(self).count(value)
+
+    def index(self, *args):
+        return tuple(self).index(*args)
+
+    def __eq__(self, other):
+        if not isinstance(other, tuple):
+            return NotImplemented
+        return tuple(self) == tuple(other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    def __lt__(self, other):
+        return tuple(self) < tuple(other)
+
+    def __le__(self, other):
+        return tuple(self) <= tuple(other)
+
+    def __gt__(self, other):
+        return tuple(self) > tuple(other)
+
+    def __ge__(self, other):
+        return tuple(self) >= tuple(other)
+
+    def __hash__(self):
+        return hash(tuple(self))
+
+    def __repr__(self):
+        return repr(self._decoded())
+
+    def __str__(self):
+        return "{}({})".format(SchemaClass.__name__, self.name)
+
+    def _asdict(self):
+        return self._decoded()._asdict()
+
+    def _replace(self, **kwargs):
+        return self._decoded()._replace(**kwargs)
+
+    def _to_dict(self):
+        # The dict the class was created from is already in the form accepted
+        # by `from_dict()`, so is returned without decoding any fields.
+        return self._d
+
+    def __reduce__(self):
+        return SchemaClass, tuple(self)
+
+
+for _name in SchemaClass._fields:
+    setattr(LazySchemaClass, _name, _LazyField(_name))
+del _name
 
 
 @_utils.copy_docstring_from_parent
@@ -120,3 +340,21 @@ class SchemaParam(schema.SchemaParam):
             status=SchemaParamStatus[d["status"]],
             internal_name=d["internal_name"])
 
+    def _to_dict(self):
+        """
+        Convert the schema param to a `dict`, in the form accepted by
+        :meth:`._from_dict`.
+
+        This method should not be called directly by external users.
+
+        """
+        return {
+            "datatype": self.datatype.name,
+            "name": self.name,
+            "description": self.description,
+            "datatype_args": self.datatype_args,
+            "repeat_count": self.repeat_count,
+            "status": self.status.name,
+            "internal_name": self.internal_name,
+        }
+
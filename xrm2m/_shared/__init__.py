@@ -22,6 +22,7 @@ __all__ = (
     'defs',
     'errors',
     'path',
+    'results',
     'schema',
     'transport',
     'utils',
@@ -33,6 +34,7 @@ from . import conn
 from . import defs
 from . import errors
 from . import path
+from . import results
 from . import schema
 from . import transport
 from . import utils
@@ -103,7 +103,7 @@ class _ConnectionBase(object): # pragma: no cover
 
         """
 
-    def get_nested(self, path):
+    def get_nested(self, path, timeout=None):
         """
         Read paths and values under a given path, returning structured data.
 
@@ -150,7 +150,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get(self, path):
+    def get(self, path, timeout=None):
         """
         Read paths and values under a given path.
 
@@ -165,7 +165,9 @@ class _ConnectionBase(object): # pragma: no cover
             returned.
 
         :returns:
-            Iterable of :class:`.Path`, value pairs.
+            A list of :class:`.Path`, value pairs. If the connection was made
+            with `lazy_paths`, a :class:`.PathValuePairs` sequence, whose paths
+            are parsed from the response when first accessed.
 
         :raises:
             - :exc:`.OperationNotSupportedError`
@@ -180,7 +182,83 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_children(self, path):
+    def iter_get(self, path, timeout=None):
+        """
+        Iterate over paths and values under a given path.
+
+        This is equivalent to :meth:`.get`, except pairs are returned as they
+        are received, rather than once the whole response has arrived. The
+        response is decoded incrementally, so memory usage remains low even
+        for very large responses, and the caller can begin processing pairs
+        before the last of the response has been received.
+
+        Example::
+
+            >>> for path, value in c.iter_get(RootOper.Foo.Interface):
+            ...     print(path, value)
+            RootOper.Foo.Interface({'IntfName': 'GigE0'}) {'a': 1, 'b': 2}
+            RootOper.Foo.Interface({'IntfName': 'GigE1'}) {'a': 5, 'b': 6}
+
+        For a :class:`.AsyncConnection` the return value is an
+        :class:`asynchronous iterator <asyncio.AsyncIterator>`, for use with
+        `async for` on Python 3.5+. Alternatively, its `next_item()` method
+        returns a future which completes with the next pair, or `None` once
+        all pairs have been returned.
+
+        If a :class:`.Connection`'s iterator is abandoned before it is
+        exhausted, the rest of the response is received and discarded.
+
+        :param path:
+            :class:`.Path` identifying which paths and values should be
+            returned.
+
+        :returns:
+            Iterator of :class:`.Path`, value pairs.
+
+        :raises:
+            Raised by the iterator, after any pairs received before the error.
+            See :meth:`.get` for the possible exceptions.
+
+        """
+        raise NotImplementedError
+
+    def get_many(self, paths, timeout=None):
+        """
+        Read paths and values under each of several paths.
+
+        This is equivalent to calling :meth:`.get` for each path in turn,
+        except every request is sent before waiting for any response. The cost
+        of polling many paths is then closer to that of a single round trip,
+        rather than one round trip per path.
+
+        Example::
+
+            >>> intfs = RootOper.InfraStatistics.Interface
+            >>> for result in c.get_many([intfs("GigE0").Latest,
+            ...                           intfs("GigE1").Latest]):
+            ...     print(len(result))
+            12
+            12
+
+        :param paths:
+            Iterable of :class:`.Path` identifying which paths and values
+            should be returned.
+
+        :returns:
+            A list with one entry per input path, in input order. Each entry is
+            the result that :meth:`.get` would return for the corresponding
+            path.
+
+        :raises:
+            If any of the requests fail, the exception raised by the first
+            failing request (in input order) is raised, once all of the
+            requests have completed. See :meth:`.get` for the possible
+            exceptions.
+
+        """
+        raise NotImplementedError
+
+    def get_children(self, path, timeout=None):
         """
         Read key/index information (in the form of paths) under a given path.
 
@@ -199,6 +277,9 @@ class _ConnectionBase(object): # pragma: no cover
         :returns:
             Iterable of :class:`.Path`.
 
+        If the connection was made with a `children_cache` (see
+        :func:`.connect`), the result may be returned from the cache.
+
         :raises:
             - :exc:`.OperationNotSupportedError`
             - :exc:`.InvalidArgumentError`
@@ -212,7 +293,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def set(self, leaf_or_iter, value=None):
+    def set(self, leaf_or_iter, value=None, timeout=None):
         """
         Set the value of one or more leaves.
 
@@ -253,7 +334,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def delete(self, path_or_iter):
+    def delete(self, path_or_iter, timeout=None):
         """
         Delete the contents of one or more leaves/subtrees.
 
@@ -275,7 +356,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def replace(self, subtree_or_iter):
+    def replace(self, subtree_or_iter, timeout=None):
         """
         Mark one or more subtrees for atomic replacement.
 
@@ -295,7 +376,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def commit(self):
+    def commit(self, timeout=None):
         """
         Commit the config changes made using this connection.
 
@@ -307,7 +388,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def commit_replace(self):
+    def commit_replace(self, timeout=None):
         """
         Commit the config changes made using this connection, replacing all
         existing config.
@@ -320,7 +401,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def discard_changes(self):
+    def discard_changes(self, timeout=None):
         """
         Discard any uncommitted config changes made using this connection.
 
@@ -331,7 +412,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_changes(self):
+    def get_changes(self, timeout=None):
         """
         Return the changes in running config built up (but not yet commited) on
         this connection.
@@ -362,7 +443,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_version(self):
+    def get_version(self, timeout=None):
         """
         Return the current M2M API version number.
 
@@ -377,7 +458,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_parent(self, path):
+    def get_parent(self, path, timeout=None):
         """
         Get the parent of a data path.
 
@@ -387,6 +468,11 @@ class _ConnectionBase(object): # pragma: no cover
         :returns:
             A :class:`.Path` which is the parent of the path being found.
 
+        If the connection was made with a `schema_cache` (see
+        :func:`.connect`), the parent is determined from the cached schema
+        where possible (see :meth:`.SchemaCache.get_parent`), rather than by
+        making a request.
+
         :raises:
             - :exc:`.PathHierarchyError`
             - :exc:`.PathStringFormatError`
@@ -398,7 +484,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def cli_describe(self, command, config=False):
+    def cli_describe(self, command, config=False, timeout=None):
         """
         Find underlying requests associated with a given command.
 
@@ -413,6 +499,9 @@ class _ConnectionBase(object): # pragma: no cover
         :returns:
             A sequence of :class:`.Request` objects.
 
+        If the connection was made with a `cli_cache` (see :func:`.connect`),
+        descriptions are returned from the cache where possible.
+
         :raises:
             - :class:`.DisconnectedError` if the connection was lost.
             - :class:`.InvalidArg` if the command is invalid.
@@ -420,13 +509,20 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def cli_get(self, command):
+    def cli_get(self, command, timeout=None, via_paths=False):
         """
         Retrieve data given a CLI command.
 
         The command is equivalent to doing a :meth:`.get` call for each path
         that the command fetches, and concatenating the results.
 
+        If `via_paths` is true, this is done literally: the command is
+        described with :meth:`.cli_describe`, and a :meth:`.get` request is
+        made for each path, all at once. With a `cli_cache` (see
+        :func:`.connect`), the router then only parses each distinct command
+        once, however often it is run. Commands which are described as
+        anything other than `get` requests are sent to the router as usual.
+
         Example::
 
             >>> c.cli_get("show foo interfaces")
@@ -436,8 +532,12 @@ class _ConnectionBase(object): # pragma: no cover
         :param command:
             CLI command to fetch data for.
 
+        :param via_paths:
+            Whether to fetch the data with path-based requests, as above.
+
         :returns:
-            Iterable of :class:`.Path`, value pairs.
+            A list of :class:`.Path`, value pairs, or a
+            :class:`.PathValuePairs` sequence, as for :meth:`.get`.
 
         :raises:
             - :exc:`.InvalidArgumentError`
@@ -447,7 +547,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def cli_get_nested(self, command):
+    def cli_get_nested(self, command, timeout=None):
         """
         Retrieve structured data given a CLI command.
 
@@ -492,7 +592,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def cli_set(self, command):
+    def cli_set(self, command, timeout=None):
         """
         Set/delete data corresponding with a config CLI command.
 
@@ -511,7 +611,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def cli_exec(self, command):
+    def cli_exec(self, command, timeout=None):
         """
         Execute a CLI comand and return the resulting string.
 
@@ -529,7 +629,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def write_file(self, data, filename):
+    def write_file(self, data, filename, timeout=None):
         """
         Writes the given string to the router's filesystem.
 
@@ -549,7 +649,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_value(self, path):
+    def get_value(self, path, timeout=None):
         """
         Retrieve the value of a given path.
 
@@ -581,7 +681,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def get_schema(self, path):
+    def get_schema(self, path, timeout=None):
         """
         Return the schema meta-data for a path.
 
@@ -617,6 +717,10 @@ class _ConnectionBase(object): # pragma: no cover
             >>> conn.get_schema(RootOper.Missing.Interface)
             PathHierarchyError: 'Missing' is not a child of 'RootOper'
 
+        If the connection was made with a `schema_cache` (see
+        :func:`.connect`), schema classes are returned from the cache where
+        possible.
+
         :param path:
             :class:`.Path` identifying the point in the hierarchy of interest.
 
@@ -632,7 +736,7 @@ class _ConnectionBase(object): # pragma: no cover
         """
         raise NotImplementedError
 
-    def normalize_path(self, path):
+    def normalize_path(self, path, timeout=None):
         """
         Return a validated copy of a path in the canonical format.
 
@@ -663,6 +767,12 @@ class _ConnectionBase(object): # pragma: no cover
         It raises :exc:`.PathKeyContentError` if one of the key values is
         incompatible with the data type defined by the schema.
 
+        If the connection was made with a `schema_cache` (see
+        :func:`.connect`), the path is normalized using the cached schema
+        where possible (see :meth:`.SchemaCache.normalize_path`), rather than
+        by making a request. Paths which can't be normalized from the cache,
+        including invalid paths, are sent to the router as usual.
+
         :raises:
             - :exc:`.PathHierarchyError`
             - :exc:`.PathStringFormatError`
@@ -685,6 +795,12 @@ class Connection(_ConnectionBase):
     Connections are created with :func:`.connect`, or :func:`.sync`. See the
     corresponding documentation for more information.
 
+    Each request method accepts an optional `timeout` argument: the number of
+    seconds to wait for the response before raising
+    :exc:`.RequestTimeoutError`. If omitted, the `request_timeout` passed to
+    :func:`.connect` is used. The connection remains usable after a request
+    times out.
+
     """
 
 
@@ -704,7 +820,13 @@ class AsyncConnection(_ConnectionBase):
     """
 
 
-def connect_async(transport=None, loop=None): # pragma: no cover
+def connect_async(transport=None, loop=None, batch_requests=False,
+                  codec=None, request_timeout=None,
+                  max_outstanding=None, schema_cache=None,
+                  response_cache=None, cli_cache=None,
+                  children_cache=None, path_interner=None,
+                  bag_registry=None, lazy_schema=False,
+                  lazy_paths=False): # pragma: no cover
     """
     Asynchronously connect to a router, via the given transport.
 
@@ -722,6 +844,42 @@ def connect_async(transport=None, loop=None): # pragma: no cover
         :class:`.AsyncConnection` object. See `Event Loops
         <conn.html#event-loops>`__ for more details.
 
+    :param batch_requests:
+        See :func:`.connect`.
+
+    :param codec:
+        See :func:`.connect`.
+
+    :param request_timeout:
+        See :func:`.connect`.
+
+    :param max_outstanding:
+        See :func:`.connect`.
+
+    :param schema_cache:
+        See :func:`.connect`.
+
+    :param response_cache:
+        See :func:`.connect`.
+
+    :param cli_cache:
+        See :func:`.connect`.
+
+    :param children_cache:
+        See :func:`.connect`.
+
+    :param path_interner:
+        See :func:`.connect`.
+
+    :param bag_registry:
+        See :func:`.connect`.
+
+    :param lazy_schema:
+        See :func:`.connect`.
+
+    :param lazy_paths:
+        See :func:`.connect`.
+
     :returns:
         A :class:`.AsyncConnection` representing the new connection.
 
@@ -732,7 +890,13 @@ def connect_async(transport=None, loop=None): # pragma: no cover
     raise NotImplementedError
 
 
-def connect(transport=None, loop=None): # pragma: no cover
+def connect(transport=None, loop=None, batch_requests=False,
+            codec=None, request_timeout=None,
+            max_outstanding=None, schema_cache=None,
+            response_cache=None, cli_cache=None,
+            children_cache=None, path_interner=None,
+            bag_registry=None, lazy_schema=False,
+            lazy_paths=False): # pragma: no cover
     """
     Connect to a router, via the given transport.
 
@@ -746,6 +910,85 @@ def connect(transport=None, loop=None): # pragma: no cover
         made. If not provided the default event loop will be used. See `Event
         Loops <conn.html#event-loops>`__ for more details.
 
+    :param batch_requests:
+        If `True`, requests made in the same iteration of the event loop (for
+        example, by :meth:`.Connection.get_many`) are sent together as a single
+        JSON-RPC batch, rather than one request per line. If the server does
+        not support batches then the connection falls back to sending one
+        request per line.
+
+    :param codec:
+        The JSON library used to encode requests and decode responses. One of
+        "orjson", "ujson", "simplejson" or "json" (the standard library). If
+        omitted, the fastest installed library is used: "orjson", then
+        "ujson", then "json".
+
+    :param request_timeout:
+        Default timeout, in seconds, for requests made on the connection. If a
+        response is not received in time, the request raises
+        :exc:`.RequestTimeoutError`. Can be overridden per request with the
+        `timeout` argument to request methods. If omitted, requests never time
+        out.
+
+    :param max_outstanding:
+        Maximum number of requests which may be awaiting a response at once.
+        Further requests wait until an earlier request completes before being
+        sent. Requests made with :meth:`.Connection.iter_get` count towards
+        the limit until the whole response has been received. If omitted, the
+        number of requests is unlimited.
+
+    :param schema_cache:
+        A :class:`.SchemaCache` in which to keep the results of
+        :meth:`.Connection.get_schema`, so that each schema class is only
+        requested once. The cache may be shared with other connections. It is
+        cleared on connecting if the router's software version has changed.
+        If omitted, schema is requested every time.
+
+    :param response_cache:
+        A :class:`.ResponseCache` from which to answer
+        :meth:`.Connection.get` and :meth:`.Connection.get_nested` requests,
+        within a time to live configured per path prefix. Identical requests
+        made while one is in flight share its response. Values in the
+        results are shared between callers, so must not be modified. If
+        omitted, every request is sent to the router.
+
+    :param cli_cache:
+        A :class:`.CLICache` in which to keep the results of
+        :meth:`.Connection.cli_describe`, which are then reused by
+        :meth:`.Connection.cli_get` with `via_paths=True`. As for
+        `schema_cache`, it is cleared on connecting if the router's software
+        version has changed.
+
+    :param children_cache:
+        A :class:`.ChildrenCache` from which to answer
+        :meth:`.Connection.get_children` requests where possible. Entries are
+        invalidated by configuration requests made on the connection, and
+        entries for operational data expire. If omitted, every request is
+        sent to the router.
+
+    :param path_interner:
+        A :class:`.PathInterner` with which to create the paths returned by
+        :meth:`~.Connection.get`, :meth:`~.Connection.iter_get`,
+        :meth:`~.Connection.get_children`, :meth:`~.Connection.get_changes`
+        and :meth:`~.Connection.cli_get`, and those in errors, so that
+        identical paths are only parsed once and share a single object.
+
+    :param bag_registry:
+        A :class:`.BagTypeRegistry` with which the schema classes returned by
+        :meth:`~.Connection.get_schema` share their bag types. Defaults to
+        that of `schema_cache`, if given.
+
+    :param lazy_schema:
+        If true, :meth:`~.Connection.get_schema` returns
+        :class:`.LazySchemaClass` objects, which only decode each field when
+        it is first accessed.
+
+    :param lazy_paths:
+        If true, :meth:`~.Connection.get` and :meth:`~.Connection.cli_get`
+        return :class:`.PathValuePairs` sequences, which only parse each path
+        when it is first accessed, rather than lists. This is cheaper for
+        callers which only use some of the paths, or only the values.
+
     :returns:
         A :class:`.Connection` object representing the new connection.
 
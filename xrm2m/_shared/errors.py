@@ -35,6 +35,7 @@ __all__ = (
     'PathKeyContentError',
     'PathKeyStructureError',
     'PathStringFormatError',
+    'RequestTimeoutError',
     'ValueContentError',
     'ValueStructureError',
 )
@@ -65,6 +66,27 @@ class DisconnectedError(Exception):
     """
 
 
+class RequestTimeoutError(Exception):
+    """
+    Raised if the response to a request is not received within the timeout.
+
+    See the `timeout` argument to the :class:`.Connection` request methods, and
+    the `request_timeout` argument to :func:`.connect`.
+
+    The connection remains usable after a request times out. If the response
+    arrives later, it is discarded.
+
+    .. attribute:: timeout
+
+        The timeout, in seconds, which expired.
+
+    """
+
+    def __init__(self, msg, timeout=None):
+        self.timeout = timeout
+        super(RequestTimeoutError, self).__init__(msg)
+
+
 class AmbiguousPathError(Exception):
     """
     A `get_value` request matched multiple paths.
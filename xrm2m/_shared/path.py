@@ -27,7 +27,9 @@ __all__ = (
 
 import collections
 import json
+import re
 import string
+import weakref
 
 from . import defs
 from . import _pathstr
@@ -107,9 +109,84 @@ class Path(object):
     Paths are hashable. Two paths are considered equal if they encode the same
     schema hierarchy and key information.
 
+    Paths are immutable. Each path refers to the path of its parent, so
+    extending a path takes constant time, and the path's hash and string
+    representation are computed once, when first needed. Attribute access
+    returns the same object each time, for as long as that object is in use
+    elsewhere, so paths built from a common prefix share its objects.
+
     """
+
+    __slots__ = ("_parent", "_elem", "_len", "_elements", "_hash", "_str",
+                 "_key_index", "_key_values", "_children", "_unkeyed",
+                 "__weakref__")
+
+    # Maximum number of children remembered by each path. See `__getattr__()`.
+    _MAX_CHILDREN = 256
+
     def __init__(self, elements):
-        self._elements = list(elements)
+        elements = list(elements)
+        parent = None
+        for elem in elements[:-1]:
+            parent = self._new_child(parent, elem)
+        self._init_node(parent, elements[-1] if elements else None)
+
+    def _init_node(self, parent, elem):
+        """
+        Initialize a path with the given parent path (or `None`), and final
+        element (or `None`, for an empty path).
+
+        Every slot must be set here, since reading an unset slot would fall
+        back to :meth:`.__getattr__`.
+
+        """
+        self._parent = parent
+        self._elem = elem
+        if elem is None:
+            self._len = 0
+        elif parent is None:
+            self._len = 1
+        else:
+            self._len = parent._len + 1
+
+        # Tuple of elements, hash and string form, when first computed.
+        self._elements = None
+        self._hash = None
+        self._str = None
+
+        # Key values by name (the first, for repeated names) and tuple of all
+        # key values, when first needed. See `_key_lookups()`.
+        self._key_index = None
+        self._key_values = None
+
+        # Weak references to the children returned by `__getattr__()`, by
+        # element name, or `None` if there are none.
+        self._children = None
+
+        # For a path created by adding keys to another, that path, which is
+        # kept alive so that it's shared by other paths with the same prefix.
+        self._unkeyed = None
+
+    def _new_child(self, parent, elem):
+        """Return a new path of this type, with a given parent and element."""
+        child = object.__new__(type(self))
+        child._init_node(parent, elem)
+        return child
+
+    def _elem_tuple(self):
+        """Return a tuple of this path's elements."""
+        if self._elements is None:
+            elems = []
+            node = self
+            while node is not None and node._elem is not None:
+                if node._elements is not None:
+                    elems.extend(reversed(node._elements))
+                    break
+                elems.append(node._elem)
+                node = node._parent
+            elems.reverse()
+            self._elements = tuple(elems)
+        return self._elements
 
     def elems(self):
         """
@@ -139,7 +216,7 @@ class Path(object):
             ValueError: Path slices must include the start of the path
 
         """
-        return self._elements
+        return list(self._elem_tuple())
 
     def __getitem__(self, name_or_idx):
         """
@@ -176,18 +253,64 @@ class Path(object):
         (including :meth:`.Connection.normalize_path`).
 
         """
-        all_keys = [(name, val) for el in self.elems()
-                                               for name, val in el._key_info]
-
+        key_index, key_values = self._key_lookups()
         if isinstance(name_or_idx, str):
-            out = collections.OrderedDict(reversed(all_keys))[name_or_idx]
-        elif isinstance(name_or_idx, (int, slice)):
-            out = [val for (name, val) in all_keys][name_or_idx]
+            out = key_index[name_or_idx]
+        elif isinstance(name_or_idx, int):
+            out = key_values[name_or_idx]
+        elif isinstance(name_or_idx, slice):
+            out = list(key_values[name_or_idx])
         else:
             raise TypeError
 
         return out
 
+    def keys_dict(self):
+        """
+        Return the values of all named keys in the path, by name.
+
+        .. sourcecode:: python
+
+            >>> path
+            Path(RootOper.Interfaces.Interface(InterfaceName='Gi0').Latest)
+            >>> path.keys_dict()
+            OrderedDict([('InterfaceName', 'Gi0')])
+
+        As for :meth:`.__getitem__`, if the path includes multiple keys with
+        the same name then the first is used. Keys without names are omitted.
+
+        :returns:
+            A new :class:`collections.OrderedDict`, in path order.
+
+        """
+        return collections.OrderedDict(self._key_lookups()[0])
+
+    def _key_lookups(self):
+        """
+        Return this path's key index and key values.
+
+        The index is an `OrderedDict` mapping each key name to the value of
+        the first key with that name, and the values a tuple of every key
+        value, in path order. These are built from the parent's when first
+        needed, and shared with the parent if this path's final element has no
+        keys, so must not be modified.
+
+        """
+        if self._key_index is None:
+            if self._parent is None:
+                key_index, key_values = collections.OrderedDict(), ()
+            else:
+                key_index, key_values = self._parent._key_lookups()
+            if self._elem is not None and self._elem._key_info:
+                key_index = collections.OrderedDict(key_index)
+                for name, val in self._elem._key_info:
+                    if name is not None and name not in key_index:
+                        key_index[name] = val
+                key_values += tuple(val for _, val in self._elem._key_info)
+            self._key_index = key_index
+            self._key_values = key_values
+        return self._key_index, self._key_values
+
     @classmethod
     def from_str(cls, pathstr):
         r"""
@@ -258,9 +381,19 @@ class Path(object):
         assert elems
         assert elems[0].name in {"RootOper", "RootCfg", "RootAction"}
 
-        path = cls([])
+        # Start from the predefined root path if possible, so that the result
+        # shares the objects for any unkeyed prefix with other paths.
+        root_name, root_key_info = elems[0]
+        if cls is Path and not root_key_info:
+            path = _ROOTS[root_name]
+            elems = elems[1:]
+        else:
+            path = cls([])
+
         for name, key_info in elems:
-            path = getattr(path, name)(key_info)
+            path = getattr(path, name)
+            if key_info:
+                path = path(key_info)
         return path
 
     def __eq__(self, other):
@@ -272,15 +405,37 @@ class Path(object):
         # (it would require a schema lookup).
         if not isinstance(other, Path):
             return NotImplemented
-        return self.elems() == other.elems()
+        if self._len != other._len:
+            return False
+        if (self._hash is not None and other._hash is not None and
+                                                   self._hash != other._hash):
+            return False
+
+        # Compare elements from the end, stopping at a common ancestor.
+        a, b = self, other
+        while a is not b and a is not None:
+            if a._elem != b._elem:
+                return False
+            a, b = a._parent, b._parent
+        return True
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
 
     def __hash__(self):
-        return hash(tuple(self.elems()))
+        if self._hash is None:
+            if self._parent is None:
+                self._hash = hash((self._elem,))
+            else:
+                self._hash = hash((hash(self._parent), self._elem))
+        return self._hash
 
     def __repr__(self):
         """See :meth:`.Path.__str__`."""
         return "{}({})".format(type(self).__name__,
-                          ".".join(el._repr_no_class() for el in self.elems()))
+                               ".".join(el._repr_no_class()
+                                        for el in self._elem_tuple()))
 
     def __str__(self):
         """
@@ -302,7 +457,14 @@ class Path(object):
             RootCfg.InterfaceConfiguration(["act", "Loopback0"])
 
         """
-        return ".".join(str(el) for el in self.elems())
+        if self._str is None:
+            if self._elem is None:
+                self._str = ""
+            elif self._parent is None or self._parent._elem is None:
+                self._str = str(self._elem)
+            else:
+                self._str = "{}.{}".format(self._parent, self._elem)
+        return self._str
 
     @staticmethod
     def _make_path_element(elem_name):
@@ -319,8 +481,33 @@ class Path(object):
             Name of the additional element.
 
         """
-        return type(self)(self._elements +
-                          [self._make_path_element(elem_name)])
+        children = self._children
+        if children is not None:
+            child_ref = children.get(elem_name)
+            if child_ref is not None:
+                child = child_ref()
+                if child is not None:
+                    return child
+
+        # The empty path has no element, so its children have no parent (and
+        # aren't remembered).
+        if self._elem is None:
+            return self._new_child(None, self._make_path_element(elem_name))
+
+        # Remember the child, so that it's shared by later calls while it is
+        # alive. Once the limit is reached, references to dead children are
+        # discarded, and failing that all of them.
+        child = self._new_child(self, self._make_path_element(elem_name))
+        if children is None:
+            children = self._children = {}
+        elif len(children) >= self._MAX_CHILDREN:
+            for name, child_ref in list(children.items()):
+                if child_ref() is None:
+                    del children[name]
+            if len(children) >= self._MAX_CHILDREN:
+                children.clear()
+        children[elem_name] = weakref.ref(child)
+        return child
 
     def __call__(self, *key_seq, **key_map):
         """
@@ -386,8 +573,12 @@ class Path(object):
 
         # Return a new path identical to this path, but with the last element
         # updated to have key information.
-        elems = self.elems()
-        return type(self)(elems[:-1] + [elems[-1]._add_key_info(key_info)])
+        if self._elem is None:
+            raise IndexError("Can't add key information to an empty path")
+        keyed = self._new_child(self._parent,
+                                self._elem._add_key_info(key_info))
+        keyed._unkeyed = self
+        return keyed
 
 
 class PathElement(object):
@@ -437,8 +628,12 @@ class PathElement(object):
            >>> intf.key
            OrderedDict([('Active', 'act'), ('InterfaceName', 'HundredGigE0/0/0/0')])
 
+    Path elements are immutable.
+
     """
 
+    __slots__ = ("_name", "_key_info", "_hash", "_str")
+
     def __init__(self, name, key_info=()):
         """
         Create a path element instance.
@@ -458,7 +653,13 @@ class PathElement(object):
         """
 
         self._name = name
-        self._key_info = key_info
+        self._hash = None
+        self._str = None
+
+        if not key_info:
+            # Elements without keys, the common case, need no checks.
+            self._key_info = ()
+            return
 
         # Sanitize and validate key names and values.
         def sanitize_key_name(name):
@@ -471,23 +672,24 @@ class PathElement(object):
             if isinstance(val, (type(b""), type(""))):
                 return utils.sanitize_input_string(val)
             return val
-        self._key_info = [(sanitize_key_name(name), sanitize_key_value(val))
-                                               for name, val in self._key_info]
+        self._key_info = tuple((sanitize_key_name(name),
+                                sanitize_key_value(val))
+                               for name, val in key_info)
 
-        name_counts = collections.Counter(name for name, val in key_info)
+        name_counts = collections.Counter(name for name, val in self._key_info)
         # Check that there are no duplicate keys in the key information.
         # The assert below should be impossible to hit (and reflects an M2M
         # bug, rather than error in client input)
         assert not any(name is not None and count > 1
                        for name, count in name_counts.items()), name_counts
         # Check that either all names are None, or none are None.
-        if 0 < name_counts[None] < len(key_info):
+        if 0 < name_counts[None] < len(self._key_info):
             raise ValueError("Mixture of named keys and unnamed keys.")
 
         # Check that if `WILDCARD_ALL` appears then it is the only item of key
         # information (and no name is provided).
-        if (defs.WILDCARD_ALL in (val for name, val in key_info) and
-                                   key_info != [(None, defs.WILDCARD_ALL)]):
+        if (defs.WILDCARD_ALL in (val for name, val in self._key_info) and
+                           self._key_info != ((None, defs.WILDCARD_ALL),)):
             raise ValueError("WILDCARD_ALL passed with other key information.")
 
     @property
@@ -536,8 +738,13 @@ class PathElement(object):
                 self._name == other._name and
                 self._key_info == other._key_info)
 
+    def __ne__(self, other):
+        return not self == other
+
     def __hash__(self):
-        return hash((type(self), self._name, tuple(self._key_info)))
+        if self._hash is None:
+            self._hash = hash((type(self), self._name, self._key_info))
+        return self._hash
 
     def _has_names(self):
         """
@@ -560,12 +767,9 @@ class PathElement(object):
         """Utility to determine if the key info WILDCARD_ALL."""
         assert self._has_key_info()
         assert ((self._key_info[0][1] is not defs.WILDCARD_ALL) ^
-                (self._key_info == [(None, defs.WILDCARD_ALL)]))
+                (self._key_info == ((None, defs.WILDCARD_ALL),)))
         return self._key_info[0][1] is defs.WILDCARD_ALL
 
-    _LITERAL_CHARS = set(string.ascii_letters +
-                         string.digits +
-                         string.punctuation + ' ')
     _ESCAPED_CHARS = {
         '"': '\\"',
         '\\': '\\\\',
@@ -580,6 +784,7 @@ class PathElement(object):
     _LITERAL_CHARS = set(string.ascii_letters +
                          string.digits +
                          string.punctuation + ' ') - set(_ESCAPED_CHARS.keys())
+
     @staticmethod
     def _encode_char(c):
         if c in PathElement._LITERAL_CHARS:
@@ -590,10 +795,19 @@ class PathElement(object):
             out = "\\x{:02x}".format(ord(c))
         return  out
 
+    # Regex matching any character which isn't encoded literally. Most keys
+    # (eg. interface names) are entirely literal, so are encoded with a single
+    # search, rather than a lookup per character.
+    _NON_LITERAL_RE = re.compile("[^{}]".format(
+                               re.escape("".join(sorted(_LITERAL_CHARS)))))
+
     @staticmethod
     def _encode_string(s):
         """Encode a string, as it would appear in a path string."""
-        return '"{}"'.format(''.join(PathElement._encode_char(c) for c in s))
+        if PathElement._NON_LITERAL_RE.search(s) is not None:
+            s = PathElement._NON_LITERAL_RE.sub(
+                          lambda m: PathElement._encode_char(m.group()), s)
+        return '"' + s + '"'
 
     @staticmethod
     def _encode_scalar(val):
@@ -662,6 +876,12 @@ class PathElement(object):
 
     def __str__(self):
         """See :meth:`.Path.__str__`."""
+        if self._str is None:
+            self._str = self._encode()
+        return self._str
+
+    def _encode(self):
+        """Return the string representation of this element."""
         if self._has_key_info():
             if self._is_wildcard_all():
                 key_info_str = "*"
@@ -693,3 +913,10 @@ RootAction = Path([PathElement("RootAction")])
 RootCfg = Path([PathElement("RootCfg")])
 RootOper = Path([PathElement("RootOper")])
 
+# Root paths by name, for `Path.from_str()`.
+_ROOTS = {
+    "RootAction": RootAction,
+    "RootCfg": RootCfg,
+    "RootOper": RootOper,
+}
+
@@ -0,0 +1,130 @@
+# -----------------------------------------------------------------------------
+# results.py - Containers for request results.
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+
+"""Containers for request results."""
+
+
+__all__ = (
+    "PathValuePairs",
+)
+
+
+import collections
+import operator
+
+from . import path
+
+
+class PathValuePairs(collections.Sequence):
+    """
+    Sequence of :class:`.Path`, value pairs, as returned by
+    :meth:`.Connection.get` and :meth:`.Connection.cli_get` on connections
+    made with `lazy_paths` (see :func:`.connect`).
+
+    The sequence behaves like a list of `(path, value)` tuples, and compares
+    equal to such a list. However, the paths are only parsed from their string
+    representations when they are first accessed, after which the parsed path
+    is cached. Consumers which only need the values (see :meth:`.values`) never
+    pay for parsing paths.
+
+    Because parsing is deferred, a malformed path string in a response is only
+    detected when the corresponding path is accessed, at which point the
+    relevant exception (eg. :exc:`.PathStringFormatError`) is raised.
+
+    """
+
+    __slots__ = ("_raw", "_paths", "_parse_path")
+
+    def __init__(self, raw_pairs, parse_path=None):
+        """
+        Create a sequence from the `[path string, value]` pairs of a response.
+
+        `parse_path` is an optional function used in place of
+        :meth:`.Path.from_str` to create each path.
+
+        """
+        self._raw = raw_pairs
+        self._parse_path = parse_path
+
+        # Parsed paths, or None for paths that haven't been accessed yet.
+        self._paths = [None] * len(raw_pairs)
+
+    @classmethod
+    def _concat(cls, seqs):
+        """
+        Return the concatenation of several sequences, keeping any paths which
+        have already been parsed.
+
+        """
+        out = cls([pair for seq in seqs for pair in seq._raw],
+                  parse_path=seqs[0]._parse_path if seqs else None)
+        out._paths = [p for seq in seqs for p in seq._paths]
+        return out
+
+    def _path(self, index):
+        p = self._paths[index]
+        if p is None:
+            if self._parse_path is None:
+                p = path.Path.from_str(self._raw[index][0])
+            else:
+                p = self._parse_path(self._raw[index][0])
+            self._paths[index] = p
+        return p
+
+    def __len__(self):
+        return len(self._raw)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            out = PathValuePairs(self._raw[index],
+                                 parse_path=self._parse_path)
+            out._paths = self._paths[index]
+            return out
+
+        index = operator.index(index)
+        if index < 0:
+            index += len(self._raw)
+        if not 0 <= index < len(self._raw):
+            raise IndexError("PathValuePairs index out of range")
+        return self._path(index), self._raw[index][1]
+
+    def __iter__(self):
+        for index, (_, value) in enumerate(self._raw):
+            yield self._path(index), value
+
+    def values(self):
+        """Return a list of the values, without parsing any paths."""
+        return [value for _, value in self._raw]
+
+    def path_strings(self):
+        """Return a list of the paths' string representations, unparsed."""
+        return [path_str for path_str, _ in self._raw]
+
+    def paths(self):
+        """Return a list of the paths."""
+        return [self._path(index) for index in range(len(self._raw))]
+
+    def __eq__(self, other):
+        if not isinstance(other, collections.Sequence) or isinstance(
+                                              other, (type(""), type(b""))):
+            return NotImplemented
+        return len(self) == len(other) and list(self) == list(other)
+
+    def __ne__(self, other):
+        eq = self.__eq__(other)
+        return eq if eq is NotImplemented else not eq
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, list(self))
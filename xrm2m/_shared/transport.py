@@ -113,6 +113,27 @@ class Transport(object):
         """
         raise NotImplementedError
 
+    def write_buffer_full(self):
+        """
+        Indicate whether the write buffer is above its high water mark.
+
+        While this returns True, callers should wait for :meth:`.drain` to
+        complete before writing more data. Transports whose writes are not
+        buffered need not override this method, which returns False.
+
+        """
+        return False
+
+    def drain(self):
+        """
+        Asynchronously wait for the write buffer to drain to its low water
+        mark.
+
+        This is only called while :meth:`.write_buffer_full` returns True.
+
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def read(self):
         """
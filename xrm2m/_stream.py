@@ -0,0 +1,202 @@
+# -----------------------------------------------------------------------------
+# _stream.py - Incremental decoding of streamed responses
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""
+Incremental decoding of streamed responses.
+
+A `get` response in "pairs" format consists of a single line of the form::
+
+    {"jsonrpc": "2.0", "id": 7, "result": [["path1", value1], ...]}
+
+Such a response can be tens of megabytes in size. Rather than waiting for the
+whole line and decoding it in one go, :class:`.PairsDecoder` decodes each
+path/value pair as soon as all of its bytes have been received, so that only
+the undecoded tail of the line needs to be held in memory.
+
+"""
+
+__all__ = (
+    'match_pairs_prefix',
+    'PairsDecoder',
+    'PREFIX_MAX_LEN',
+)
+
+
+import json
+import re
+
+from . import _errors
+
+
+# Matches the start of a successful response, up to and including the opening
+# bracket of the result array. Only responses which start in this way can be
+# streamed; any other response (eg. an error response, or one where the result
+# precedes the ID) is decoded in full once the whole line has been received.
+_PAIRS_PREFIX_RE = re.compile(r'{ws}\{{{ws}'
+                              r'(?:"jsonrpc"{ws}:{ws}"2\.0"{ws},{ws})?'
+                              r'"id"{ws}:{ws}(\d+){ws},{ws}'
+                              r'(?:"jsonrpc"{ws}:{ws}"2\.0"{ws},{ws})?'
+                              r'"result"{ws}:{ws}\['.format(ws=r'[ \t\r]*'))
+
+
+# If this many characters of a line have been received and the line does not
+# match `_PAIRS_PREFIX_RE`, it never will.
+PREFIX_MAX_LEN = 128
+
+
+# Whitespace within a line. Newlines terminate a line, so are not included.
+_WHITESPACE_RE = re.compile(r'[ \t\r]*')
+
+
+def match_pairs_prefix(s):
+    """
+    Match the start of a streamable response.
+
+    :param s:
+        The (possibly incomplete) start of a line.
+
+    :returns:
+        A tuple `(id, end)`, where `id` is the ID of the response and `end` is
+        the index in `s` just after the opening bracket of the result array, or
+        `None` if `s` does not start with a streamable response.
+
+    """
+    m = _PAIRS_PREFIX_RE.match(s)
+    if m is None:
+        return None
+    return int(m.group(1)), m.end()
+
+
+class PairsDecoder(object):
+    """
+    Decode the result array of a "pairs" response, one pair at a time.
+
+    The decoder is fed the remainder of the response line, starting just after
+    the opening bracket of the result array (see :func:`.match_pairs_prefix`).
+    It calls `on_pair` with each `[path, value]` pair as it is decoded.
+
+    """
+
+    # Decoder states.
+    _EXPECT_PAIR_OR_END = 0
+    _EXPECT_PAIR = 1
+    _EXPECT_COMMA_OR_END = 2
+    _EXPECT_NEWLINE = 3
+
+    def __init__(self, on_pair):
+        self._on_pair = on_pair
+        self._state = self._EXPECT_PAIR_OR_END
+        self._decoder = json.JSONDecoder()
+
+        # Text following the result array, up to the end of the line.
+        self._trailer = ""
+
+        # Chunks of received text which could not be decoded yet, because they
+        # start with an incomplete pair, and their total length.
+        self._tail = []
+        self._tail_len = 0
+
+        # Length of the tail when it was last decoded. Decoding is only
+        # retried once the tail has doubled in length, so that a large pair
+        # received over many reads is decoded in linear time, rather than
+        # being decoded from its start after every read.
+        self._tail_decoded_len = 0
+
+    def feed(self, s):
+        """
+        Decode as much of the line as possible, given newly received text.
+
+        :returns:
+            `None` if the end of the line has not yet been received. Otherwise,
+            the text following the line.
+
+        :raises:
+            :exc:`.MalformedJSONReceived` if the line is not a valid response.
+
+        """
+        if self._tail:
+            self._tail.append(s)
+            self._tail_len += len(s)
+            # The pair can only be complete once its closing bracket has been
+            # received. The end of the line must always be handled though.
+            if ("\n" not in s and
+                    ("]" not in s or
+                     self._tail_len < 2 * self._tail_decoded_len)):
+                return None
+            s = "".join(self._tail)
+            self._tail = []
+
+        pos = 0
+        end = len(s)
+        while True:
+            pos = _WHITESPACE_RE.match(s, pos).end()
+            if pos == end:
+                return None
+
+            if self._state == self._EXPECT_NEWLINE:
+                newline = s.find("\n", pos)
+                if newline < 0:
+                    self._trailer += s[pos:]
+                    return None
+                self._trailer += s[pos:newline]
+                self._check_trailer()
+                return s[newline + 1:]
+
+            c = s[pos]
+            if c == "]" and self._state != self._EXPECT_PAIR:
+                self._state = self._EXPECT_NEWLINE
+                pos += 1
+            elif c == "," and self._state == self._EXPECT_COMMA_OR_END:
+                self._state = self._EXPECT_PAIR
+                pos += 1
+            elif c == "[" and self._state != self._EXPECT_COMMA_OR_END:
+                start = pos
+                try:
+                    pair, pos = self._decoder.raw_decode(s, start)
+                except ValueError:
+                    # The pair is incomplete, unless the end of the line has
+                    # already been received.
+                    if s.find("\n", start) >= 0:
+                        raise _errors.MalformedJSONReceived(s[start:])
+                    self._tail = [s[start:]]
+                    self._tail_len = self._tail_decoded_len = end - start
+                    return None
+                if s.find("\n", start, pos) >= 0:
+                    raise _errors.MalformedJSONReceived(s[start:pos])
+                if not isinstance(pair, list) or len(pair) != 2:
+                    raise _errors.MalformedJSONReceived(
+                                       "Unexpected pair {!r}".format(pair))
+                self._state = self._EXPECT_COMMA_OR_END
+                self._on_pair(pair)
+            else:
+                raise _errors.MalformedJSONReceived(s[pos:])
+
+    def _check_trailer(self):
+        """
+        Check the remainder of the response, after the result array.
+
+        Any further members of the response object are ignored, as they are
+        for responses which are decoded in one go.
+
+        """
+        trailer = self._trailer.strip()
+        self._trailer = ""
+        if trailer == "}":
+            return
+        if trailer.startswith(","):
+            try:
+                members = json.loads("{" + trailer[1:])
+            except ValueError:
+                members = None
+            if isinstance(members, dict):
+                return
+        raise _errors.MalformedJSONReceived(trailer)
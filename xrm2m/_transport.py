@@ -60,6 +60,13 @@ _JSON_RPC_SERVER_PATH = "json_rpc_server"
 _MAX_READ_AMOUNT = 1024
 
 
+# High and low water marks for the write buffer of transports whose writes are
+# buffered. Once the buffer grows above the high water mark, writers wait for
+# it to drain to the low water mark.
+_WRITE_BUFFER_HIGH = 64 * 1024
+_WRITE_BUFFER_LOW = 16 * 1024
+
+
 class _BaseTransport(Transport):
     """
     Base class for transports, which provides checks on correct calling
@@ -281,6 +288,11 @@ class SubProcessTransport(_BaseTransport):
             self._wait_future = _async.wrap_external_coro(self._proc.wait(),
                                                           loop=self._loop)
             self._wait_future.add_done_callback(self._wait_future_done)
+
+            stdin_transport = self._get_stdin_transport()
+            if stdin_transport is not None:
+                stdin_transport.set_write_buffer_limits(high=_WRITE_BUFFER_HIGH,
+                                                        low=_WRITE_BUFFER_LOW)
         except Exception:
             logger.error("{}: Connecting failed".format(self), exc_info=True)
             raise TransportConnectionError
@@ -308,6 +320,28 @@ class SubProcessTransport(_BaseTransport):
 
         raise Return(d)
 
+    def _get_stdin_transport(self):
+        """
+        Return the asyncio transport for the process's stdin, or None if writes
+        are not buffered (as is the case with xos.async).
+
+        """
+        if self._proc is None:
+            return None
+        return getattr(self._proc.stdin, "transport", None)
+
+    def write_buffer_full(self):
+        stdin_transport = self._get_stdin_transport()
+        return (stdin_transport is not None and
+                stdin_transport.get_write_buffer_size() > _WRITE_BUFFER_HIGH)
+
+    @_async.coroutine
+    def drain(self):
+        if self.state != State.CONNECTED:
+            raise TransportNotConnected
+        yield From(_async.wrap_external_coro(self._proc.stdin.drain(),
+                                             loop=self._loop))
+
     def _write_no_check(self, d):
         logger.debug("{}: Writing {!r}".format(self, d))
         try:
@@ -19,10 +19,13 @@ from __future__ import unicode_literals
 __all__ = (
     'copy_docstring',
     'copy_docstring_from_parent',
+    'write_file_atomically',
 )
 
 import functools
 import inspect
+import os
+import tempfile
 
 
 def copy_docstring(doc_src):
@@ -104,3 +107,24 @@ def copy_docstring_from_parent(cls):
     """
     return copy_docstring(cls.__bases__[0])(cls)
 
+
+def write_file_atomically(filename, data):
+    """
+    Replace the contents of a file with `data` (a byte string).
+
+    The data is written to a temporary file in the same directory, which is
+    then renamed over `filename`, so readers see either the old or the new
+    contents, never a partially written file.
+
+    """
+    fd, tmp_filename = tempfile.mkstemp(dir=os.path.dirname(filename) or ".",
+                                        prefix=".{}.".format(
+                                                  os.path.basename(filename)),
+                                        suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        getattr(os, "replace", os.rename)(tmp_filename, filename)
+    except Exception:
+        os.unlink(tmp_filename)
+        raise
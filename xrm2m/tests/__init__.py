@@ -12,8 +12,14 @@ Tests for the Machine-to-Machine Python API.
 
 """
 
+from .cache import *
 from .conn import *
+from .crawl import *
 from .errors import *
+from .fleet import *
+from .framing import *
+from .pathset import *
+from .pool import *
 from .schema import *
 from .transport import *
 from .shared.cut import *
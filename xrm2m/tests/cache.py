@@ -0,0 +1,197 @@
+# -----------------------------------------------------------------------------
+# cache.py - Tests for client-side caches
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for client-side caches."""
+
+import os
+import shutil
+import tempfile
+
+from . import _utils
+from .. import _cache
+from .. import _defs
+from .. import _path
+from .. import _schema
+
+
+def _schema_dict(description, key=()):
+    return {'category': 'CONTAINER',
+            'children': [],
+            'description': description,
+            'hidden': False,
+            'key': [{'datatype': datatype,
+                     'datatype_args': datatype_args,
+                     'description': name,
+                     'internal_name': None,
+                     'name': name,
+                     'repeat_count': 1,
+                     'status': 'MANDATORY'}
+                    for name, datatype, datatype_args in key],
+            'presence': None,
+            'table_description': None,
+            'table_version': None,
+            'table_version_compatibility': None,
+            'value': [],
+            'version': None,
+            'version_compatibility': [None, None],
+            'bag_types': None}
+
+
+def _schema_class(path, description, key=()):
+    return _schema.SchemaClass.from_dict(path, _schema_dict(description, key))
+
+
+class SchemaStoreTests(_utils.BaseTest):
+    """
+    Tests for storing schema on disk.
+
+    """
+
+    def setUp(self):
+        super(SchemaStoreTests, self).setUp()
+        self._dir = tempfile.mkdtemp()
+        self._store_dir = os.path.join(self._dir, "store")
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+        super(SchemaStoreTests, self).tearDown()
+
+    def test_store(self):
+        """Saved schema is merged, and keyed by version and platform."""
+        version = _schema.Version(6, 1)
+        store = _cache.SchemaStore(self._store_dir)
+        self.assertEqual(store.load(version), {})
+
+        store.save(version, {"RootCfg.A": _schema_dict("A")})
+        store.save(version, {"RootCfg.B": _schema_dict("B")})
+        self.assertEqual(store.load(version),
+                         {"RootCfg.A": _schema_dict("A"),
+                          "RootCfg.B": _schema_dict("B")})
+        self.assertEqual(store.load(_schema.Version(6, 2)), {})
+        other_platform = _cache.SchemaStore(self._store_dir, platform="asr9k")
+        self.assertEqual(other_platform.load(version), {})
+
+        # No temporary files are left behind.
+        self.assertEqual(os.listdir(self._store_dir), ["schema-6.1.json"])
+
+    def test_malformed(self):
+        version = _schema.Version(6, 1)
+        store = _cache.SchemaStore(self._store_dir)
+        store.save(version, {"RootCfg.A": _schema_dict("A")})
+        filename = os.path.join(self._store_dir, "schema-6.1.json")
+        for contents in (b'{"format": 1, "cla', b'{"format": 999}'):
+            with open(filename, "wb") as f:
+                f.write(contents)
+            self.assertEqual(store.load(version), {})
+
+    def test_schema_cache(self):
+        """Schema is loaded from the store, and saved to it."""
+        version = _schema.Version(6, 1)
+        store = _cache.SchemaStore(self._store_dir, platform="asr9k")
+        cache = _cache.SchemaCache(store=store)
+        cache.check_version(version)
+        self.assertIsNone(cache.lookup(_path.RootCfg.A))
+        cache.store(_path.RootCfg.A, _schema_class(_path.RootCfg.A, "A"))
+        cache.save()
+        self.assertEqual(list(store.load(version)), ["RootCfg.A"])
+
+        # A new cache, as in another process, loads the saved schema.
+        cache = _cache.SchemaCache(store=store)
+        cache.check_version(version)
+        self.assertEqual(cache.lookup(_path.RootCfg.A(1)),
+                         _schema_class(_path.RootCfg.A, "A"))
+        self.assertEqual(cache.stats(),
+                         _cache.CacheStats(hits=1, misses=0, size=1,
+                                           maxsize=4096))
+
+        # Nothing is loaded for a different version.
+        cache.check_version(_schema.Version(6, 2))
+        self.assertIsNone(cache.lookup(_path.RootCfg.A))
+
+
+class SchemaCacheNormalizeTests(_utils.BaseTest):
+    """
+    Tests for normalizing paths with cached schema.
+
+    """
+
+    def setUp(self):
+        super(SchemaCacheNormalizeTests, self).setUp()
+        self._cache = _cache.SchemaCache()
+        intf_cfg = _path.RootCfg.InterfaceConfiguration
+        for path, key in (
+                (intf_cfg, [("Active", "STRING", None),
+                            ("InterfaceName", "STRING", None)]),
+                (intf_cfg.VRF, []),
+                (_path.RootCfg.Ranged, [("ID", "RANGE",
+                                         {"min": 1, "max": 100})])):
+            self._cache.store(path, _schema_class(path, path.elems()[-1].name,
+                                                  key))
+
+    def test_normalize_path(self):
+        """Key values are named, in schema order."""
+        expected = _path.Path.from_str(
+                        'RootCfg.InterfaceConfiguration({"Active": "act", '
+                        '"InterfaceName": "Gi0"}).VRF')
+        intf_cfg = _path.RootCfg.InterfaceConfiguration
+        for path in (intf_cfg("act", "Gi0").VRF,
+                     intf_cfg(InterfaceName="Gi0", Active="act").VRF,
+                     str(intf_cfg("act", "Gi0").VRF)):
+            self.assertEqual(self._cache.normalize_path(path), expected)
+
+        wildcarded = _path.RootCfg.Ranged(_defs.WILDCARD)
+        self.assertEqual(self._cache.normalize_path(wildcarded),
+                         _path.RootCfg.Ranged(ID=_defs.WILDCARD))
+        self.assertEqual(self._cache.normalize_path(_path.RootCfg.Ranged(5)),
+                         _path.Path.from_str('RootCfg.Ranged({"ID": 5})'))
+
+    def test_not_normalized(self):
+        """Paths which the router might change or reject are not normalized."""
+        intf_cfg = _path.RootCfg.InterfaceConfiguration
+        for path in (_path.RootCfg.Missing,
+                     intf_cfg.VRF,
+                     intf_cfg("act").VRF,
+                     intf_cfg("act", 1).VRF,
+                     intf_cfg("act", None).VRF,
+                     intf_cfg(_defs.WILDCARD_ALL).VRF,
+                     intf_cfg("act", "Gi0").Missing,
+                     _path.RootCfg.Ranged(0),
+                     _path.RootCfg.Ranged(True)):
+            self.assertIsNone(self._cache.normalize_path(path))
+
+    def test_get_parent(self):
+        intf = _path.RootCfg.InterfaceConfiguration("act", "Gi0")
+        self.assertEqual(self._cache.get_parent(intf.VRF),
+                         _path.RootCfg.InterfaceConfiguration(
+                                           Active="act", InterfaceName="Gi0"))
+        self.assertIsNone(self._cache.get_parent(intf))
+        self.assertIsNone(self._cache.get_parent(_path.RootCfg))
+
+
+class PathInternerTests(_utils.BaseTest):
+    """
+    Tests for interning paths.
+
+    """
+
+    def test_from_str(self):
+        """Paths are shared, and least recently used paths evicted."""
+        interner = _cache.PathInterner(maxsize=2)
+        path = interner.from_str('RootCfg.A(["x"])')
+        self.assertEqual(path, _path.RootCfg.A("x"))
+        self.assertIs(interner.from_str('RootCfg.A(["x"])'), path)
+        interner.from_str("RootCfg.B")
+        interner.from_str("RootCfg.C")
+        self.assertIsNot(interner.from_str('RootCfg.A(["x"])'), path)
+        self.assertEqual(interner.stats(),
+                         _cache.CacheStats(hits=1, misses=4, size=2,
+                                           maxsize=2))
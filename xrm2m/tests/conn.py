@@ -17,12 +17,23 @@ from __future__ import unicode_literals
 import json
 
 from . import _utils
+from .. import _cache
 from .. import _conn
 from .. import _async
+from .. import _codec
+from .. import _defs
 from .. import _errors
 from .. import _path
+from .. import _results
+from .. import _schema
 from .. import _transport
 
+try:
+    import unittest.mock as mock
+except ImportError:
+    # For Python 2, try importing the backport.
+    import mock
+
 
 class _TestTransport(_transport.Transport):
     """
@@ -43,6 +54,11 @@ class _TestTransport(_transport.Transport):
         self.read_future = None
         self.write_buffer = b""
 
+        # Set by tests to simulate a full write buffer. `drain_future` is
+        # created by `drain()`.
+        self.buffer_full = False
+        self.drain_future = None
+
     def connect(self, loop):
         assert self.state == _transport.State.DISCONNECTED
         self._loop = loop
@@ -94,6 +110,18 @@ class _TestTransport(_transport.Transport):
 
         self.write_buffer += d
 
+    def write_buffer_full(self):
+        return self.buffer_full
+
+    def drain(self):
+        assert self.drain_future is None, "Concurrent drains detected"
+        self.drain_future = _async.Future(loop=self._loop)
+        self.drain_future.add_done_callback(self._drain_future_done)
+        return self.drain_future
+
+    def _drain_future_done(self, f):
+        self.drain_future = None
+
 
 class _TestException(Exception):
     pass
@@ -163,22 +191,38 @@ class AsyncConnectTests(_utils.BaseTest):
             connect_fut.result()
 
 
-class AsyncReadWriteTests(_utils.BaseTest):
+class _ConnectedTestBase(_utils.BaseTest):
     """
+    Base class for tests which require a connected connection.
+
+    The class attribute `_connect_kwargs` can be overridden by subclasses to
+    pass extra arguments to `connect_async()`.
 
     """
 
+    _connect_kwargs = {}
+
     def setUp(self):
-        super(AsyncReadWriteTests, self).setUp()
+        super(_ConnectedTestBase, self).setUp()
 
         self._transport = _TestTransport()
 
-        connect_fut = _conn.connect_async(self._transport, loop=self._loop)
+        connect_fut = _conn.connect_async(self._transport, loop=self._loop,
+                                          **self._connect_kwargs)
         _async.run_until_callbacks_invoked(loop=self._loop)
         self._transport.connect_future.set_result(None)
+        self._on_transport_connected()
         self._loop.run_until_complete(connect_fut)
         self._conn = connect_fut.result()
 
+    def _on_transport_connected(self):
+        """
+        Called during `setUp()` once the transport has connected. Subclasses
+        can override this to answer requests made while connecting.
+
+        """
+        pass
+
     def tearDown(self):
         disconnect_fut = self._conn.disconnect()
         self._transport.read_future.set_exception(
@@ -186,7 +230,30 @@ class AsyncReadWriteTests(_utils.BaseTest):
         self._transport.wait_future.set_result(None)
         self._loop.run_until_complete(disconnect_fut)
 
-        super(AsyncReadWriteTests, self).tearDown()
+        super(_ConnectedTestBase, self).tearDown()
+
+    def _take_written_requests(self):
+        """
+        Return the JSON objects written to the transport since the last call,
+        one per line.
+
+        """
+        decoded = self._transport.write_buffer.decode(_conn._JSON_ENCODING)
+        self._transport.write_buffer = b""
+        lines = decoded.split('\n')
+        self.assertEqual(lines[-1], "")
+        return [json.loads(line) for line in lines[:-1]]
+
+    def _post_reply(self, reply):
+        """Post a reply line, and run the loop until it has been handled."""
+        self._transport.read_future.set_result(reply + b'\n')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+
+class AsyncReadWriteTests(_ConnectedTestBase):
+    """
+
+    """
 
     def test_basic_get(self):
         get_fut = self._conn.get("RootCfg")
@@ -224,6 +291,7 @@ class AsyncReadWriteTests(_utils.BaseTest):
         self.assertTrue(get_fut.done())
         r = get_fut.result()
         self.assertEqual(r, [(_path.RootCfg.Foo(ID=1).Alive, True)])
+        self.assertIs(type(r), list)
 
     def _send_concurrent_gets(self):
         """
@@ -395,6 +463,76 @@ class AsyncReadWriteTests(_utils.BaseTest):
         self.assertTrue(get_futs[1].done())
         self.assertEqual(get_futs[1].result(), expected_results[1])
 
+    def _send_get_many(self):
+        """
+        Helper function which makes a `get_many()` request for 2 paths, and
+        verifies that both requests were sent before any reply was received.
+
+        """
+        paths = ["RootCfg.A", "RootCfg.B"]
+        get_many_fut = self._conn.get_many(paths)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_async.InvalidStateError):
+            get_many_fut.result()
+
+        decoded = self._transport.write_buffer.decode(_conn._JSON_ENCODING)
+        self._transport.write_buffer = b""
+        lines = decoded.split('\n')
+        self.assertEqual(lines[-1], "")
+        parseds = [json.loads(line) for line in lines[:-1]]
+        self.assertEqual([parsed["params"]["path"] for parsed in parseds],
+                         paths)
+        self.assertEqual([parsed["id"] for parsed in parseds], [1, 2])
+
+        return get_many_fut
+
+    def test_get_many(self):
+        """
+        Test a pipelined get_many(), with the replies sent in the reverse
+        order to the requests.
+
+        """
+        get_many_fut = self._send_get_many()
+
+        self._transport.read_future.set_result(
+               br'{"jsonrpc": "2.0", "id": 2, "result": [["RootCfg.B", 43]]}'
+               b'\n')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(get_many_fut.done())
+
+        self._transport.read_future.set_result(
+               br'{"jsonrpc": "2.0", "id": 1, "result": [["RootCfg.A", 42]]}'
+               b'\n')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertTrue(get_many_fut.done())
+        self.assertEqual(get_many_fut.result(),
+                         [[(_path.RootCfg.A, 42)], [(_path.RootCfg.B, 43)]])
+
+    def test_get_many_request_error(self):
+        """
+        Test a get_many() where one of the requests fails.
+
+        The error should only be raised once all requests have completed.
+
+        """
+        get_many_fut = self._send_get_many()
+
+        self._transport.read_future.set_result(
+               br'{"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, '
+               br'"message": "Bad path", "data": {"path": "BadRoot", '
+               br'"type": "path_string_format_error"}}}'
+               b'\n')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(get_many_fut.done())
+
+        self._transport.read_future.set_result(
+               br'{"jsonrpc": "2.0", "id": 2, "result": [["RootCfg.B", 43]]}'
+               b'\n')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertTrue(get_many_fut.done())
+        with self.assertRaises(_errors.PathStringFormatError):
+            get_many_fut.result()
+
     def test_get_global_error(self):
         """
         Test an error during a get operation, where the error affects the
@@ -467,3 +605,984 @@ class AsyncReadWriteTests(_utils.BaseTest):
 
         self.test_basic_get()
 
+
+
+class AsyncBatchTests(_ConnectedTestBase):
+    """
+    Tests for connections with request batching enabled.
+
+    """
+
+    _connect_kwargs = {"batch_requests": True}
+
+    _REPLY_A = br'{"jsonrpc": "2.0", "id": 1, "result": [["RootCfg.A", 42]]}'
+    _REPLY_B = br'{"jsonrpc": "2.0", "id": 2, "result": [["RootCfg.B", 43]]}'
+    _EXPECTED_RESULTS = [[(_path.RootCfg.A, 42)], [(_path.RootCfg.B, 43)]]
+
+    def _send_get_many(self):
+        get_many_fut = self._conn.get_many(["RootCfg.A", "RootCfg.B"])
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(get_many_fut.done())
+        return get_many_fut
+
+    def test_single_request(self):
+        """A lone request is not wrapped in a batch."""
+        get_fut = self._conn.get("RootCfg.A")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]["params"]["path"], "RootCfg.A")
+
+        self._post_reply(self._REPLY_A)
+        self.assertEqual(get_fut.result(), self._EXPECTED_RESULTS[0])
+
+    def test_batch(self):
+        """Concurrent requests are written, and answered, as one batch."""
+        get_many_fut = self._send_get_many()
+
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1)
+        self.assertIsInstance(requests[0], list)
+        self.assertEqual([req["id"] for req in requests[0]], [1, 2])
+        self.assertEqual([req["params"]["path"] for req in requests[0]],
+                         ["RootCfg.A", "RootCfg.B"])
+
+        # Responses within a batch may be in any order.
+        self._post_reply(b"[" + self._REPLY_B + b", " + self._REPLY_A + b"]")
+        self.assertTrue(get_many_fut.done())
+        self.assertEqual(get_many_fut.result(), self._EXPECTED_RESULTS)
+
+    def test_batch_rejected(self):
+        """
+        If the server rejects a batch, the requests are re-sent one per line,
+        and no further batches are sent.
+
+        """
+        get_many_fut = self._send_get_many()
+        self._take_written_requests()
+
+        self._post_reply(br'{"jsonrpc": "2.0", "id": null, "error": '
+                         br'{"code": -32600, "message": "Invalid Request"}}')
+        self.assertFalse(get_many_fut.done())
+        requests = self._take_written_requests()
+        self.assertEqual([req["id"] for req in requests], [1, 2])
+
+        self._post_reply(self._REPLY_A + b"\n" + self._REPLY_B)
+        self.assertEqual(get_many_fut.result(), self._EXPECTED_RESULTS)
+
+        # Subsequent concurrent requests are not batched.
+        get_many_fut = self._conn.get_many(["RootCfg.A", "RootCfg.B"])
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual([req["id"] for req in requests], [3, 4])
+        self._post_reply(self._REPLY_A.replace(b'"id": 1', b'"id": 3') +
+                         b"\n" +
+                         self._REPLY_B.replace(b'"id": 2', b'"id": 4'))
+        self.assertEqual(get_many_fut.result(), self._EXPECTED_RESULTS)
+
+
+class AsyncStreamTests(_ConnectedTestBase):
+    """
+    Tests for streamed requests, made with `iter_get()`.
+
+    """
+
+    _REPLY = (br'{"jsonrpc": "2.0", "id": 1, "result": '
+              br'[["RootCfg.A", {"x": [1, 2]}], ["RootCfg.B", 43]]}')
+
+    def _post_data(self, data):
+        """Post data, which need not end in a newline."""
+        self._transport.read_future.set_result(data)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+    def _start_iter_get(self):
+        stream = self._conn.iter_get("RootCfg")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(requests[0]["method"], "get")
+        self.assertEqual(requests[0]["params"],
+                         {"path": "RootCfg", "format": "pairs"})
+        return stream
+
+    def _next_items(self, stream):
+        """Return the items which are available without further reads."""
+        items = []
+        while True:
+            item_fut = stream.next_item()
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            if not item_fut.done():
+                # Leave the stream in a state where it can be read again.
+                stream._waiter = None
+                return items
+            item = item_fut.result()
+            if item is None:
+                items.append(None)
+                return items
+            items.append(item)
+
+    def test_pairs_streamed(self):
+        """Pairs are returned as soon as each one has been received."""
+        stream = self._start_iter_get()
+
+        # Split the reply part-way through the second pair.
+        split = self._REPLY.index(b"43")
+        self._post_data(self._REPLY[:split])
+        self.assertEqual(self._next_items(stream),
+                         [(_path.RootCfg.A, {"x": [1, 2]})])
+
+        self._post_data(self._REPLY[split:] + b"\n")
+        self.assertEqual(self._next_items(stream),
+                         [(_path.RootCfg.B, 43), None])
+
+    def test_pair_split(self):
+        """
+        A large pair received over many reads is decoded without decoding it
+        from its start after every read.
+
+        """
+        stream = self._start_iter_get()
+        value = [[i] for i in range(2000)]
+        reply = json.dumps({"jsonrpc": "2.0", "id": 1,
+                            "result": [["RootCfg.A", value],
+                                       ["RootCfg.B", 43]]}).encode("ascii")
+        chunks = [reply[i:i + 64] for i in range(0, len(reply), 64)]
+
+        decode_lens = []
+        real_raw_decode = json.JSONDecoder.raw_decode
+        def raw_decode(decoder, s, idx=0):
+            decode_lens.append(len(s) - idx)
+            return real_raw_decode(decoder, s, idx)
+
+        with mock.patch.object(json.JSONDecoder, "raw_decode", raw_decode):
+            for chunk in chunks:
+                self._post_data(chunk)
+            self._post_data(b"\n")
+        self.assertLess(sum(decode_lens), 4 * len(reply))
+        self.assertGreater(len(chunks), 200)
+        self.assertEqual(self._next_items(stream),
+                         [(_path.RootCfg.A, value), (_path.RootCfg.B, 43),
+                          None])
+
+    def test_prefix_split(self):
+        """A response is streamed even if its header arrives in pieces."""
+        stream = self._start_iter_get()
+        get_fut = self._conn.get("RootCfg.C")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        # A non-streamed response is handled as usual.
+        self._post_data(br'{"jsonrpc": "2.0", "id": 2, '
+                        br'"result": [["RootCfg.C", 44]]}' + b"\n" +
+                        self._REPLY[:10])
+        self.assertEqual(get_fut.result(), [(_path.RootCfg.C, 44)])
+        self.assertEqual(self._next_items(stream), [])
+
+        self._post_data(self._REPLY[10:] + b"\n")
+        self.assertEqual(self._next_items(stream),
+                         [(_path.RootCfg.A, {"x": [1, 2]}),
+                          (_path.RootCfg.B, 43),
+                          None])
+
+    def test_read_paused(self):
+        """
+        Reading is paused while the consumer falls behind, unless another
+        request is made.
+
+        """
+        with mock.patch.object(_conn, "_STREAM_MAX_BUFFERED", 1):
+            stream = self._start_iter_get()
+            split = self._REPLY.index(b"43")
+            self._post_data(self._REPLY[:split])
+            self.assertIsNone(self._transport.read_future)
+
+            # Consuming a pair resumes reading.
+            self.assertEqual(self._next_items(stream),
+                             [(_path.RootCfg.A, {"x": [1, 2]})])
+            self.assertIsNotNone(self._transport.read_future)
+
+            # Fill the buffer again, then make another request. Reading is
+            # resumed so that the response can be received.
+            self._post_data(self._REPLY[split:-2] + b", [\"RootCfg.C\", 44")
+            self.assertIsNone(self._transport.read_future)
+            get_fut = self._conn.get("RootCfg.D")
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            self.assertIsNotNone(self._transport.read_future)
+
+            self._post_data(b"]]}\n" +
+                            br'{"jsonrpc": "2.0", "id": 2, '
+                            br'"result": [["RootCfg.D", 45]]}' + b"\n")
+            self.assertEqual(get_fut.result(), [(_path.RootCfg.D, 45)])
+            self.assertEqual(self._next_items(stream),
+                             [(_path.RootCfg.B, 43),
+                              (_path.RootCfg.C, 44),
+                              None])
+
+    def test_error_response(self):
+        """Error responses are raised by the stream."""
+        stream = self._start_iter_get()
+        self._post_reply(br'{"jsonrpc": "2.0", "id": 1, "error": '
+                         br'{"code": -32601, "message": "Method not found"}}')
+        item_fut = stream.next_item()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_errors.UnexpectedJSONError):
+            item_fut.result()
+
+    def test_malformed_response(self):
+        """A malformed streamed response is a connection-wide error."""
+        stream = self._start_iter_get()
+        self._post_data(self._REPLY[:-2] + b"}}\n")
+        for expected in [(_path.RootCfg.A, {"x": [1, 2]}),
+                         (_path.RootCfg.B, 43)]:
+            item_fut = stream.next_item()
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            self.assertEqual(item_fut.result(), expected)
+        item_fut = stream.next_item()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_errors.DisconnectedError):
+            item_fut.result()
+        self.assertEqual(self._conn.state, _conn.ConnectionState.DISCONNECTED)
+
+        # Reconnect, so that tearDown() can disconnect.
+        reconnect_fut = self._conn.reconnect()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._transport.wait_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._transport.connect_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(reconnect_fut.result(), None)
+
+
+class AsyncTimeoutTests(_ConnectedTestBase):
+    """
+    Tests for request timeouts.
+
+    """
+
+    _connect_kwargs = {"request_timeout": 5}
+
+    def test_timeout(self):
+        """A request times out, and its late response is discarded."""
+        get_fut = self._conn.get("RootCfg.A", timeout=0)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_errors.RequestTimeoutError) as cm:
+            get_fut.result()
+        self.assertEqual(cm.exception.timeout, 0)
+        self.assertEqual(self._conn._request_futures, {})
+
+        self._post_reply(
+               br'{"jsonrpc": "2.0", "id": 1, "result": [["RootCfg.A", 42]]}')
+        self.assertEqual(self._conn.state, _conn.ConnectionState.CONNECTED)
+        self.assertEqual(list(self._conn._timed_out_ids), [])
+
+        # The connection is still usable.
+        get_fut = self._conn.get("RootCfg.B")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._post_reply(
+               br'{"jsonrpc": "2.0", "id": 2, "result": [["RootCfg.B", 43]]}')
+        self.assertEqual(get_fut.result(), [(_path.RootCfg.B, 43)])
+
+    def test_default_timeout(self):
+        """The connection's timeout is used unless one is passed."""
+        delays = []
+        real_call_later = self._loop.call_later
+        def call_later(delay, *args):
+            delays.append(delay)
+            return real_call_later(delay, *args)
+
+        with mock.patch.object(self._loop, "call_later", call_later):
+            get_fut = self._conn.get("RootCfg.A")
+            get_fut2 = self._conn.get("RootCfg.B", timeout=1)
+            _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(delays, [5, 1])
+
+        self._post_reply(
+               br'{"jsonrpc": "2.0", "id": 1, "result": [["RootCfg.A", 42]]}')
+        self._post_reply(
+               br'{"jsonrpc": "2.0", "id": 2, "result": [["RootCfg.B", 43]]}')
+        self.assertEqual(get_fut.result(), [(_path.RootCfg.A, 42)])
+        self.assertEqual(get_fut2.result(), [(_path.RootCfg.B, 43)])
+
+    def test_stream_timeout(self):
+        """A streamed request which times out raises from the stream."""
+        stream = self._conn.iter_get("RootCfg")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._transport.read_future.set_result(
+                        br'{"jsonrpc": "2.0", "id": 1, "result": '
+                        br'[["RootCfg.A", 42], ')
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        self._conn._on_request_timeout(1, 5)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._post_reply(br'["RootCfg.B", 43]]}')
+        self.assertEqual(self._conn.state, _conn.ConnectionState.CONNECTED)
+        self.assertEqual(list(self._conn._timed_out_ids), [])
+
+        item_fut = stream.next_item()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(item_fut.result(), (_path.RootCfg.A, 42))
+        item_fut = stream.next_item()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_errors.RequestTimeoutError):
+            item_fut.result()
+
+    def test_timed_out_ids_limit(self):
+        """
+        Only the most recent timed out IDs are remembered, but late responses
+        to those forgotten are still discarded.
+
+        """
+        with mock.patch.object(_conn, "_MAX_TIMED_OUT_IDS", 1):
+            get_futs = [self._conn.get("RootCfg.A", timeout=0)
+                        for _ in range(2)]
+            _async.run_until_callbacks_invoked(loop=self._loop)
+        for get_fut in get_futs:
+            with self.assertRaises(_errors.RequestTimeoutError) as cm:
+                get_fut.result()
+            del cm
+        self.assertEqual(list(self._conn._timed_out_ids), [2])
+
+        for req_id in (1, 2):
+            self._post_reply(
+                    ('{{"jsonrpc": "2.0", "id": {}, "result": []}}'.format(
+                                    req_id)).encode(_conn._JSON_ENCODING))
+        self.assertEqual(self._conn.state, _conn.ConnectionState.CONNECTED)
+        self.assertEqual(list(self._conn._timed_out_ids), [])
+
+
+class AsyncFlowControlTests(_ConnectedTestBase):
+    """
+    Tests for limiting outstanding requests, and waiting for the transport's
+    write buffer to drain.
+
+    """
+
+    _connect_kwargs = {"max_outstanding": 2}
+
+    def _reply(self, req_id):
+        return ('{{"jsonrpc": "2.0", "id": {}, '
+                '"result": [["RootCfg.A", {}]]}}'.format(req_id, req_id)
+                ).encode(_conn._JSON_ENCODING)
+
+    def test_max_outstanding(self):
+        """Requests beyond the limit wait for earlier requests to complete."""
+        get_futs = [self._conn.get("RootCfg.A") for _ in range(3)]
+        stream = self._conn.iter_get("RootCfg")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual([req["id"] for req in self._take_written_requests()],
+                         [1, 2])
+
+        self._post_reply(self._reply(2))
+        self.assertTrue(get_futs[1].done())
+        self.assertEqual([req["id"] for req in self._take_written_requests()],
+                         [3])
+
+        # A failed request frees its slot too.
+        self._post_reply(br'{"jsonrpc": "2.0", "id": 1, "error": '
+                         br'{"code": -32601, "message": "Method not found"}}')
+        with self.assertRaises(_errors.UnexpectedJSONError):
+            get_futs[0].result()
+        requests = self._take_written_requests()
+        self.assertEqual([req["method"] for req in requests], ["get"])
+        self.assertEqual(requests[0]["params"]["format"], "pairs")
+
+        self._post_reply(self._reply(3))
+        self._post_reply(self._reply(4)[:-1] + b", \"extra\": 1}")
+        self.assertEqual(get_futs[2].result(), [(_path.RootCfg.A, 3)])
+        self.assertEqual(list(stream.iter_sync()), [(_path.RootCfg.A, 4)])
+        self.assertFalse(self._conn._request_slots.locked())
+
+    def test_acquire_cancelled(self):
+        """
+        A waiter cancelled after being granted a slot, but before running,
+        passes the slot on.
+
+        """
+        slots = _async.Semaphore(1, loop=self._loop)
+
+        @_async.coroutine
+        def acquire():
+            yield _async.From(slots.acquire())
+
+        self._loop.run_until_complete(_async.Task(acquire(), loop=self._loop))
+        waiters = [_async.Task(acquire(), loop=self._loop) for _ in range(2)]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        slots.release()
+        waiters[0].cancel()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertTrue(waiters[0].cancelled())
+        self.assertTrue(waiters[1].done())
+        slots.release()
+        self.assertFalse(slots.locked())
+
+    def test_write_buffer_full(self):
+        """Requests are not written while the write buffer is full."""
+        self._transport.buffer_full = True
+        get_futs = [self._conn.get("RootCfg.A") for _ in range(2)]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._transport.write_buffer, b"")
+        self.assertIsNotNone(self._transport.drain_future)
+
+        self._transport.buffer_full = False
+        self._transport.drain_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual([req["id"] for req in self._take_written_requests()],
+                         [1, 2])
+
+        self._post_reply(self._reply(1))
+        self._post_reply(self._reply(2))
+        self.assertEqual(get_futs[1].result(), [(_path.RootCfg.A, 2)])
+
+
+class AsyncSchemaCacheTests(_ConnectedTestBase):
+    """
+    Tests for connections with a schema cache.
+
+    """
+
+    _SCHEMA = {
+        'category': 'CONTAINER',
+        'children': ['RootCfg.A.B'],
+        'description': 'A',
+        'hidden': False,
+        'key': [],
+        'presence': None,
+        'table_description': None,
+        'table_version': None,
+        'table_version_compatibility': None,
+        'value': [],
+        'version': None,
+        'version_compatibility': [None, None],
+        'bag_types': None,
+    }
+
+    def setUp(self):
+        self._schema_cache = _cache.SchemaCache(maxsize=2)
+        self._connect_kwargs = {"schema_cache": self._schema_cache}
+        self._version = {"major": 1, "minor": 0}
+        super(AsyncSchemaCacheTests, self).setUp()
+
+    def _on_transport_connected(self):
+        # The router's version is requested on connecting.
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        self.assertEqual(request["method"], "get_version")
+        self._post_reply(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                     "result": self._version}
+                                    ).encode(_conn._JSON_ENCODING))
+
+    def _get_schema(self, path, expect_request):
+        """Make a `get_schema()` request, answering it if it is sent."""
+        schema_fut = self._conn.get_schema(path)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1 if expect_request else 0)
+        if requests:
+            self._post_reply(json.dumps({"jsonrpc": "2.0",
+                                         "id": requests[0]["id"],
+                                         "result": self._SCHEMA}
+                                        ).encode(_conn._JSON_ENCODING))
+        return schema_fut.result()
+
+    def test_cached(self):
+        """Key values are ignored, and least recently used entries evicted."""
+        schema = self._get_schema("RootCfg.A", expect_request=True)
+        self.assertEqual(schema.name, "A")
+        self.assertIs(self._get_schema(_path.RootCfg.A(1, "x"),
+                                       expect_request=False), schema)
+        self.assertIs(self._get_schema('RootCfg.A({"b": 2})',
+                                       expect_request=False), schema)
+        self.assertEqual(self._schema_cache.stats(),
+                         _cache.CacheStats(hits=2, misses=1, size=1,
+                                           maxsize=2))
+
+        self._get_schema("RootCfg.B", expect_request=True)
+        self._get_schema("RootCfg.A", expect_request=False)
+        self._get_schema("RootCfg.C", expect_request=True)
+        self._get_schema("RootCfg.A", expect_request=False)
+        self._get_schema("RootCfg.B", expect_request=True)
+        self.assertEqual(len(self._schema_cache), 2)
+
+    def test_normalize_path(self):
+        """Paths are normalized from the cache where possible."""
+        self._get_schema("RootCfg.A", expect_request=True)
+        norm_fut = self._conn.normalize_path(_path.RootCfg.A)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._take_written_requests(), [])
+        self.assertEqual(norm_fut.result(), _path.RootCfg.A)
+
+        norm_fut = self._conn.normalize_path(_path.RootCfg.A.B)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        self.assertEqual(request["method"], "normalize_path")
+        self._post_reply(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                     "result": "RootCfg.A.B"}
+                                    ).encode(_conn._JSON_ENCODING))
+        self.assertEqual(norm_fut.result(), _path.RootCfg.A.B)
+
+    def test_version_change(self):
+        """The cache is cleared on reconnecting to a different version."""
+        self._get_schema("RootCfg.A", expect_request=True)
+        self.assertEqual(self._schema_cache.version, _schema.Version(1, 0))
+
+        for version, expect_request in (({"major": 1, "minor": 0}, False),
+                                        ({"major": 1, "minor": 1}, True)):
+            self._version = version
+            disconnect_fut = self._conn.disconnect()
+            self._transport.read_future.set_exception(
+                                              _transport.TransportNotConnected)
+            self._transport.wait_future.set_result(None)
+            self._loop.run_until_complete(disconnect_fut)
+
+            connect_fut = self._conn.reconnect()
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            self._transport.connect_future.set_result(None)
+            self._on_transport_connected()
+            self._loop.run_until_complete(connect_fut)
+
+            self._get_schema("RootCfg.A", expect_request=expect_request)
+        self.assertEqual(self._schema_cache.version, _schema.Version(1, 1))
+
+
+class AsyncCLICacheTests(_ConnectedTestBase):
+    """
+    Tests for connections with a CLI cache.
+
+    """
+
+    def setUp(self):
+        self._cli_cache = _cache.CLICache()
+        self._connect_kwargs = {"cli_cache": self._cli_cache}
+        super(AsyncCLICacheTests, self).setUp()
+
+    def _on_transport_connected(self):
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        self.assertEqual(request["method"], "get_version")
+        self._reply(request, {"major": 1, "minor": 0})
+
+    def _reply(self, request, result):
+        self._post_reply(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                     "result": result}
+                                    ).encode(_conn._JSON_ENCODING))
+
+    def _cli_describe(self, command, description):
+        """Make a `cli_describe()` request, answering it if it is sent."""
+        describe_fut = self._conn.cli_describe(command)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 0 if description is None else 1)
+        if requests:
+            self.assertEqual(requests[0]["method"], "cli_describe")
+            self._reply(requests[0], description)
+        return describe_fut.result()
+
+    def test_cli_describe(self):
+        """Descriptions are only requested once per command."""
+        description = [{"method": "get", "path": "RootOper.A"}]
+        expected = [_defs.Request(_defs.Method.GET, _path.RootOper.A, None)]
+        self.assertEqual(self._cli_describe("show a", description), expected)
+        self.assertEqual(self._cli_describe("show a", None), expected)
+        self.assertEqual(self._cli_describe("show b", []), [])
+        self.assertEqual(self._cli_cache.stats(),
+                         _cache.CacheStats(hits=1, misses=2, size=2,
+                                           maxsize=1024))
+
+    def test_cli_get_via_paths(self):
+        """Gets are made for each path in the command's description."""
+        self._cli_describe("show a", [{"method": "get", "path": "RootOper.A"},
+                                      {"method": "get", "path": "RootOper.B"}])
+        get_fut = self._conn.cli_get("show a", via_paths=True)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual([(req["method"], req["params"]["path"])
+                          for req in requests],
+                         [("get", "RootOper.A"), ("get", "RootOper.B")])
+        for req in requests:
+            self._reply(req, [[req["params"]["path"] + ".C", req["id"]]])
+        self.assertEqual(get_fut.result(),
+                         [(_path.RootOper.A.C, requests[0]["id"]),
+                          (_path.RootOper.B.C, requests[1]["id"])])
+
+    def test_cli_get_fallback(self):
+        """Commands which aren't described as gets are sent as usual."""
+        self._cli_describe("run a", [{"method": "set", "path": "RootCfg.A",
+                                      "value": 1}])
+        get_fut = self._conn.cli_get("run a", via_paths=True)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        self.assertEqual(request["method"], "cli_get")
+        self._reply(request, [["RootCfg.A", 1]])
+        self.assertEqual(get_fut.result(), [(_path.RootCfg.A, 1)])
+
+
+class AsyncPathInternerTests(_ConnectedTestBase):
+    """
+    Tests for connections with a path interner.
+
+    """
+
+    def setUp(self):
+        self._interner = _cache.PathInterner()
+        self._connect_kwargs = {"path_interner": self._interner}
+        super(AsyncPathInternerTests, self).setUp()
+
+    def _request(self, call, response):
+        """Make a request, answering it with the given response fields."""
+        fut = call()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        response = dict(response, jsonrpc="2.0", id=request["id"])
+        self._post_reply(json.dumps(response).encode(_conn._JSON_ENCODING))
+        return fut
+
+    def test_interned(self):
+        """Paths received in responses and errors are shared."""
+        pairs = self._request(lambda: self._conn.get("RootCfg.A"),
+                              {"result": [["RootCfg.A.B", 1]]}).result()
+        path = pairs[0][0]
+        self.assertEqual(path, _path.RootCfg.A.B)
+
+        children = self._request(lambda: self._conn.get_children("RootCfg.A"),
+                                 {"result": ["RootCfg.A.B"]}).result()
+        self.assertIs(children[0], path)
+
+        error = {"code": -32000, "message": "Not found",
+                 "data": {"type": "not_found_error", "path": "RootCfg.A.B"}}
+        get_fut = self._request(lambda: self._conn.get("RootCfg.A.B"),
+                                {"error": error})
+        with self.assertRaises(_errors.NotFoundError) as cm:
+            get_fut.result()
+        self.assertIs(cm.exception.path, path)
+
+        # The exception's traceback refers to this frame, so drop it to avoid
+        # a reference cycle.
+        del cm
+        self.assertEqual(self._interner.stats().misses, 1)
+
+
+class AsyncLazyPathsTests(_ConnectedTestBase):
+    """
+    Tests for connections made with `lazy_paths`.
+
+    """
+
+    _connect_kwargs = {"lazy_paths": True}
+
+    def _get(self, result):
+        """Make a get request, answering it with the given result."""
+        fut = self._conn.get("RootCfg")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        request, = self._take_written_requests()
+        response = {"jsonrpc": "2.0", "id": request["id"], "result": result}
+        self._post_reply(json.dumps(response).encode(_conn._JSON_ENCODING))
+        return fut.result()
+
+    def test_get_result_lazy(self):
+        """Paths in a get result are parsed on first access, and cached."""
+        result = self._get([["RootCfg.A", 42], ["RootCfg.B", 43]])
+        self.assertIsInstance(result, _results.PathValuePairs)
+        self.assertEqual(result._paths, [None, None])
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(result.values(), [42, 43])
+        self.assertEqual(result.path_strings(), ["RootCfg.A", "RootCfg.B"])
+        self.assertEqual(result._paths, [None, None])
+
+        self.assertEqual(result[-1], (_path.RootCfg.B, 43))
+        self.assertIs(result[1][0], result._paths[1])
+        self.assertIsNone(result._paths[0])
+
+        self.assertEqual(result[:1], [(_path.RootCfg.A, 42)])
+        self.assertEqual(result, [(_path.RootCfg.A, 42),
+                                  (_path.RootCfg.B, 43)])
+        self.assertNotEqual(result, [(_path.RootCfg.A, 42)])
+        self.assertEqual(result.paths(), [_path.RootCfg.A, _path.RootCfg.B])
+        with self.assertRaises(IndexError):
+            result[2]
+
+    def test_bad_path_lazy(self):
+        """A badly formatted path fails when it is accessed."""
+        result = self._get([["BadRoot", 42]])
+        self.assertEqual(result.values(), [42])
+        with self.assertRaises(_errors.PathStringFormatError) as cm:
+            result[0]
+        del cm
+
+
+class AsyncResponseCacheTests(_ConnectedTestBase):
+    """
+    Tests for connections with a response cache.
+
+    """
+
+    def setUp(self):
+        self._response_cache = _cache.ResponseCache({"RootOper": 1.0,
+                                                     "RootCfg.A": 10.0})
+        self._connect_kwargs = {"response_cache": self._response_cache}
+        super(AsyncResponseCacheTests, self).setUp()
+
+        # Control the loop's clock, which is used for TTLs.
+        self._now = 0.0
+        self._loop.time = lambda: self._now
+
+    def tearDown(self):
+        del self._loop.time
+        super(AsyncResponseCacheTests, self).tearDown()
+
+    def _get(self, path, expect_request):
+        """Make a `get()` request, answering it if it is sent."""
+        get_fut = self._conn.get(path)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1 if expect_request else 0)
+        if requests:
+            self._reply_get(requests[0])
+        return get_fut.result()
+
+    def _reply(self, request, result):
+        self._post_reply(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                     "result": result}
+                                    ).encode(_conn._JSON_ENCODING))
+
+    def _reply_get(self, request):
+        """Reply to a `get` with the request's path and ID as the value."""
+        self._reply(request, [[request["params"]["path"], request["id"]]])
+
+    def test_ttl(self):
+        """Responses are cached for the TTL of the longest prefix."""
+        self.assertEqual(self._get("RootOper.A", expect_request=True),
+                         [(_path.RootOper.A, 1)])
+        self._now = 0.5
+        self.assertEqual(self._get("RootOper.A", expect_request=False),
+                         [(_path.RootOper.A, 1)])
+        self._get("RootCfg.A.B", expect_request=True)
+        self._get("RootCfg.B", expect_request=True)
+        self._get("RootCfg.B", expect_request=True)
+
+        self._now = 1.5
+        self._get("RootOper.A", expect_request=True)
+        self._get("RootCfg.A.B", expect_request=False)
+        self.assertEqual(self._response_cache.stats(),
+                         _cache.CacheStats(hits=2, misses=3, size=2,
+                                           maxsize=1024))
+
+    def test_coalesced(self):
+        """Concurrent identical requests share a single request."""
+        get_futs = [self._conn.get("RootOper.A"),
+                    self._conn.get("RootOper.A"),
+                    self._conn.get_nested("RootOper.A")]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual([req["params"]["format"] for req in requests],
+                         ["pairs", "nested"])
+        self._reply_get(requests[0])
+        self._reply(requests[1], {"RootOper": {"A": 2}})
+        self.assertEqual(get_futs[0].result(), [(_path.RootOper.A, 1)])
+        self.assertEqual(get_futs[1].result(), [(_path.RootOper.A, 1)])
+        self.assertEqual(get_futs[2].result(), {"RootOper": {"A": 2}})
+
+    def test_coalesced_cancelled(self):
+        """Cancelling one caller doesn't affect others sharing its request."""
+        get_futs = [self._conn.get("RootOper.A"), self._conn.get("RootOper.A")]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1)
+
+        get_futs[0].cancel()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertTrue(get_futs[0].cancelled())
+        self.assertFalse(get_futs[1].done())
+
+        self._reply_get(requests[0])
+        self.assertEqual(get_futs[1].result(), [(_path.RootOper.A, 1)])
+        self._get("RootOper.A", expect_request=False)
+
+    def test_coalesced_timeout(self):
+        """Each caller sharing a request waits with its own timeout."""
+        get_futs = [self._conn.get("RootOper.A", timeout=5),
+                    self._conn.get("RootOper.A", timeout=1)]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1)
+
+        # A caller with a longer timeout makes its own request.
+        get_futs.append(self._conn.get("RootOper.A", timeout=10))
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests += self._take_written_requests()
+        self.assertEqual(len(requests), 2)
+
+        self._now = 2.0
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(get_futs[0].done())
+        with self.assertRaises(_errors.RequestTimeoutError) as cm:
+            get_futs[1].result()
+        del cm
+
+        self._reply_get(requests[0])
+        self._reply_get(requests[1])
+        self.assertEqual(get_futs[0].result(), [(_path.RootOper.A, 1)])
+        self.assertEqual(get_futs[2].result(), [(_path.RootOper.A, 2)])
+
+    def test_invalidation(self):
+        """Modifying requests invalidate overlapping responses."""
+        self._get("RootCfg.A.B", expect_request=True)
+        self._get("RootCfg.A.C", expect_request=True)
+
+        # A get in flight when the cache is invalidated isn't cached.
+        get_fut = self._conn.get("RootCfg.A.D")
+        set_fut = self._conn.set("RootCfg.A.B.E", 1)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = {req["method"]: req
+                    for req in self._take_written_requests()}
+        get_req, set_req = requests["get"], requests["set"]
+        self._reply_get(get_req)
+        self._reply(set_req, None)
+        get_fut.result()
+        set_fut.result()
+        self._get("RootCfg.A.B", expect_request=True)
+        self._get("RootCfg.A.C", expect_request=False)
+        self._get("RootCfg.A.D", expect_request=True)
+
+        delete_fut = self._conn.delete(["RootCfg.A"])
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._reply(self._take_written_requests()[0], None)
+        delete_fut.result()
+        self._get("RootCfg.A.C", expect_request=True)
+
+        commit_fut = self._conn.commit()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._reply(self._take_written_requests()[0], None)
+        commit_fut.result()
+        self.assertEqual(len(self._response_cache), 0)
+
+
+class AsyncChildrenCacheTests(_ConnectedTestBase):
+    """
+    Tests for connections with a children cache.
+
+    """
+
+    def setUp(self):
+        self._children_cache = _cache.ChildrenCache(oper_ttl=1.0)
+        self._connect_kwargs = {"children_cache": self._children_cache}
+        super(AsyncChildrenCacheTests, self).setUp()
+
+        # Control the loop's clock, which is used for TTLs.
+        self._now = 0.0
+        self._loop.time = lambda: self._now
+
+    def tearDown(self):
+        del self._loop.time
+        super(AsyncChildrenCacheTests, self).tearDown()
+
+    def _reply(self, request, result):
+        self._post_reply(json.dumps({"jsonrpc": "2.0", "id": request["id"],
+                                     "result": result}
+                                    ).encode(_conn._JSON_ENCODING))
+
+    def _get_children(self, path, expect_request):
+        """Make a `get_children()` request, answering it if it is sent."""
+        children_fut = self._conn.get_children(path)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        requests = self._take_written_requests()
+        self.assertEqual(len(requests), 1 if expect_request else 0)
+        if requests:
+            self.assertEqual(requests[0]["method"], "get_children")
+            self._reply(requests[0],
+                        ['{}(["x"])'.format(requests[0]["params"]["path"])])
+        return children_fut.result()
+
+    def test_ttl(self):
+        """Configuration is cached until invalidated, oper data for a TTL."""
+        self.assertEqual(self._get_children("RootCfg.A", expect_request=True),
+                         [_path.RootCfg.A("x")])
+        self.assertEqual(self._get_children("RootCfg.A",
+                                            expect_request=False),
+                         [_path.RootCfg.A("x")])
+        self._get_children("RootOper.A", expect_request=True)
+        self._get_children("RootOper.A", expect_request=False)
+        self._get_children("RootAction.A", expect_request=True)
+        self._get_children("RootAction.A", expect_request=True)
+
+        self._now = 1000.0
+        self._get_children("RootCfg.A", expect_request=False)
+        self._get_children("RootOper.A", expect_request=True)
+
+    def test_invalidation(self):
+        """Configuration requests invalidate overlapping responses."""
+        self._get_children("RootCfg.A", expect_request=True)
+        self._get_children("RootCfg.B", expect_request=True)
+        self._get_children("RootOper.A", expect_request=True)
+
+        set_fut = self._conn.set("RootCfg.A.C", 1)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._reply(self._take_written_requests()[0], None)
+        set_fut.result()
+        self._get_children("RootCfg.A", expect_request=True)
+        self._get_children("RootCfg.B", expect_request=False)
+        self._get_children("RootOper.A", expect_request=False)
+
+        discard_fut = self._conn.discard_changes()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._reply(self._take_written_requests()[0], None)
+        discard_fut.result()
+        self.assertEqual(len(self._children_cache), 0)
+
+
+class _RecordingCodec(_codec.StdlibCodec):
+    """Codec which records what it encodes and decodes."""
+
+    def __init__(self):
+        self.dumped = []
+        self.loaded = []
+
+    def dumps(self, obj):
+        self.dumped.append(obj)
+        return super(_RecordingCodec, self).dumps(obj)
+
+    def loads(self, data):
+        self.loaded.append(data)
+        return super(_RecordingCodec, self).loads(data)
+
+
+class AsyncCodecTests(_ConnectedTestBase):
+    """
+    Tests for connections with a specified JSON codec.
+
+    """
+
+    def setUp(self):
+        self._connect_kwargs = {"codec": _RecordingCodec()}
+        super(AsyncCodecTests, self).setUp()
+
+    def test_codec_used(self):
+        codec = self._connect_kwargs["codec"]
+        get_fut = self._conn.get("RootCfg.A")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual([req["params"]["path"] for req in codec.dumped],
+                         ["RootCfg.A"])
+
+        reply = br'{"jsonrpc": "2.0", "id": 1, "result": [["RootCfg.A", 42]]}'
+        self._post_reply(reply)
+        self.assertEqual(codec.loaded, [reply])
+        self.assertEqual(get_fut.result(), [(_path.RootCfg.A, 42)])
+
+    def test_get_codec(self):
+        self.assertIsInstance(_codec.get_codec("json"), _codec.StdlibCodec)
+        self.assertIn(_codec.get_codec().name, _codec.available_codecs())
+        with self.assertRaises(ValueError):
+            _codec.get_codec("nosuchcodec")
+
+        # Every installed codec decodes a response identically, and raises
+        # ValueError for malformed JSON.
+        reply = (br'{"jsonrpc": "2.0", "id": 1, '
+                 br'"result": [["RootCfg.A", {"b": [1, 2.5, "c\u00e9"]}]]}')
+        for name in _codec.available_codecs():
+            codec = _codec.get_codec(name)
+            self.assertEqual(codec.loads(reply), json.loads(reply.decode()))
+            self.assertEqual(json.loads(codec.dumps({"a": "\u00e9"})
+                                                      .decode("ascii")),
+                             {"a": "\u00e9"})
+            with self.assertRaises(ValueError):
+                codec.loads(b'{"jsonrpc": ')
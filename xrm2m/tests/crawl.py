@@ -0,0 +1,193 @@
+# -----------------------------------------------------------------------------
+# crawl.py - Tests for schema crawling
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for schema crawling."""
+
+import json
+import os
+import shutil
+import tempfile
+
+from . import _utils
+from .conn import _TestException
+from .. import _async
+from .. import _crawl
+from .. import _path
+from .. import _schema
+
+
+# Children of each class in the test schema.
+_SCHEMA_CHILDREN = {
+    "RootCfg": ["RootCfg.A", "RootCfg.B"],
+    "RootCfg.A": ["RootCfg.A.C", "RootCfg.A.D"],
+    "RootCfg.B": [],
+    "RootCfg.A.C": [],
+    "RootCfg.A.D": ["RootCfg.A.D.E"],
+    "RootCfg.A.D.E": [],
+}
+
+
+class _SchemaConn(object):
+    """
+    Stand-in for a connection, whose `get_schema()` futures are completed by
+    the test.
+
+    """
+
+    def __init__(self, loop):
+        self._loop = loop
+        self.requests = {}
+
+    def get_schema(self, path_str):
+        assert path_str not in self.requests
+        self.requests[path_str] = _async.Future(loop=self._loop)
+        return self.requests[path_str]
+
+    def reply(self, path_str):
+        d = {'category': 'CONTAINER',
+             'children': _SCHEMA_CHILDREN[path_str],
+             'description': path_str,
+             'hidden': False,
+             'key': [],
+             'presence': None,
+             'table_description': None,
+             'table_version': None,
+             'table_version_compatibility': None,
+             'value': [],
+             'version': None,
+             'version_compatibility': [None, None],
+             'bag_types': None}
+        self.requests.pop(path_str).set_result(
+               _schema.SchemaClass.from_dict(_path.Path.from_str(path_str), d))
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+
+class SchemaCrawlerTests(_utils.BaseTest):
+    """
+    Tests for crawling the schema.
+
+    """
+
+    def setUp(self):
+        super(SchemaCrawlerTests, self).setUp()
+        self._conn = _SchemaConn(self._loop)
+        self._dir = tempfile.mkdtemp()
+        self._checkpoint = os.path.join(self._dir, "checkpoint.json")
+
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+        super(SchemaCrawlerTests, self).tearDown()
+
+    def _crawler(self):
+        return _crawl.SchemaCrawler(self._conn, roots=[_path.RootCfg],
+                                    window=2, checkpoint=self._checkpoint,
+                                    checkpoint_interval=2, loop=self._loop)
+
+    def test_crawl(self):
+        """Requests are bounded by the window, and every class is indexed."""
+        crawl_fut = self._crawler().crawl()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(sorted(self._conn.requests), ["RootCfg"])
+
+        self._conn.reply("RootCfg")
+        self.assertEqual(sorted(self._conn.requests),
+                         ["RootCfg.A", "RootCfg.B"])
+        self._conn.reply("RootCfg.B")
+        self.assertEqual(sorted(self._conn.requests), ["RootCfg.A"])
+        self._conn.reply("RootCfg.A")
+        self.assertEqual(sorted(self._conn.requests),
+                         ["RootCfg.A.C", "RootCfg.A.D"])
+        self._conn.reply("RootCfg.A.D")
+        self._conn.reply("RootCfg.A.C")
+        self.assertFalse(crawl_fut.done())
+        self._conn.reply("RootCfg.A.D.E")
+
+        index = crawl_fut.result()
+        self.assertEqual(sorted(index), sorted(_SCHEMA_CHILDREN))
+        self.assertEqual(index["RootCfg.A.D"].children,
+                         [_path.RootCfg.A.D.E])
+
+        with open(self._checkpoint, "rb") as f:
+            data = json.loads(f.read().decode("utf-8"))
+        self.assertEqual(sorted(data["classes"]), sorted(_SCHEMA_CHILDREN))
+
+    def test_resume(self):
+        """A failed crawl is resumed from its checkpoint."""
+        crawl_fut = self._crawler().crawl()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._conn.reply("RootCfg")
+        self._conn.reply("RootCfg.A")
+        self._conn.requests.pop("RootCfg.B").set_exception(_TestException())
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        # No more requests are sent once one has failed, but those in flight
+        # are waited for.
+        self.assertEqual(sorted(self._conn.requests), ["RootCfg.A.C"])
+        self.assertFalse(crawl_fut.done())
+        self._conn.reply("RootCfg.A.C")
+        with self.assertRaises(_TestException):
+            self._loop.run_until_complete(crawl_fut)
+
+        crawl_fut = self._crawler().crawl()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(sorted(self._conn.requests),
+                         ["RootCfg.A.D", "RootCfg.B"])
+        for path_str in ("RootCfg.A.D", "RootCfg.B", "RootCfg.A.D.E"):
+            self._conn.reply(path_str)
+        self.assertEqual(sorted(crawl_fut.result()), sorted(_SCHEMA_CHILDREN))
+
+    def test_journal(self):
+        """Classes are journalled periodically, and merged at the end."""
+        crawl_fut = self._crawler().crawl()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._conn.reply("RootCfg")
+        self._conn.reply("RootCfg.B")
+        self._conn.reply("RootCfg.A")
+        self.assertFalse(os.path.exists(self._checkpoint))
+        journal = self._checkpoint + ".journal"
+        with open(journal, "rb") as f:
+            lines = f.read().decode("utf-8").splitlines()
+        self.assertEqual([json.loads(line)[0] for line in lines],
+                         ["RootCfg", "RootCfg.B"])
+
+        # A crawl resumed after the process was killed mid-write loads the
+        # complete lines of the journal.
+        with open(journal, "ab") as f:
+            f.write(b'["RootCfg.A", {"categ')
+        crawler = self._crawler()
+        crawler._load_checkpoint()
+        self.assertEqual(sorted(crawler.index), ["RootCfg", "RootCfg.B"])
+
+        for path_str in ("RootCfg.A.C", "RootCfg.A.D", "RootCfg.A.D.E"):
+            self._conn.reply(path_str)
+        crawl_fut.result()
+        self.assertFalse(os.path.exists(journal))
+        with open(self._checkpoint, "rb") as f:
+            data = json.loads(f.read().decode("utf-8"))
+        self.assertEqual(sorted(data["classes"]), sorted(_SCHEMA_CHILDREN))
+
+    def test_checkpoint_failed(self):
+        """A failure to save the checkpoint ends the crawl."""
+        self._checkpoint = os.path.join(self._dir, "missing", "checkpoint")
+        crawl_fut = self._crawler().crawl()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._conn.reply("RootCfg")
+        self._conn.reply("RootCfg.A")
+
+        # No more requests are sent, and the crawl fails once those in flight
+        # complete.
+        self.assertEqual(sorted(self._conn.requests), ["RootCfg.B"])
+        self.assertFalse(crawl_fut.done())
+        self._conn.reply("RootCfg.B")
+        with self.assertRaises(EnvironmentError) as cm:
+            self._loop.run_until_complete(crawl_fut)
+        del cm
@@ -0,0 +1,148 @@
+# -----------------------------------------------------------------------------
+# fleet.py - Tests for fleets
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for fleets."""
+
+import collections
+import json
+
+from . import _utils
+from .conn import _TestException, _TestTransport
+from .. import _async
+from .. import _conn
+from .. import _errors
+from .. import _fleet
+from .. import _path
+from .. import _transport
+
+
+class FleetTests(_utils.BaseTest):
+    """
+    Tests for running requests across a fleet.
+
+    """
+
+    _NAMES = ("r1", "r2", "r3")
+
+    def setUp(self):
+        super(FleetTests, self).setUp()
+        self._transports = collections.OrderedDict(
+                            (name, _TestTransport()) for name in self._NAMES)
+        self._fleet = _fleet.Fleet(self._transports, loop=self._loop,
+                                   max_connects=2, max_requests=2)
+
+    def tearDown(self):
+        disconnect_fut = self._fleet.disconnect()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        for transport in self._transports.values():
+            if transport.state == _transport.State.CONNECTED:
+                transport.read_future.set_exception(
+                                              _transport.TransportNotConnected)
+                transport.wait_future.set_result(None)
+        self._loop.run_until_complete(disconnect_fut)
+        super(FleetTests, self).tearDown()
+
+    def _connecting(self):
+        return [name for name, transport in self._transports.items()
+                if transport.state == _transport.State.CONNECTING]
+
+    def _take_written_requests(self, name):
+        transport = self._transports[name]
+        lines = transport.write_buffer.decode(_conn._JSON_ENCODING)
+        transport.write_buffer = b""
+        return [json.loads(line) for line in lines.split("\n")[:-1]]
+
+    def _reply(self, name, result):
+        self._transports[name].read_future.set_result(json.dumps(
+                         {"jsonrpc": "2.0", "id": 1, "result": result}
+                         ).encode(_conn._JSON_ENCODING) + b"\n")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+    def _next_results(self, stream):
+        """Return the results which are available without further replies."""
+        results = []
+        while True:
+            item_fut = stream.next_item()
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            if not item_fut.done():
+                stream._waiter = None
+                return results
+            item = item_fut.result()
+            results.append(item)
+            if item is None:
+                return results
+
+    def test_run(self):
+        """Connects and requests are bounded, and results are streamed."""
+        stream = self._fleet.run("get", "RootCfg.A")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._connecting(), ["r1", "r2"])
+
+        # A failed connection is reported, and lets the next router connect.
+        self._transports["r1"].connect_future.set_exception(_TestException)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._connecting(), ["r2", "r3"])
+        results = self._next_results(stream)
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0].name, "r1")
+        self.assertIsInstance(results[0].exception, _errors.ConnectionError)
+
+        # The exception's traceback refers to this frame, so drop it to avoid
+        # a reference cycle.
+        del results
+
+        self._transports["r2"].connect_future.set_result(None)
+        self._transports["r3"].connect_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        for name in ("r2", "r3"):
+            self.assertEqual(
+                   [req["params"]["path"]
+                    for req in self._take_written_requests(name)],
+                   ["RootCfg.A"])
+
+        self._reply("r3", [["RootCfg.A", 3]])
+        self.assertEqual(self._next_results(stream),
+                         [_fleet.FleetResult("r3", [(_path.RootCfg.A, 3)],
+                                             None)])
+        self._reply("r2", [["RootCfg.A", 2]])
+        self.assertEqual(self._next_results(stream),
+                         [_fleet.FleetResult("r2", [(_path.RootCfg.A, 2)],
+                                             None),
+                          None])
+        self.assertEqual(sorted(self._fleet.connections), ["r2", "r3"])
+
+    def test_max_requests(self):
+        """Calls wait for a request slot once connected."""
+        stream = self._fleet.run(lambda conn: conn.get_version())
+        for _ in range(2):
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            for name in self._connecting():
+                self._transports[name].connect_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        written = [name for name in self._NAMES
+                   if self._take_written_requests(name)]
+        self.assertEqual(written, ["r1", "r2"])
+
+        self._reply("r1", {"major": 1, "minor": 0})
+        self.assertEqual([name for name in self._NAMES
+                          if self._take_written_requests(name)], ["r3"])
+        self._reply("r2", {"major": 1, "minor": 0})
+        self._reply("r3", {"major": 1, "minor": 0})
+        results = self._next_results(stream)
+        self.assertEqual([res.name for res in results[:-1]],
+                         ["r1", "r2", "r3"])
+        self.assertEqual(results[-1], None)
+
+    def test_bad_arguments(self):
+        with self.assertRaises(TypeError):
+            self._fleet.run(lambda conn: conn.get("RootCfg"), "RootCfg")
@@ -0,0 +1,58 @@
+# -----------------------------------------------------------------------------
+# framing.py - Tests for the framing module.
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for the framing module."""
+
+from .. import _framing
+
+from . import _utils
+
+
+class LineFramerTests(_utils.BaseTest):
+    """
+    Tests for :class:`.LineFramer`.
+
+    """
+
+    def _pop_lines(self, framer):
+        lines = []
+        line = framer.pop_line()
+        while line is not None:
+            lines.append(line)
+            line = framer.pop_line()
+        return lines
+
+    def test_lines(self):
+        framer = _framing.LineFramer()
+        framer.feed(b'{"a": 1}\n{"b": 2}\n\n{"c"')
+        self.assertEqual(self._pop_lines(framer),
+                         [b'{"a": 1}', b'{"b": 2}', b''])
+        self.assertEqual(len(framer), 4)
+        self.assertEqual(framer.peek(2), b'{"')
+
+        framer.feed(b': 3}\n')
+        self.assertEqual(self._pop_lines(framer), [b'{"c": 3}'])
+        self.assertEqual(len(framer), 0)
+
+    def test_chunked(self):
+        """A line split over many small chunks is reassembled."""
+        line = "".join("{:05}".format(i) for i in range(1000))
+        line = line.encode("ascii")
+        framer = _framing.LineFramer()
+        for i in range(0, len(line), 7):
+            framer.feed(line[i:i + 7])
+            self.assertIsNone(framer.pop_line())
+        framer.feed(b"\nxyz")
+        self.assertEqual(self._pop_lines(framer), [line])
+        self.assertEqual(framer.take(), b"xyz")
+        self.assertEqual(len(framer), 0)
+        self.assertIsNone(framer.pop_line())
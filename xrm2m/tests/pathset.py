@@ -0,0 +1,156 @@
+# -----------------------------------------------------------------------------
+# pathset.py - Tests for sets and mappings of paths
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for sets and mappings of paths."""
+
+from . import _utils
+from .. import _defs
+from .. import _path
+from .. import _pathset
+
+
+_INTF = _path.RootOper.Interfaces.Interface
+
+
+class PathMapTests(_utils.BaseTest):
+    """
+    Tests for mappings of paths.
+
+    """
+
+    def test_mapping(self):
+        """Entries can be set, looked up and removed."""
+        path_map = _pathset.PathMap([(_path.RootCfg.A.B, 1),
+                                     (_path.RootCfg.A, 2)])
+        path_map[_path.RootCfg.A("x").B] = 3
+        path_map[_path.RootCfg.A.B] = 4
+        self.assertEqual(len(path_map), 3)
+        self.assertEqual(path_map[_path.RootCfg.A.B], 4)
+        self.assertEqual(path_map[_path.RootCfg.A("x").B], 3)
+        self.assertNotIn(_path.RootCfg.A("y").B, path_map)
+        self.assertNotIn(_path.RootCfg, path_map)
+        self.assertEqual(sorted(str(path) for path in path_map),
+                         ["RootCfg.A", 'RootCfg.A(["x"]).B', "RootCfg.A.B"])
+
+        del path_map[_path.RootCfg.A("x").B]
+        del path_map[_path.RootCfg.A]
+        with self.assertRaises(KeyError):
+            del path_map[_path.RootCfg.A]
+        self.assertEqual(dict(path_map), {_path.RootCfg.A.B: 4})
+
+        # Nodes no longer leading to an entry are removed.
+        del path_map[_path.RootCfg.A.B]
+        self.assertEqual(path_map._root.exact, {})
+
+    def test_items_under(self):
+        path_map = _pathset.PathMap([(_path.RootCfg.A, 1),
+                                     (_path.RootCfg.A("x").B, 2),
+                                     (_path.RootCfg.A.B.C, 3),
+                                     (_path.RootCfg.D, 4)])
+        self.assertEqual(sorted(value for _, value in
+                                path_map.items_under(_path.RootCfg.A)),
+                         [1, 3])
+        self.assertEqual(sorted(value for _, value in
+                                path_map.items_under(_path.RootCfg)),
+                         [1, 2, 3, 4])
+        self.assertEqual(list(path_map.items_under(_path.RootCfg.A.B)),
+                         [(_path.RootCfg.A.B.C, 3)])
+        self.assertEqual(list(path_map.items_under(_path.RootOper)), [])
+
+    def test_nearest_ancestor(self):
+        path_map = _pathset.PathMap([(_path.RootCfg.A, 1),
+                                     (_path.RootCfg.A.B.C, 2)])
+        self.assertEqual(path_map.nearest_ancestor(_path.RootCfg.A.B.C.D),
+                         (_path.RootCfg.A.B.C, 2))
+        self.assertEqual(path_map.nearest_ancestor(_path.RootCfg.A.B),
+                         (_path.RootCfg.A, 1))
+        self.assertEqual(path_map.nearest_ancestor(_path.RootCfg.A),
+                         (_path.RootCfg.A, 1))
+        with self.assertRaises(KeyError):
+            path_map.nearest_ancestor(_path.RootCfg.E)
+
+    def test_match(self):
+        """Patterns matching a concrete path are found."""
+        path_map = _pathset.PathMap()
+        for value, path in enumerate([
+                _INTF(InterfaceName="Gi0").State,
+                _INTF(InterfaceName="Gi1").State,
+                _INTF(_defs.WILDCARD).State,
+                _INTF(InterfaceName="Gi*").State,
+                _INTF("Te?").State,
+                _INTF(_defs.WILDCARD_ALL).State,
+                _INTF(_defs.WILDCARD).MTU,
+                _INTF(_defs.WILDCARD)]):
+            path_map[path] = value
+
+        def match(path):
+            return sorted(value for _, value in path_map.match(path))
+
+        self.assertEqual(match(_INTF(InterfaceName="Gi0").State),
+                         [0, 2, 3, 5])
+        self.assertEqual(match(_INTF(InterfaceName="Te0").State), [2, 4, 5])
+        self.assertEqual(match(_INTF(InterfaceName="Te00").State), [2, 5])
+        self.assertEqual(match(_INTF(InterfaceName="Te0").MTU), [6])
+        self.assertEqual(match(_INTF(InterfaceName="Te0")), [7])
+        self.assertEqual(match(_INTF(Other="Gi0").State), [2, 5])
+        self.assertEqual(match(_INTF(InterfaceName=1).State), [2, 5])
+        self.assertEqual(match(_INTF("a", "b").State), [5])
+        self.assertEqual(match(_INTF.State), [5])
+        self.assertEqual(match(_path.RootOper.Interfaces), [])
+
+    def test_items_matching(self):
+        """Stored paths matched by a pattern are found."""
+        path_map = _pathset.PathMap()
+        for value, name in enumerate(["Gi0", "Gi1", "Te0"]):
+            path_map[_INTF(InterfaceName=name).State] = value
+            path_map[_INTF(InterfaceName=name).MTU] = value + 10
+        path_map[_INTF("Gi2").State] = 3
+
+        def matching(pattern):
+            return sorted(value for _, value in
+                          path_map.items_matching(pattern))
+
+        self.assertEqual(matching(_INTF(_defs.WILDCARD).State), [0, 1, 2, 3])
+        self.assertEqual(matching(_INTF(_defs.WILDCARD_ALL).MTU),
+                         [10, 11, 12])
+        self.assertEqual(matching(_INTF(InterfaceName="Gi*").State),
+                         [0, 1, 3])
+        self.assertEqual(matching(_INTF(InterfaceName="Gi0").State), [0])
+        self.assertEqual(matching(_INTF(InterfaceName="Te0").MTU), [12])
+        self.assertEqual(matching(_INTF(InterfaceName="Te0")), [])
+
+
+class PathSetTests(_utils.BaseTest):
+    """
+    Tests for sets of paths.
+
+    """
+
+    def test_set(self):
+        paths = _pathset.PathSet([_path.RootCfg.A.B, _path.RootCfg.A.C,
+                                  _path.RootCfg.D(_defs.WILDCARD)])
+        paths.add(_path.RootCfg.A.B)
+        self.assertEqual(len(paths), 3)
+        self.assertIn(_path.RootCfg.A.C, paths)
+        paths.discard(_path.RootCfg.A.C)
+        paths.discard(_path.RootCfg.A.C)
+        self.assertNotIn(_path.RootCfg.A.C, paths)
+
+        self.assertEqual(list(paths.under(_path.RootCfg.A)),
+                         [_path.RootCfg.A.B])
+        self.assertEqual(paths.nearest_ancestor(_path.RootCfg.A.B.E),
+                         _path.RootCfg.A.B)
+        self.assertEqual(list(paths.match(_path.RootCfg.D(ID=5))),
+                         [_path.RootCfg.D(_defs.WILDCARD)])
+        self.assertEqual(list(paths.matching(_path.RootCfg.A(
+                                                   _defs.WILDCARD_ALL).B)),
+                         [_path.RootCfg.A.B])
@@ -0,0 +1,233 @@
+# -----------------------------------------------------------------------------
+# pool.py - Tests for connection pools
+#
+# Copyright (c) 2015-2016 by Cisco Systems, Inc.
+# All rights reserved.
+# -----------------------------------------------------------------------------
+
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+"""Tests for connection pools."""
+
+import json
+
+from . import _utils
+from .conn import _TestException, _TestTransport
+from .. import _async
+from .. import _conn
+from .. import _errors
+from .. import _path
+from .. import _pool
+from .. import _transport
+
+
+class _PoolTestBase(_utils.BaseTest):
+    """
+    Base class for pool tests, which creates a pool of `_TestTransport`s.
+
+    """
+
+    _SIZE = 3
+
+    def setUp(self):
+        super(_PoolTestBase, self).setUp()
+        self._transports = []
+        self._pool = _pool.ConnectionPool(self._make_transport,
+                                          size=self._SIZE, loop=self._loop)
+
+    def _make_transport(self):
+        transport = _TestTransport()
+        self._transports.append(transport)
+        return transport
+
+    def _start_connect(self):
+        connect_fut = self._pool.connect()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(len(self._transports), self._SIZE)
+        return connect_fut
+
+    def _disconnect(self):
+        disconnect_fut = self._pool.disconnect()
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        for transport in self._transports:
+            if transport.state == _transport.State.CONNECTED:
+                transport.read_future.set_exception(
+                                              _transport.TransportNotConnected)
+                transport.wait_future.set_result(None)
+        self._loop.run_until_complete(disconnect_fut)
+
+
+class PoolConnectTests(_PoolTestBase):
+    """
+    Tests for connecting pools.
+
+    """
+
+    def test_connect(self):
+        connect_fut = self._start_connect()
+        for transport in self._transports:
+            self.assertFalse(connect_fut.done())
+            transport.connect_future.set_result(None)
+            _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(connect_fut.result(), None)
+        self.assertEqual(len(self._pool.connections), self._SIZE)
+        self.assertIs(self._pool.config_connection, self._pool.connections[0])
+        self._disconnect()
+        self.assertEqual(self._pool.connections, ())
+
+    def test_connect_error(self):
+        """If any member fails to connect, the others are disconnected."""
+        connect_fut = self._start_connect()
+        self._transports[0].connect_future.set_result(None)
+        self._transports[1].connect_future.set_exception(_TestException)
+        self._transports[2].connect_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(connect_fut.done())
+        self.assertEqual(self._transports[1].state,
+                         _transport.State.DISCONNECTED)
+
+        for transport in (self._transports[0], self._transports[2]):
+            transport.read_future.set_exception(
+                                              _transport.TransportNotConnected)
+            transport.wait_future.set_result(None)
+        with self.assertRaises(_errors.ConnectionError):
+            self._loop.run_until_complete(connect_fut)
+        self.assertEqual(self._pool.connections, ())
+
+    def test_not_connected(self):
+        with self.assertRaises(_errors.DisconnectedError):
+            self._pool.get("RootCfg")
+        with self.assertRaises(_errors.DisconnectedError):
+            self._pool.set("RootCfg.A", 1)
+
+
+class PoolRequestTests(_PoolTestBase):
+    """
+    Tests for making requests on a pool.
+
+    """
+
+    def setUp(self):
+        super(PoolRequestTests, self).setUp()
+        connect_fut = self._start_connect()
+        for transport in self._transports:
+            transport.connect_future.set_result(None)
+        self._loop.run_until_complete(connect_fut)
+
+    def tearDown(self):
+        self._disconnect()
+        super(PoolRequestTests, self).tearDown()
+
+    def _take_written_requests(self):
+        """Return the requests written to each transport since the last call."""
+        out = []
+        for transport in self._transports:
+            lines = transport.write_buffer.decode(_conn._JSON_ENCODING)
+            transport.write_buffer = b""
+            out.append([json.loads(line) for line in lines.split("\n")[:-1]])
+        return out
+
+    def _take_written_paths(self):
+        """Return the paths requested on each transport since the last call."""
+        return [[req["params"]["path"] for req in reqs]
+                for reqs in self._take_written_requests()]
+
+    def _reply(self, transport_idx, result, req_id=1):
+        transport = self._transports[transport_idx]
+        transport.read_future.set_result(json.dumps(
+                         {"jsonrpc": "2.0", "id": req_id, "result": result}
+                         ).encode(_conn._JSON_ENCODING) + b"\n")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+    def test_spread(self):
+        """Read requests go to the least loaded member."""
+        get_futs = [self._pool.get("RootCfg.A"),
+                    self._pool.get_nested("RootCfg.B"),
+                    self._pool.get_children("RootCfg.C")]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+
+        # The configuration member is used last.
+        self.assertEqual(self._take_written_paths(),
+                         [["RootCfg.C"], ["RootCfg.A"], ["RootCfg.B"]])
+
+        # Once the second member's request completes, it is least loaded.
+        self._reply(1, [["RootCfg.A", 1]])
+        self.assertEqual(get_futs[0].result(), [(_path.RootCfg.A, 1)])
+        get_futs.append(self._pool.get("RootCfg.D"))
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._take_written_paths(), [[], ["RootCfg.D"], []])
+
+        self._reply(0, ["RootCfg.C.E"])
+        self._reply(1, [["RootCfg.D", 2]], req_id=2)
+        self._reply(2, {})
+        for get_fut in get_futs:
+            get_fut.result()
+        self.assertEqual(self._pool._outstanding, [0, 0, 0])
+
+    def test_member_disconnected(self):
+        """Read requests are not sent on members which have disconnected."""
+        self._transports[1].wait_future.set_result(None)
+        self._transports[1].read_future.set_exception(
+                                              _transport.TransportNotConnected)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._pool.connections[1].state,
+                         _conn.ConnectionState.DISCONNECTED)
+
+        # Each request completes before the next is made, so a disconnected
+        # member would always be the least loaded.
+        for req_id, path in enumerate(["RootCfg.A", "RootCfg.B"], 1):
+            get_fut = self._pool.get(path)
+            _async.run_until_callbacks_invoked(loop=self._loop)
+            self.assertEqual(self._take_written_paths(), [[], [], [path]])
+            self._reply(2, [[path, req_id]], req_id=req_id)
+            self.assertEqual(get_fut.result(),
+                             [(_path.Path.from_str(path), req_id)])
+
+        stream = self._pool.iter_get("RootCfg.C")
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._take_written_paths(), [[], [], ["RootCfg.C"]])
+        self._reply(2, [["RootCfg.C", 3]], req_id=3)
+        self.assertEqual(list(stream.iter_sync()), [(_path.RootCfg.C, 3)])
+
+        # Once no members are connected, requests fail.
+        for transport in (self._transports[0], self._transports[2]):
+            transport.wait_future.set_result(None)
+            transport.read_future.set_exception(
+                                              _transport.TransportNotConnected)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        with self.assertRaises(_errors.DisconnectedError):
+            self._pool.get("RootCfg.D")
+
+    def test_pinned(self):
+        """Configuration requests are always sent on the same member."""
+        set_futs = [self._pool.set("RootCfg.A", 1),
+                    self._pool.set("RootCfg.B", 2)]
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual([[req["method"] for req in reqs]
+                          for reqs in self._take_written_requests()],
+                         [["set", "set"], [], []])
+
+        self._reply(0, None)
+        self._reply(0, None, req_id=2)
+        for set_fut in set_futs:
+            self.assertEqual(set_fut.result(), None)
+
+    def test_get_many(self):
+        """The requests of a `get_many()` are shared between the members."""
+        paths = ["RootCfg.A", "RootCfg.B", "RootCfg.C", "RootCfg.D"]
+        get_many_fut = self._pool.get_many(paths)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(self._take_written_paths(),
+                         [["RootCfg.C"], ["RootCfg.A", "RootCfg.D"],
+                          ["RootCfg.B"]])
+
+        self._reply(0, [["RootCfg.C", 3]])
+        self._reply(1, [["RootCfg.A", 1]])
+        self._reply(1, [["RootCfg.D", 4]], req_id=2)
+        self._reply(2, [["RootCfg.B", 2]])
+        self.assertEqual(get_many_fut.result(),
+                         [[(_path.RootCfg.A, 1)], [(_path.RootCfg.B, 2)],
+                          [(_path.RootCfg.C, 3)], [(_path.RootCfg.D, 4)]])
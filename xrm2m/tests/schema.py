@@ -14,6 +14,8 @@ from __future__ import unicode_literals
 
 """Tests for the schema module."""
 
+import copy
+
 from . import _utils
 from .. import _path
 from .. import _schema
@@ -347,6 +349,214 @@ class FromDictTests(_utils.BaseTest):
         self.assertEqual(str(result.bag_types['bag_3']),
                          expected_bag_types_str3)
 
+    def test_to_dict(self):
+        """Schema classes convert back to the dict they were created from."""
+        p = _path.RootOper.DummyPath
+        d = {'category': 'CONTAINER',
+             'children': ['RootOper.DummyPath.Child'],
+             'description': 'Test description',
+             'hidden': True,
+             'key': [{'datatype': 'RANGE',
+                      'datatype_args': {'min': 1, 'max': 100},
+                      'description': 'Range test',
+                      'internal_name': None,
+                      'name': 'RangeTest',
+                      'repeat_count': 1,
+                      'status': 'MANDATORY'}],
+             'presence': 'RootOper.DummyPath.Presence',
+             'table_description': 'Test table',
+             'table_version': {'major': 2, 'minor': 0},
+             'table_version_compatibility': [{'major': 1, 'minor': 0},
+                                             None],
+             'value': [],
+             'version': {'major': 1, 'minor': 2},
+             'version_compatibility': [{'major': 1, 'minor': 2},
+                                       {'major': 3, 'minor': 4}],
+             'bag_types':
+                 {'bag_1': {'children': [{'datatype': 'UINT8',
+                                          'datatype_name': None,
+                                          'description': 'A bag param',
+                                          'name': 'param1',
+                                          'status': 'LIST',
+                                          'status_args': [{'fixed_length':
+                                                                         False,
+                                                           'max_length': 4}]}],
+                            'datatype': 'UNION',
+                            'datatype_args': {'discriminator':
+                                {'datatype': 'UINT8',
+                                 'datatype_name': None,
+                                 'description': 'A discriminator',
+                                 'name': 'disc',
+                                 'status': 'MANDATORY',
+                                 'status_args': None}},
+                            'description': 'A bag union',
+                            'name': 'bag_1'},
+                  'bag_2': {'children': [{'description': 'An enum param',
+                                          'name': 'enum_param1'}],
+                            'datatype': 'ENUM',
+                            'datatype_args': None,
+                            'description': 'A bag enum',
+                            'name': 'bag_2'}}}
+
+        result = _schema.SchemaClass.from_dict(p, d)
+        self.assertEqual(result._to_dict(), d)
+
+        d.update({'table_version': None,
+                  'table_version_compatibility': [None, None],
+                  'version': None,
+                  'version_compatibility': [None, None],
+                  'bag_types': None})
+        result = _schema.SchemaClass.from_dict(p, d)
+        self.assertEqual(result.table_version, _schema.UNVERSIONED)
+        self.assertEqual(result._to_dict(), d)
+
+    def test_lazy(self):
+        """Lazy schema classes behave as eagerly decoded ones."""
+        p = _path.RootCfg.DummyPath
+        d = {'category': 'CONTAINER',
+             'children': ['RootCfg.DummyPath.A', 'RootCfg.DummyPath.B'],
+             'description': 'Test description',
+             'hidden': False,
+             'key': [{'datatype': 'STRING',
+                      'datatype_args': None,
+                      'description': 'Name',
+                      'internal_name': None,
+                      'name': 'Name',
+                      'repeat_count': 1,
+                      'status': 'MANDATORY'}],
+             'presence': None,
+             'table_description': None,
+             'table_version': None,
+             'table_version_compatibility': None,
+             'value': [],
+             'version': {'major': 1, 'minor': 2},
+             'version_compatibility': [{'major': 1, 'minor': 2}, None],
+             'bag_types': None}
+        eager = _schema.SchemaClass.from_dict(p, d)
+        lazy = _schema.LazySchemaClass.from_dict(p, d)
+        self.assertIsInstance(lazy, _schema.SchemaClass)
+
+        # Fields are decoded on first access, and only once.
+        self.assertEqual(lazy.category, _schema.SchemaClassCategory.CONTAINER)
+        self.assertNotIn("children", vars(lazy))
+        self.assertEqual(lazy.children, eager.children)
+        self.assertIs(lazy.children, lazy.children)
+
+        self.assertEqual(lazy, eager)
+        self.assertEqual(eager, lazy)
+        self.assertFalse(lazy != eager)
+        self.assertNotEqual(lazy, eager._replace(hidden=True))
+        self.assertEqual(len(lazy), len(eager))
+        self.assertEqual(list(lazy), list(eager))
+        self.assertEqual(lazy[1], eager[1])
+        self.assertEqual(lazy[-2:], eager[-2:])
+        name, category = lazy[:2]
+        self.assertEqual((name, category), eager[:2])
+        self.assertEqual(repr(lazy), repr(eager))
+        self.assertEqual(str(lazy), str(eager))
+        self.assertEqual(lazy._asdict(), eager._asdict())
+        self.assertEqual(lazy._to_dict(), eager._to_dict())
+
+        replaced = lazy._replace(hidden=True)
+        self.assertIs(type(replaced), _schema.SchemaClass)
+        self.assertTrue(replaced.hidden)
+        copied = copy.copy(lazy)
+        self.assertIs(type(copied), _schema.SchemaClass)
+        self.assertEqual(copied, eager)
+
+        self.assertEqual(lazy + (1,), eager + (1,))
+        self.assertEqual((1,) + lazy, (1,) + eager)
+        self.assertEqual(lazy + lazy, eager + eager)
+        self.assertEqual(lazy * 2, eager * 2)
+        self.assertEqual(2 * lazy, 2 * eager)
+
+        # The underlying tuple is empty, so can't be used for `%` formatting
+        # (see the class docstring).
+        fmt = " ".join(["%s"] * len(eager))
+        self.assertEqual(fmt % tuple(lazy), fmt % eager)
+        with self.assertRaises(TypeError):
+            fmt % lazy
+
+    def test_lazy_to_dict(self):
+        """Converting a lazy schema class to a dict decodes no fields."""
+        p = _path.RootCfg.DummyPath
+        d = {'category': 'LEAF',
+             'children': [],
+             'description': 'Test description',
+             'hidden': False,
+             'key': [],
+             'presence': None,
+             'table_description': None,
+             'table_version': None,
+             'table_version_compatibility': None,
+             'value': [],
+             'version': None,
+             'version_compatibility': [None, None],
+             'bag_types': None}
+        lazy = _schema.LazySchemaClass.from_dict(p, d)
+        self.assertEqual(lazy._to_dict(), d)
+        self.assertEqual(
+                    [name for name in lazy._fields if name in vars(lazy)], [])
+        self.assertEqual(lazy._to_dict(),
+                         _schema.SchemaClass.from_dict(p, d)._to_dict())
+
+    def test_bag_registry(self):
+        """Bag types with the same name and contents are shared."""
+        def schema_dict(enum_desc):
+            return {'category': 'LEAF',
+                    'children': [],
+                    'description': 'Test description',
+                    'hidden': False,
+                    'key': [],
+                    'presence': None,
+                    'table_description': None,
+                    'table_version': None,
+                    'table_version_compatibility': None,
+                    'value': [],
+                    'version': None,
+                    'version_compatibility': [None, None],
+                    'bag_types':
+                        {'bag_1': {'children': [{'description': enum_desc,
+                                                 'name': 'enum_param1'}],
+                                   'datatype': 'ENUM',
+                                   'datatype_args': None,
+                                   'description': 'A bag enum',
+                                   'name': 'bag_1'}}}
+
+        registry = _bag.BagTypeRegistry()
+        results = [_schema.SchemaClass.from_dict(path, schema_dict(desc),
+                                                 bag_registry=registry)
+                   for path, desc in ((_path.RootOper.A, 'An enum param'),
+                                      (_path.RootOper.B, 'An enum param'),
+                                      (_path.RootOper.C, 'Changed'))]
+        self.assertIs(results[0].bag_types['bag_1'],
+                      results[1].bag_types['bag_1'])
+        self.assertIsNot(results[0].bag_types['bag_1'],
+                         results[2].bag_types['bag_1'])
+        self.assertEqual(results[2].bag_types['bag_1'].children[0].description,
+                         'Changed')
+
+        stats = registry.stats()
+        self.assertEqual((stats.types, stats.hits), (2, 1))
+        self.assertGreater(stats.bytes_saved, 0)
+
+        # Once full, the bag types with the least recently used name are
+        # dropped.
+        registry = _bag.BagTypeRegistry(maxsize=2)
+        d = schema_dict('An enum param')
+        d['bag_types']['bag_2'] = dict(d['bag_types']['bag_1'], name='bag_2')
+        first = _schema.SchemaClass.from_dict(_path.RootOper.A, d,
+                                              bag_registry=registry)
+        _schema.SchemaClass.from_dict(_path.RootOper.C, schema_dict('Changed'),
+                                      bag_registry=registry)
+        self.assertEqual(len(registry), 2)
+        second = _schema.SchemaClass.from_dict(_path.RootOper.B, d,
+                                               bag_registry=registry)
+        self.assertIs(second.bag_types['bag_1'], first.bag_types['bag_1'])
+        self.assertIsNot(second.bag_types['bag_2'], first.bag_types['bag_2'])
+        self.assertEqual(second.bag_types['bag_2'], first.bag_types['bag_2'])
+        self.assertEqual(registry.stats().maxsize, 2)
+
 class ReprStrTests(_utils.BaseTest):
     """Get coverage of remaining str/repr branches."""
 
@@ -19,6 +19,7 @@ import collections
 import contextlib
 import re
 import unittest
+import weakref
 
 from ... import _defs
 from ... import _errors
@@ -30,6 +31,12 @@ from .. import _cut
 
 _offbox_only_test = unittest.skipUnless(_cut.IS_OFFBOX, "Off-box only test")
 
+try:
+    _unichr = unichr
+except NameError:
+    _unichr = chr
+
+
 class _LoopbackIP():
     def __str__(self):
         return "127.0.0.1"
@@ -123,6 +130,18 @@ class PathToStrTests(_utils.BaseTest):
                               r"Path(RootCfg('" '"'
                               r"\\\x07\x08\x0c\n\r\t\x0b\x7f'))")
 
+    def test_encode_string(self):
+        """Strings are encoded as if character by character."""
+        def encode(s):
+            return '"{}"'.format("".join(_path.PathElement._encode_char(c)
+                                         for c in s))
+
+        chars = [_unichr(i) for i in range(0x300)]
+        for s in chars + ["".join(chars), "",
+                          "GigabitEthernet0/0/0/0", 'a"b\\c\n',
+                          "To BOS \xe9\u2603", "\x00\x7f\xff"]:
+            self.assertEqual(_path.PathElement._encode_string(s), encode(s))
+
     @_offbox_only_test
     def test_keys_as_bytes(self):
         p = _path.RootCfg(b"Foo")
@@ -193,6 +212,29 @@ class PathEqualityTests(_utils.BaseTest):
                 _path.Path.from_str('RootOper({"a": 1, "b": 2})'),
                 _path.Path.from_str('RootOper({"b": 2, "a": 1})'))
 
+    def test_construction_equality(self):
+        """Paths are equal however they were constructed."""
+        path = _path.RootCfg.Foo(1).Bar.Baz(a=2)
+        self._assertEqual(path, _path.Path(path.elems()))
+        self._assertEqual(path, _path.Path.from_str(
+                                       'RootCfg.Foo([1]).Bar.Baz({"a": 2})'))
+        self._assertEqual(_path.Path(path.elems()[:2]), _path.RootCfg.Foo(1))
+        self._assertNotEqual(path, _path.RootCfg.Foo(2).Bar.Baz(a=2))
+
+        # Hashes and strings are cached, but don't affect equality.
+        other = _path.Path(path.elems())
+        hash(path)
+        self._assertEqual(path, other)
+        self.assertEqual(str(path), str(other))
+
+    def test_immutable(self):
+        path = _path.RootCfg.Foo.Bar
+        elems = path.elems()
+        elems.append(_path.PathElement("Baz"))
+        self.assertEqual(str(path), "RootCfg.Foo.Bar")
+        with self.assertRaises(AttributeError):
+            path.elems()[0].extra = 1
+
     def test_type_equality(self):
         pathstr = "RootOper.Foo.Bar"
         path = _path.Path.from_str(pathstr)
@@ -203,6 +245,44 @@ class PathEqualityTests(_utils.BaseTest):
         self._assertEqual(path, _PathSubclass.from_str(pathstr))
 
 
+class PathSharingTests(_utils.BaseTest):
+    """
+    Test sharing of path objects between paths with a common prefix.
+
+    """
+
+    def test_shared(self):
+        """Unkeyed steps return the same object while it is alive."""
+        path = _path.RootCfg.Foo.Bar
+        self.assertIs(_path.RootCfg.Foo.Bar, path)
+        self.assertIs(_path.Path.from_str("RootCfg.Foo.Bar"), path)
+
+        # Keyed paths keep their unkeyed prefix, but aren't shared themselves.
+        keyed = _path.RootCfg.Foo.Baz(1)
+        self.assertIs(_path.RootCfg.Foo.Baz, _path.RootCfg.Foo.Baz)
+        self.assertIsNot(_path.RootCfg.Foo.Baz(1), keyed)
+        self.assertIs(keyed.Qux, keyed.Qux)
+        self.assertEqual(str(keyed.Qux), "RootCfg.Foo.Baz([1]).Qux")
+
+    def test_not_kept_alive(self):
+        """Children aren't kept alive by their parents."""
+        ref = weakref.ref(_path.RootCfg.Foo.Bar)
+        self.assertIsNone(ref())
+
+    def test_bounded(self):
+        max_children = _path.Path._MAX_CHILDREN
+        _path.Path._MAX_CHILDREN = 2
+        try:
+            parent = _path.RootCfg.Foo
+            children = [parent.A, parent.B]
+            self.assertIs(parent.A, children[0])
+            children.append(parent.C)
+            self.assertIsNot(parent.A, children[0])
+            self.assertIs(parent.C, children[2])
+        finally:
+            _path.Path._MAX_CHILDREN = max_children
+
+
 class PathGetItemtests(_utils.BaseTest):
     """
     Test Path.__getitem__
@@ -238,6 +318,25 @@ class PathGetItemtests(_utils.BaseTest):
         with self.assertRaises(TypeError):
             _ = self.PATH[{1: 2}]
 
+    def test_keys_dict(self):
+        """Named keys are returned in path order, first match winning."""
+        path = _path.Path.from_str(
+                  'RootCfg.Foo({"A": 1, "B": 2}).Bar.Baz({"A": 3, "C": 4}).X')
+        self.assertEqual(list(path.keys_dict().items()),
+                         [("A", 1), ("B", 2), ("C", 4)])
+        self.assertEqual(path["A"], 1)
+
+        # The dict returned is a copy.
+        path.keys_dict()["A"] = 5
+        self.assertEqual(path.keys_dict()["A"], 1)
+        self.assertEqual(path["A"], 1)
+
+        # Keys without names are omitted, but can be indexed.
+        path = _path.RootCfg.Foo(1).Bar(B=2)
+        self.assertEqual(dict(path.keys_dict()), {"B": 2})
+        self.assertEqual(path[:], [1, 2])
+        self.assertEqual(dict(_path.RootCfg.Foo.keys_dict()), {})
+
 
 class ParserTests(_utils.BaseTest):
 
@@ -30,9 +30,11 @@ except ImportError:
 # Mutable versions of _async._DummyFile and _DummyProc, useful so that their
 # attributes can be patched.
 class _DummyFile(object):
-    def __init__(self, read, write):
+    def __init__(self, read, write, transport=None, drain=None):
         self.read = read
         self.write = write
+        self.transport = transport
+        self.drain = drain
 
 
 class _DummyProc(object):
@@ -42,7 +44,9 @@ class _DummyProc(object):
 
     """
     def __init__(self, proc):
-        self.stdin = _DummyFile(read=None, write=proc.write)
+        self.stdin = _DummyFile(read=None, write=proc.write,
+                                transport=proc.stdin_transport,
+                                drain=proc.drain)
         self.stdout = _DummyFile(read=proc.read, write=None)
         self.terminate = proc.terminate
         self.wait = proc.wait
@@ -69,6 +73,10 @@ class _TestSubProcess(object):
         self.spawn_future = None
         self.wait_future = None
         self.read_future = None
+        self.drain_future = None
+
+        # Set by tests to give stdin a buffering transport.
+        self.stdin_transport = None
 
     def spawn(self, args, loop):
         self._loop = loop
@@ -101,6 +109,29 @@ class _TestSubProcess(object):
     def write(self, d):
         pass
 
+    def drain(self):
+        assert self.drain_future is None
+        self.drain_future = _async.Future(loop=self._loop)
+        self.drain_future.add_done_callback(self._drain_future_done)
+        return self.drain_future
+
+    def _drain_future_done(self, f):
+        self.drain_future = None
+
+
+class _TestWriteTransport(object):
+    """Stand-in for the asyncio transport of a subprocess's stdin."""
+
+    def __init__(self):
+        self.limits = None
+        self.buffer_size = 0
+
+    def set_write_buffer_limits(self, high=None, low=None):
+        self.limits = (high, low)
+
+    def get_write_buffer_size(self):
+        return self.buffer_size
+
 
 class _TestException(Exception):
     pass
@@ -270,6 +301,44 @@ class SubProcessTransportTests(_SubProcessTransportBaseTest):
         with self.assertRaises(_transport.TransportNotConnected):
             transport.write(b'')
 
+    def test_write_buffer(self):
+        """The write buffer's water marks are set, and drained to."""
+        transport = _transport.SubProcessTransport(['test_prog'])
+        self.assertFalse(transport.write_buffer_full())
+        connect_fut = _async.Task(transport.connect(loop=self._loop),
+                                  loop=self._loop)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._proc.stdin_transport = _TestWriteTransport()
+        self._proc.spawn_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(connect_fut.result(), None)
+
+        stdin_transport = self._proc.stdin_transport
+        self.assertEqual(stdin_transport.limits,
+                         (_transport._WRITE_BUFFER_HIGH,
+                          _transport._WRITE_BUFFER_LOW))
+        self.assertFalse(transport.write_buffer_full())
+        stdin_transport.buffer_size = _transport._WRITE_BUFFER_HIGH + 1
+        self.assertTrue(transport.write_buffer_full())
+
+        drain_fut = _async.Task(transport.drain(), loop=self._loop)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertFalse(drain_fut.done())
+        stdin_transport.buffer_size = _transport._WRITE_BUFFER_LOW
+        self._proc.drain_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(drain_fut.result(), None)
+        self.assertFalse(transport.write_buffer_full())
+
+        # Disconnect.
+        disconnect_fut = _async.Task(transport.disconnect(),
+                                     loop=self._loop)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self._proc.wait_future.set_result(None)
+        _async.run_until_callbacks_invoked(loop=self._loop)
+        self.assertEqual(disconnect_fut.result(), None)
+        self.assertFalse(transport.write_buffer_full())
+
     def test_concurrent_reads(self):
         # Connect.
         transport = _transport.SubProcessTransport(['test_prog'])